@@ -0,0 +1,139 @@
+"""
+Admission control for model generation.
+
+At most max_concurrent requests generate at once (enough to fill a micro-batch);
+up to max_queue more wait in FIFO order, each until its own deadline. Anything
+beyond that is turned away at once with a Retry-After estimate instead of
+queueing indefinitely, so latency stays bounded under bursts and clients back
+off while the server is saturated.
+"""
+import collections
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from batching import GENERATOR_MAX_BATCH_SIZE
+
+GENERATION_MAX_CONCURRENT = int(os.getenv("GENERATION_MAX_CONCURRENT", str(GENERATOR_MAX_BATCH_SIZE)))
+GENERATION_MAX_QUEUE = int(os.getenv("GENERATION_MAX_QUEUE", "16"))
+# Seconds a request may spend waiting for admission plus generating
+GENERATION_DEADLINE = float(os.getenv("GENERATION_DEADLINE", "60"))
+# The same for background jobs, which share the slots but have no client holding a connection open
+JOB_GENERATION_DEADLINE = float(os.getenv("JOB_GENERATION_DEADLINE", "600"))
+
+
+class Overloaded(Exception):
+    """
+    Raised when a request is rejected (queue full, status 429) or its deadline passes in the queue (503).
+    """
+
+    def __init__(self, message: str, status: int, retry_after: int):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    __slots__ = ("granted", "event")
+
+    def __init__(self):
+        self.granted = False
+        self.event = threading.Event()
+
+
+class AdmissionController:
+    """
+    A FIFO concurrency limiter with a bounded wait queue and per-request deadlines.
+    """
+
+    def __init__(self, max_concurrent: int = GENERATION_MAX_CONCURRENT, max_queue: int = GENERATION_MAX_QUEUE,
+                 deadline: float = GENERATION_DEADLINE):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self._lock = threading.Lock()
+        self._queue: "collections.deque[_Ticket]" = collections.deque()
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.peak_queue = 0
+        self.wait_seconds = 0.0
+        # Moving average of how long an admitted request holds its slot, for Retry-After
+        self.service_seconds = 1.0
+
+    def retry_after(self) -> int:
+        # Caller holds the lock; roughly the time for everything ahead to drain
+        waves = (len(self._queue) + self.active) / self.max_concurrent
+        return max(1, round(waves * self.service_seconds))
+
+    @contextmanager
+    def admit(self, deadline: Optional[float] = None) -> Iterator[float]:
+        """
+        Holds a generation slot for the duration of the with block.
+
+        Args:
+            deadline: Seconds the whole request may take (defaults to the controller's deadline)
+
+        Yields:
+            The request's deadline as a time.monotonic() timestamp, for bounding the work itself
+
+        Raises:
+            Overloaded: If the queue is full or the deadline passes before a slot frees up
+        """
+        started = time.monotonic()
+        expires = started + (self.deadline if deadline is None else deadline)
+        ticket = None
+        with self._lock:
+            if self.active < self.max_concurrent and not self._queue:
+                self.active += 1
+            elif len(self._queue) >= self.max_queue:
+                self.rejected += 1
+                raise Overloaded("Too many requests are waiting for generation", 429, self.retry_after())
+            else:
+                ticket = _Ticket()
+                self._queue.append(ticket)
+                self.peak_queue = max(self.peak_queue, len(self._queue))
+
+        if ticket is not None:
+            ticket.event.wait(max(0.0, expires - time.monotonic()))
+            with self._lock:
+                if not ticket.granted:
+                    self._queue.remove(ticket)
+                    self.timed_out += 1
+                    raise Overloaded("Timed out waiting for a generation slot", 503, self.retry_after())
+
+        admitted_at = time.monotonic()
+        with self._lock:
+            self.admitted += 1
+            self.wait_seconds += admitted_at - started
+        try:
+            yield expires
+        finally:
+            finished_at = time.monotonic()
+            with self._lock:
+                self.service_seconds = 0.8 * self.service_seconds + 0.2 * (finished_at - admitted_at)
+                if self._queue:
+                    # Hand the slot straight to the oldest waiter
+                    next_ticket = self._queue.popleft()
+                    next_ticket.granted = True
+                    next_ticket.event.set()
+                else:
+                    self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "queued": len(self._queue),
+                "peak_queue": self.peak_queue,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "mean_wait_seconds": self.wait_seconds / self.admitted if self.admitted else 0.0,
+                "mean_service_seconds": self.service_seconds,
+            }
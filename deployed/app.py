@@ -1,102 +1,174 @@
-from flask import Flask, render_template, request, jsonify
-import requests
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context, url_for
 from collections import Counter
-import re
+from contextlib import closing
 import os
+import json
+import math
+import threading
+import time
 from dotenv import load_dotenv
-from transformers import pipeline
+from admission import JOB_GENERATION_DEADLINE, AdmissionController, Overloaded
+from batching import MicroBatcher
+from github_client import get_client
+from github_ratelimit import GITHUB_RATE_LIMIT_INTERACTIVE_MAX_WAIT, RateLimitExceeded
+from generation import (
+    GENERATOR_LOAD_TIMEOUT, GENERATOR_MAX_NEW_TOKENS, GeneratorNotReady, generate_batch, get_generator_loader, preload
+)
+from hiring_hacker.job_description import (
+    JOB_DESCRIPTION_END_MARKERS, JOB_DESCRIPTION_PROMPT_PREFIX, job_description_complete, job_description_prompt,
+    trim_job_description
+)
+from hiring_hacker.repository import analyze_repository, extract_repo_info
+from jobs import JobQueue, JobQueueFull
+from result_cache import get_analysis_cache
 
 load_dotenv()
 
 app = Flask(__name__)
 
-GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
-headers = {'Authorization': f'token {GITHUB_TOKEN}'} if GITHUB_TOKEN else {}
-
-# Initialize Hugging Face text generation pipeline (using GPT-2 or GPT-3 model)
-generator = pipeline('text-generation', model='gpt2')  # You can replace 'gpt2' with any other model
-
-def extract_repo_info(url):
-    # Extract owner and repo name from GitHub URL
-    pattern = r'github\.com/([^/]+)/([^/]+)'
-    match = re.search(pattern, url)
-    if not match:
-        return None, None
-    return match.group(1), match.group(2)
-
-def analyze_repository(owner, repo):
-    # Get repository information
-    repo_url = f'https://api.github.com/repos/{owner}/{repo}'
-    repo_response = requests.get(repo_url, headers=headers)
-    if repo_response.status_code != 200:
-        return None
-
-    # Get repository contents
-    contents_url = f'https://api.github.com/repos/{owner}/{repo}/contents'
-    contents_response = requests.get(contents_url, headers=headers)
-    if contents_response.status_code != 200:
-        return None
-
-    # Get languages used
-    languages_url = f'https://api.github.com/repos/{owner}/{repo}/languages'
-    languages_response = requests.get(languages_url, headers=headers)
-    languages = languages_response.json() if languages_response.status_code == 200 else {}
-
-    # Analyze README if it exists
-    readme_url = f'https://api.github.com/repos/{owner}/{repo}/readme'
-    readme_response = requests.get(readme_url, headers=headers)
-    readme_content = ""
-    if readme_response.status_code == 200:
-        import base64
-        readme_content = base64.b64decode(readme_response.json()['content']).decode('utf-8')
-
-    repo_data = repo_response.json()
-    
-    return {
-        'name': repo_data['name'],
-        'description': repo_data['description'],
-        'languages': languages,
-        'readme': readme_content,
-        'stars': repo_data['stargazers_count'],
-        'forks': repo_data['forks_count'],
-        'open_issues': repo_data['open_issues_count']
-    }
-
-def generate_job_description(repo_data):
+# Hugging Face text generation pipeline (GPT-2 unless GENERATOR_MODEL says otherwise).
+# It is loaded in the background so the app serves requests while the weights load.
+generator_loader = preload()
+
+def generate_prompts(prompts):
+    # Runs concurrently submitted prompts through the model as one padded batch after the cached prefix.
+    # Callers wait for the model before submitting, so the worker never blocks on a load.
+    generated = generate_batch(generator_loader.get(timeout=0), prompts, prefix=JOB_DESCRIPTION_PROMPT_PREFIX,
+                               return_full_text=False, is_complete=job_description_complete,
+                               max_new_tokens=GENERATOR_MAX_NEW_TOKENS, num_return_sequences=1)
+    return [trim_job_description(text) for text in generated]
+
+generation_batcher = MicroBatcher(generate_prompts)
+
+def generate_job_description(repo_data, timeout=None, load_timeout=GENERATOR_LOAD_TIMEOUT):
     if not repo_data:
         return "Unable to analyze repository"
     
-    # Get a short description from the model if no description exists
-    description = repo_data['description'] if repo_data['description'] else "An innovative software project"
+    # Wait for the model in this thread (0 fails at once with GeneratorNotReady while it loads)
+    generator_loader.get(timeout=load_timeout)
+    prompt = job_description_prompt(repo_data)
 
-    # Sort languages by usage
-    languages = sorted(repo_data['languages'].items(), key=lambda x: x[1], reverse=True)
-    main_languages = [lang[0] for lang in languages[:3]]
+    # Generate job description using the Hugging Face model, batched with concurrent requests
+    generated_description = generation_batcher.submit(prompt, timeout=timeout)
+    
+    # Return the generated description
+    return generated_description
 
-    # Prepare the prompt to feed the Hugging Face model
-    prompt = f"""
-Generate a job description for a developer role working on a GitHub project.
+def stream_job_description(repo_data, deadline=None):
+    """
+    Yields the job description in pieces as the model generates it.
 
-The project is called {repo_data['name']}. Here is some key information about the project:
-- Project Description: {description} (if available, otherwise provide a brief and appealing overview)
-- GitHub Statistics: The project has {repo_data['stars']} stars, {repo_data['forks']} forks, and {repo_data['open_issues']} open issues.
-- Technical Skills: The project primarily uses {', '.join(main_languages)} (you can mention any related technologies if applicable).
-- Responsibilities: List the primary responsibilities of a developer working on this project (e.g., coding, bug fixing, collaborating with the team, etc.).
-- Preferred Qualifications: List the qualifications that would make someone a strong candidate for this position (e.g., experience, communication skills, etc.).
+    Streaming runs the prompt on its own rather than through the batcher. Text is
+    held back by the length of the longest end marker, so a restarted prompt is
+    cut off before any of it reaches the client. Generation stops at the next
+    step once the deadline (a time.monotonic() timestamp) passes, which raises
+    TimeoutError, or once the caller closes the generator (the client went away).
+    """
+    from transformers import TextIteratorStreamer
 
-Make the job description attractive and easy to read, highlighting the project's importance and appeal to potential developers.
-"""
+    # Answers at once while the model loads rather than holding an admission slot for the load
+    generator = generator_loader.get(timeout=0)
+    streamer = TextIteratorStreamer(generator.tokenizer, skip_prompt=True, skip_special_tokens=True)
+    errors = []
+    stop = threading.Event()
 
-    # Generate job description using the Hugging Face model
-    generated_description = generator(prompt, max_length=300, num_return_sequences=1)[0]['generated_text']
-    
-    # Return the generated description
-    return generated_description
+    def expired():
+        return deadline is not None and time.monotonic() >= deadline
+
+    def is_complete(text):
+        return stop.is_set() or expired() or job_description_complete(text)
+
+    def generate():
+        try:
+            generate_batch(generator, [job_description_prompt(repo_data)], prefix=JOB_DESCRIPTION_PROMPT_PREFIX,
+                           return_full_text=False, is_complete=is_complete,
+                           max_new_tokens=GENERATOR_MAX_NEW_TOKENS, streamer=streamer)
+        except Exception as e:
+            errors.append(e)
+            streamer.end()
+
+    thread = threading.Thread(target=generate, daemon=True)
+    thread.start()
+
+    holdback = max(len(marker) for marker in JOB_DESCRIPTION_END_MARKERS)
+    text, sent = '', 0
+    try:
+        for chunk in streamer:
+            text += chunk
+            if not sent:
+                text = text.lstrip()
+            lower = text.lower()
+            ends = [lower.find(marker) for marker in JOB_DESCRIPTION_END_MARKERS if marker in lower]
+            if ends:
+                text = text[:min(ends)]
+                break
+            if len(text) - holdback > sent:
+                yield text[sent:len(text) - holdback]
+                sent = len(text) - holdback
+    finally:
+        # Closed early (client disconnected) or cut off: the model stops at its next step
+        stop.set()
+    thread.join()
+    if errors:
+        raise errors[0]
+    rest = text.rstrip()[sent:]
+    if rest:
+        yield rest
+    if expired() and not job_description_complete(text):
+        raise TimeoutError("The job description was not finished before the deadline")
+
+def server_sent_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/healthz')
+def healthz():
+    # Liveness: the process is serving requests, whether or not the model is loaded
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz')
+def readyz():
+    # Readiness: the model is loaded and warmed up
+    status = generator_loader.status()
+    return jsonify(status), 200 if generator_loader.ready else 503
+
+@app.cli.command('warmup')
+def warmup():
+    """Load and warm up the text-generation model, then report how long it took."""
+    generator_loader.load()
+    print(generator_loader.status())
+
+# Bounds how many requests generate at once and how many may wait for a turn
+generation_admission = AdmissionController()
+
+def overloaded_response(error):
+    response = jsonify({'error': str(error)})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, error.status
+
+def analyze_interactively(owner, repo):
+    # A client is waiting on the response, so exhausted GitHub tokens fail fast instead of blocking the request
+    with get_client().scheduler.wait_at_most(GITHUB_RATE_LIMIT_INTERACTIVE_MAX_WAIT):
+        return get_analysis_cache().get_or_compute(owner, repo, 'app', lambda: analyze_repository(owner, repo))
+
+def rate_limited_response(error):
+    response = jsonify({'error': str(error)})
+    response.headers['Retry-After'] = str(math.ceil(error.retry_after))
+    return response, 503
+
+@app.route('/stats')
+def stats():
+    return jsonify({
+        'admission': generation_admission.stats(),
+        'batching': generation_batcher.stats(),
+        'jobs': analysis_jobs.stats(),
+        'analyses': get_analysis_cache().stats(),
+        'generator': generator_loader.status(),
+    })
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
     github_url = request.json.get('github_url')
@@ -105,12 +177,133 @@ def analyze():
     if not owner or not repo:
         return jsonify({'error': 'Invalid GitHub URL'}), 400
     
-    repo_data = analyze_repository(owner, repo)
+    # Reuse the stored analysis while the default branch head is unchanged
+    try:
+        repo_data = analyze_interactively(owner, repo)
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
     if not repo_data:
         return jsonify({'error': 'Unable to analyze repository'}), 400
     
-    job_description = generate_job_description(repo_data)
+    try:
+        with generation_admission.admit() as deadline:
+            job_description = generate_job_description(repo_data, timeout=max(0.0, deadline - time.monotonic()),
+                                                       load_timeout=0)
+    except Overloaded as e:
+        return overloaded_response(e)
+    except (GeneratorNotReady, TimeoutError) as e:
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = '10'
+        return response, 503
     return jsonify({'job_description': job_description})
 
+def run_analysis_job(payload):
+    # The analyze-and-generate pipeline behind /jobs, run on a job worker
+    owner, repo = payload['owner'], payload['repo']
+    repo_data = get_analysis_cache().get_or_compute(owner, repo, 'app', lambda: analyze_repository(owner, repo))
+    if not repo_data:
+        raise ValueError('Unable to analyze repository')
+    # Jobs take generation slots like /analyze, so they cannot crowd it out of the batcher
+    with generation_admission.admit(deadline=JOB_GENERATION_DEADLINE) as deadline:
+        remaining = max(0.0, deadline - time.monotonic())
+        job_description = generate_job_description(repo_data, timeout=remaining,
+                                                   load_timeout=min(GENERATOR_LOAD_TIMEOUT, remaining))
+    return {'job_description': job_description}
+
+analysis_jobs = JobQueue(run_analysis_job)
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    github_url = request.json.get('github_url')
+    owner, repo = extract_repo_info(github_url)
+
+    if not owner or not repo:
+        return jsonify({'error': 'Invalid GitHub URL'}), 400
+
+    try:
+        job = analysis_jobs.submit({'owner': owner, 'repo': repo})
+    except JobQueueFull as e:
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+
+    status_url = url_for('job_status', job_id=job.id)
+    response = jsonify({'job_id': job.id, 'status_url': status_url,
+                        'result_url': url_for('job_result', job_id=job.id)})
+    response.headers['Location'] = status_url
+    return response, 202
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    if job.state == 'failed':
+        return jsonify({'error': job.error}), 400
+    if not job.finished:
+        response = jsonify(job.to_dict())
+        response.headers['Retry-After'] = '2'
+        return response, 202
+    return jsonify(job.result)
+
+@app.route('/analyze/stream')
+def analyze_stream():
+    """
+    Server-Sent Events variant of /analyze.
+
+    Emits "status" at once, "repo" with the repository facts as soon as they are
+    fetched, "token" events while the job description is generated, then "done".
+    Failures are reported as an "error" event.
+    """
+    github_url = request.args.get('github_url', '')
+    owner, repo = extract_repo_info(github_url)
+
+    def events():
+        if not owner or not repo:
+            yield server_sent_event('error', {'error': 'Invalid GitHub URL'})
+            return
+        yield server_sent_event('status', {'message': f'Analyzing {owner}/{repo}'})
+
+        # Reuse the stored analysis while the default branch head is unchanged
+        try:
+            repo_data = analyze_interactively(owner, repo)
+        except RateLimitExceeded as e:
+            yield server_sent_event('error', {'error': str(e), 'retry_after': math.ceil(e.retry_after)})
+            return
+        except Exception as e:
+            app.logger.exception('Analysis of %s/%s failed', owner, repo)
+            yield server_sent_event('error', {'error': f'Error analyzing repository: {e}'})
+            return
+        if not repo_data:
+            yield server_sent_event('error', {'error': 'Unable to analyze repository'})
+            return
+        yield server_sent_event('repo', {key: value for key, value in repo_data.items() if key != 'readme'})
+
+        try:
+            # Closing the pieces when the client disconnects stops the generation holding the slot
+            with generation_admission.admit() as deadline, \
+                    closing(stream_job_description(repo_data, deadline=deadline)) as pieces:
+                for text in pieces:
+                    yield server_sent_event('token', {'text': text})
+        except (Overloaded, GeneratorNotReady, TimeoutError) as e:
+            yield server_sent_event('error', {'error': str(e)})
+            return
+        except Exception as e:
+            # Anything else would cut the stream off without telling the client why
+            app.logger.exception('Generation for %s/%s failed', owner, repo)
+            yield server_sent_event('error', {'error': f'Error generating job description: {e}'})
+            return
+        yield server_sent_event('done', {})
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,252 @@
+"""
+Analyze many repositories from the command line.
+
+Reads repository URLs from a JSONL file (one object per line with a "repo_url",
+"github_url" or "url" field), analyzes them with bounded concurrency and appends
+one JSON line per repository to the output file as soon as it finishes.
+Repositories already recorded in the output are skipped, so an interrupted run
+picks up where it stopped when started again with the same arguments.
+
+    python batch_analyze.py repos.jsonl results.jsonl --concurrency 8
+    python batch_analyze.py repos.jsonl jobs.jsonl --mode app --generate
+
+Modes: "report" produces the Markdown report of hiring_hacker.analyzer.analyze_github_repo;
+"app" produces the repository data of hiring_hacker.repository.analyze_repository,
+plus a job description generated by the Flask app's model with --generate. Only
+--generate loads the app (and its model); the other modes start without crewai,
+Streamlit or Flask.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, Optional, Set, TextIO, Tuple
+
+URL_FIELDS = ("repo_url", "github_url", "url")
+
+
+def read_requests(path: str) -> Iterator[Tuple[int, str]]:
+    """
+    Yields (line number, repository URL) for every usable line of a JSONL file.
+    """
+    with open(path, encoding="utf-8") as requests_file:
+        for line_number, line in enumerate(requests_file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping line {line_number}: not valid JSON", file=sys.stderr)
+                continue
+            url = record if isinstance(record, str) else next(
+                (record[field] for field in URL_FIELDS if isinstance(record, dict) and record.get(field)), None
+            )
+            if not url:
+                print(f"Skipping line {line_number}: no repository URL", file=sys.stderr)
+                continue
+            yield line_number, url
+
+
+def repo_key(url: str) -> str:
+    # owner/repo in lower case, so differently written URLs of one repository match
+    path = url.strip().rstrip("/")
+    if path.endswith(".git"):
+        path = path[:-4]
+    for prefix in ("https://github.com/", "http://github.com/", "github.com/", "https://api.github.com/repos/"):
+        if path.lower().startswith(prefix):
+            path = path[len(prefix):]
+            break
+    return "/".join(path.split("/")[:2]).lower()
+
+
+def load_completed(path: str, retry_failed: bool = False) -> Set[str]:
+    """
+    Returns the keys of repositories the output file already has a result for.
+
+    A truncated last line (from a crash mid-write) is ignored, and dropped by
+    run_batch before it appends; failed repositories count as completed unless
+    retry_failed is set.
+    """
+    completed = set()
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding="utf-8") as results_file:
+        for line in results_file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok" or not retry_failed:
+                completed.add(record["key"])
+    return completed
+
+
+def drop_partial_line(path: str) -> None:
+    """
+    Truncates the output file after its last complete line.
+
+    A crash mid-write leaves a line without its newline; appending to it would
+    also make the next record unreadable.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as results_file:
+        end = results_file.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - 65536)
+            results_file.seek(start)
+            chunk = results_file.read(position - start)
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        if position < end:
+            results_file.truncate(position)
+
+
+def report_analyzer(backend: Optional[str]) -> Callable[[str], Any]:
+    from hiring_hacker.analyzer import cached_analyze_github_repo
+
+    def analyze(url: str) -> Any:
+        report = cached_analyze_github_repo(url, backend=backend)
+        if not report.startswith("# Repository Analysis"):
+            raise ValueError(report)
+        return report
+    return analyze
+
+
+def app_analyzer(generate: bool) -> Callable[[str], Any]:
+    from hiring_hacker.repository import analyze_repository, extract_repo_info
+    from result_cache import get_analysis_cache
+
+    if generate:
+        import app
+
+    def analyze(url: str) -> Any:
+        owner, repo = extract_repo_info(url)
+        if not owner or not repo:
+            raise ValueError("Invalid GitHub URL")
+        repo_data = get_analysis_cache().get_or_compute(
+            owner, repo, 'app', lambda: analyze_repository(owner, repo)
+        )
+        if not repo_data:
+            raise ValueError("Unable to analyze repository")
+        if generate:
+            return dict(repo_data, job_description=app.generate_job_description(repo_data))
+        return repo_data
+    return analyze
+
+
+class Progress:
+    """
+    Reports completed, failed and remaining repositories with throughput and ETA.
+    """
+
+    def __init__(self, total: int, skipped: int, stream: TextIO = sys.stderr):
+        self.total = total
+        self.skipped = skipped
+        self.stream = stream
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+
+    def update(self, key: str, ok: bool, seconds: float) -> None:
+        self.done += 1
+        self.failed += not ok
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - self.done
+        eta = f"{remaining / rate:.0f}s" if rate > 0 else "?"
+        print(f"[{self.done}/{self.total}] {key} {'ok' if ok else 'error'} in {seconds:.1f}s "
+              f"({rate:.2f} repos/s, {self.failed} failed, ETA {eta})", file=self.stream, flush=True)
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        return {"processed": self.done, "failed": self.failed, "skipped": self.skipped,
+                "seconds": round(elapsed, 2), "repos_per_second": round(self.done / elapsed, 3) if elapsed else 0.0}
+
+
+def run_batch(input_path: str, output_path: str, analyze: Callable[[str], Any], concurrency: int = 4,
+              retry_failed: bool = False, progress_stream: TextIO = sys.stderr) -> Dict[str, Any]:
+    """
+    Analyzes every repository of input_path not yet in output_path.
+
+    Args:
+        input_path: JSONL file of repository URLs
+        output_path: JSONL file results are appended to
+        analyze: Produces the result for one repository URL (raises on failure)
+        concurrency: Repositories analyzed at the same time
+        retry_failed: Analyze repositories again whose recorded result is an error
+
+    Returns:
+        A summary with counts and throughput
+    """
+    drop_partial_line(output_path)
+    completed = load_completed(output_path, retry_failed)
+    pending = []
+    seen = set()
+    for line_number, url in read_requests(input_path):
+        key = repo_key(url)
+        if key in completed or key in seen:
+            continue
+        seen.add(key)
+        pending.append((line_number, url, key))
+
+    progress = Progress(len(pending), len(completed), progress_stream)
+    write_lock = threading.Lock()
+
+    def process(line_number: int, url: str, key: str) -> None:
+        started = time.monotonic()
+        record: Dict[str, Any] = {"key": key, "repo_url": url, "line": line_number}
+        try:
+            record.update(status="ok", result=analyze(url))
+        except Exception as e:
+            record.update(status="error", error=str(e))
+        seconds = time.monotonic() - started
+        record.update(seconds=round(seconds, 3), finished_at=time.time())
+        line = json.dumps(record, ensure_ascii=False)
+        with write_lock:
+            # One complete line per result, flushed at once, so a crash loses at most the repositories in flight
+            results_file.write(line + "\n")
+            results_file.flush()
+            progress.update(key, record["status"] == "ok", seconds)
+
+    with open(output_path, "a", encoding="utf-8") as results_file, \
+            ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        # Keep at most twice the concurrency in flight so huge inputs are not all queued up front
+        in_flight = set()
+        for item in pending:
+            if len(in_flight) >= 2 * concurrency:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    future.result()
+            in_flight.add(executor.submit(process, *item))
+        for future in in_flight:
+            future.result()
+
+    return progress.summary()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze the repositories listed in a JSONL file")
+    parser.add_argument("input", help="JSONL file with one repository URL per line")
+    parser.add_argument("output", help="JSONL file to append results to (existing results are skipped)")
+    parser.add_argument("--mode", choices=["report", "app"], default="report")
+    parser.add_argument("--backend", help="GitHub fetch backend for report mode (rest, graphql, tarball)")
+    parser.add_argument("--generate", action="store_true", help="Also generate a job description in app mode")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--retry-failed", action="store_true", help="Analyze repositories that failed before again")
+    args = parser.parse_args()
+
+    if args.mode == "report":
+        analyzer = report_analyzer(args.backend)
+    else:
+        analyzer = app_analyzer(args.generate)
+    summary = run_batch(args.input, args.output, analyzer, args.concurrency, args.retry_failed)
+    print(json.dumps(summary), file=sys.stderr)
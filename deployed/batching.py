@@ -0,0 +1,147 @@
+"""
+Dynamic micro-batching of concurrent model calls.
+
+Requests handled by different Flask threads each submit one prompt. The batcher
+holds the first prompt for at most max_wait seconds while more arrive, then
+runs up to max_batch_size of them through the model as a single padded batch
+and hands each caller its own result. A lone request pays at most max_wait of
+extra latency; concurrent requests share one forward pass per decoding step
+instead of queueing behind each other.
+"""
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+GENERATOR_MAX_BATCH_SIZE = int(os.getenv("GENERATOR_MAX_BATCH_SIZE", "8"))
+GENERATOR_MAX_BATCH_WAIT = float(os.getenv("GENERATOR_MAX_BATCH_WAIT", "0.02"))
+
+
+class _Pending:
+    __slots__ = ("item", "done", "result", "error", "cancelled")
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        # Set when the caller stopped waiting; the worker drops the item instead of processing it
+        self.cancelled = False
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many threads and processes them in batches on one worker thread.
+
+    The worker is started on first use and again after a fork, so the batcher
+    can be created at import time in a process that later forks workers.
+    """
+
+    def __init__(self, process: Callable[[List[Any]], List[Any]], max_batch_size: int = GENERATOR_MAX_BATCH_SIZE,
+                 max_wait: float = GENERATOR_MAX_BATCH_WAIT):
+        self.process = process
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.cancelled = 0
+
+    def _ensure_worker(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid and self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._pid != pid:
+                # Threads do not survive a fork; neither does anything queued for them
+                self._queue = queue.Queue()
+                self._worker = None
+                self._pid = pid
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, args=(self._queue,), name="micro-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Queues one item and waits for its result.
+
+        Args:
+            item: The input to process (e.g. a prompt)
+            timeout: Seconds to wait for the result (None waits indefinitely)
+
+        Returns:
+            The result the process function produced for this item
+
+        Raises:
+            TimeoutError: If the result is not ready within timeout; the item is then dropped unless
+                its batch is already running
+            Exception: Whatever the process function raised for the batch
+        """
+        pending = _Pending(item)
+        self._ensure_worker()
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            pending.cancelled = True
+            raise TimeoutError("Timed out waiting for the batch to be processed")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _dropped(self, pending: _Pending) -> bool:
+        # Items whose caller gave up are not worth a place in the batch
+        if not pending.cancelled:
+            return False
+        with self._lock:
+            self.cancelled += 1
+        pending.done.set()
+        return True
+
+    def _run(self, work: "queue.Queue[_Pending]") -> None:
+        while True:
+            batch = []
+            while not batch:
+                pending = work.get()
+                if not self._dropped(pending):
+                    batch.append(pending)
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    pending = work.get(timeout=remaining) if remaining > 0 else work.get_nowait()
+                except queue.Empty:
+                    break
+                if not self._dropped(pending):
+                    batch.append(pending)
+
+            try:
+                results = self.process([pending.item for pending in batch])
+                if len(results) != len(batch):
+                    raise ValueError(f"Batch of {len(batch)} items produced {len(results)} results")
+                for pending, result in zip(batch, results):
+                    pending.result = result
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            finally:
+                with self._lock:
+                    self.batches += 1
+                    self.items += len(batch)
+                    self.largest_batch = max(self.largest_batch, len(batch))
+                for pending in batch:
+                    pending.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "largest_batch": self.largest_batch,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+                "cancelled": self.cancelled,
+                "queued": self._queue.qsize(),
+            }
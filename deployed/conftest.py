@@ -0,0 +1,31 @@
+import atexit
+import os
+import shutil
+import tempfile
+from unittest.mock import MagicMock
+
+import pytest
+
+# Keep the suite off the caches under ~/.cache/hiring_hacker. Set before any test
+# module is imported, since the cache modules read their settings at import time.
+_CACHE_DIR = tempfile.mkdtemp(prefix="hiring_hacker_tests_")
+atexit.register(shutil.rmtree, _CACHE_DIR, ignore_errors=True)
+os.environ["RESULT_CACHE_DIR"] = _CACHE_DIR
+os.environ["GITHUB_CACHE_DIR"] = _CACHE_DIR
+os.environ["GITHUB_CACHE"] = "0"
+os.environ["ANALYSIS_CACHE_DISK"] = "0"
+os.environ["TASK_CACHE_DISK"] = "0"
+
+
+def _fake_factory(release=None):
+    def factory(model):
+        if release is not None:
+            release.wait(5)
+        return MagicMock(return_value=[{'generated_text': 'Job description'}])
+    return factory
+
+
+@pytest.fixture
+def fake_factory():
+    # Builds model factories for GeneratorLoader; given an Event, loading blocks until it is set
+    return _fake_factory
@@ -0,0 +1,249 @@
+"""
+Partitioned, bounded storage for crew memory.
+
+Crew(memory=True) keeps every memory of every repository ever analyzed in one
+table, so recall searches unrelated repositories and the store only grows.
+Here each repository gets its own LanceDB table (a partition) in
+CREW_MEMORY_DIR, and the crews of a run share a Memory on that partition.
+Every few pipeline runs (counted by begin_run) a partition is maintained: memories older than the TTL are
+deleted, the oldest ones beyond the record cap are dropped, and the table is
+compacted with superseded versions removed so deleted data leaves the disk.
+Partitions not used for the longest time are dropped when the store outgrows
+its size cap.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from crewai.memory.storage.lancedb_storage import LanceDBStorage
+from crewai.memory.unified_memory import Memory
+from crewai_core.lock_store import lock as store_lock
+
+from embedding_cache import cached_openai_embedder
+from result_cache import RESULT_CACHE_DIR, content_hash
+
+CREW_MEMORY_DIR = os.getenv("CREW_MEMORY_DIR", os.path.join(RESULT_CACHE_DIR, "crew_memory"))
+CREW_MEMORY_TTL = float(os.getenv("CREW_MEMORY_TTL", str(30 * 24 * 3600)))
+CREW_MEMORY_MAX_RECORDS = int(os.getenv("CREW_MEMORY_MAX_RECORDS", "1000"))
+CREW_MEMORY_MAX_BYTES = int(os.getenv("CREW_MEMORY_MAX_BYTES", str(256 * 1024 * 1024)))
+# Pipeline runs on a partition between two maintenance passes over it (a run may kick off several crews)
+CREW_MEMORY_MAINTAIN_EVERY = int(os.getenv("CREW_MEMORY_MAINTAIN_EVERY", "5"))
+
+
+def partition_name(repo_url: str) -> str:
+    # owner/repo in lower case when the URL has one, so spellings of one repository share a partition
+    parts = repo_url.strip().rstrip("/").split("/")
+    key = "/".join(parts[-2:]).lower() if "github.com" in repo_url and len(parts) >= 5 else repo_url.strip()
+    return "repo_" + content_hash(key)[:32]
+
+
+class PartitionStorage(LanceDBStorage):
+    """
+    LanceDB storage for one partition that reports search latency and can compact away old versions.
+    """
+
+    def __init__(self, path: str, table_name: str, on_search=None):
+        super().__init__(path=path, table_name=table_name)
+        self.on_search = on_search
+
+    def search(self, *args: Any, **kwargs: Any):
+        started = time.perf_counter()
+        try:
+            return super().search(*args, **kwargs)
+        finally:
+            if self.on_search is not None:
+                self.on_search(time.perf_counter() - started)
+
+    def compact(self) -> None:
+        # optimize() alone keeps superseded versions for a week; drop them now so deletions free the disk
+        if self._table is None:
+            return
+        with store_lock(self._lock_name):
+            self._table.optimize(cleanup_older_than=timedelta(0))
+            self._ensure_scope_index()
+
+
+class CrewMemoryStore:
+    """
+    Hands out per-repository Memory instances and keeps their partitions within the configured bounds.
+    """
+
+    def __init__(self, path: str = CREW_MEMORY_DIR, ttl: float = CREW_MEMORY_TTL,
+                 max_records: int = CREW_MEMORY_MAX_RECORDS, max_bytes: int = CREW_MEMORY_MAX_BYTES,
+                 maintain_every: int = CREW_MEMORY_MAINTAIN_EVERY):
+        self.path = path
+        self.ttl = ttl
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.maintain_every = maintain_every
+        self._lock = threading.Lock()
+        self._storages: Dict[str, PartitionStorage] = {}
+        self._runs: Dict[str, int] = {}
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.slowest_query = 0.0
+        self.expired = 0
+        self.trimmed = 0
+        self.evicted = 0
+        self.compactions = 0
+
+    def _record_query(self, seconds: float) -> None:
+        with self._lock:
+            self.queries += 1
+            self.query_seconds += seconds
+            self.slowest_query = max(self.slowest_query, seconds)
+
+    def storage(self, partition: str) -> PartitionStorage:
+        with self._lock:
+            storage = self._storages.get(partition)
+            if storage is None:
+                storage = PartitionStorage(self.path, partition, on_search=self._record_query)
+                self._storages[partition] = storage
+            return storage
+
+    def begin_run(self, repo_url: str) -> None:
+        """
+        Counts a pipeline run on the repository's partition, maintaining it first on every maintain_every-th run.
+
+        Call it once per run before its crews are built, so their recall runs against a trimmed, compacted table
+        however many crews the run kicks off.
+        """
+        partition = partition_name(repo_url)
+        with self._lock:
+            self._runs[partition] = self._runs.get(partition, 0) + 1
+            due = self.maintain_every > 0 and self._runs[partition] % self.maintain_every == 0
+        if due:
+            self.maintain(partition)
+
+    def memory(self, repo_url: str, llm: Any = None) -> Memory:
+        """
+        Returns a Memory confined to the repository's partition.
+
+        Args:
+            repo_url: The repository the crew works on
+            llm: The LLM memory uses to analyze what it saves (the crew's, as with memory=True)
+        """
+        partition = partition_name(repo_url)
+        # Same model as crewai's default memory embedder; repeated texts are not embedded again
+        kwargs = {"storage": self.storage(partition), "embedder": cached_openai_embedder("text-embedding-3-large")}
+        if llm is not None:
+            kwargs["llm"] = llm
+        return Memory(**kwargs)
+
+    def maintain(self, partition: str) -> Dict[str, int]:
+        """
+        Applies the TTL and record cap to one partition, compacts it, then enforces the store's size cap.
+
+        Returns:
+            Counts of expired, trimmed and evicted (whole partitions) records
+        """
+        storage = self.storage(partition)
+        expired = 0
+        if self.ttl > 0:
+            # Memory timestamps are naive UTC
+            expired = storage.delete(older_than=datetime.utcnow() - timedelta(seconds=self.ttl))
+        trimmed = 0
+        count = storage.count()
+        if self.max_records > 0 and count > self.max_records:
+            # list_records returns the newest first
+            oldest = storage.list_records(limit=count)[self.max_records:]
+            trimmed = storage.delete(record_ids=[record.id for record in oldest])
+        storage.compact()
+        evicted = self._enforce_size(keep=partition)
+        with self._lock:
+            self.expired += expired
+            self.trimmed += trimmed
+            self.evicted += evicted
+            self.compactions += 1
+        return {"expired": expired, "trimmed": trimmed, "evicted": evicted}
+
+    def partition_usage(self) -> Dict[str, tuple]:
+        """
+        Returns (bytes on disk, last write time) per partition.
+        """
+        usage = {}
+        if not os.path.isdir(self.path):
+            return usage
+        for entry in os.scandir(self.path):
+            if entry.is_dir() and entry.name.endswith(".lance"):
+                usage[entry.name[:-len(".lance")]] = _directory_usage(entry.path)
+        return usage
+
+    def _enforce_size(self, keep: str) -> int:
+        # Drop the partitions written longest ago until the store fits (never the one just maintained)
+        usage = self.partition_usage()
+        total = sum(size for size, _ in usage.values())
+        if self.max_bytes <= 0 or total <= self.max_bytes:
+            return 0
+        by_age = sorted((name for name in usage if name != keep), key=lambda name: usage[name][1])
+        evicted = 0
+        for name in by_age:
+            self.storage(name).reset()
+            with self._lock:
+                self._storages.pop(name, None)
+                self._runs.pop(name, None)
+            total -= usage[name][0]
+            evicted += 1
+            if total <= self.max_bytes:
+                break
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        sizes = {name: size for name, (size, _) in self.partition_usage().items()}
+        with self._lock:
+            return {
+                "path": self.path,
+                "partitions": len(sizes),
+                "disk_bytes": sum(sizes.values()),
+                "largest_partitions": sorted(sizes.items(), key=lambda item: -item[1])[:5],
+                "queries": self.queries,
+                "mean_query_seconds": self.query_seconds / self.queries if self.queries else 0.0,
+                "slowest_query_seconds": self.slowest_query,
+                "expired": self.expired,
+                "trimmed": self.trimmed,
+                "evicted_partitions": self.evicted,
+                "compactions": self.compactions,
+            }
+
+
+def _directory_usage(path: str) -> tuple:
+    # Lance writes new files under the table directory, so the newest file dates the last write
+    total, modified = 0, 0.0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            total += stat.st_size
+            modified = max(modified, stat.st_mtime)
+    return total, modified
+
+
+_store: Optional[CrewMemoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_crew_memory_store() -> CrewMemoryStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CrewMemoryStore()
+    return _store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or maintain the crew memory store")
+    parser.add_argument("command", choices=["stats", "maintain"])
+    args = parser.parse_args()
+
+    store = get_crew_memory_store()
+    if args.command == "maintain":
+        for partition in sorted(store.partition_usage()):
+            print(partition, json.dumps(store.maintain(partition)))
+    print(json.dumps(store.stats(), indent=2))
@@ -0,0 +1,280 @@
+"""
+Content-addressed cache in front of the pipeline's embedding calls.
+
+Crew memory and the repository search index embed many texts that are
+byte-identical across runs (READMEs, task descriptions, analysis sections).
+EmbeddingCache stores one vector per (embedding model, text hash): the vectors
+live in a float32 matrix memory-mapped from disk, a SQLite index maps hashes
+to rows and tracks when each was last used, and the least recently used rows
+are overwritten once max_entries is reached. CachedEmbeddingFunction wraps an
+embedding function so that only texts missing from the cache reach the model.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from result_cache import RESULT_CACHE_DIR
+
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(RESULT_CACHE_DIR, "embeddings"))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+# Rows the matrix file is grown by at a time
+EMBEDDING_CACHE_GROWTH = 1024
+
+
+class EmbeddingCache:
+    """
+    LRU-bounded map from text to embedding vector for one embedding model.
+    """
+
+    def __init__(self, directory: str, namespace: str, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.namespace = namespace
+        self.max_entries = max(1, max_entries)
+        name = hashlib.sha256(namespace.encode("utf-8")).hexdigest()[:16]
+        os.makedirs(directory, exist_ok=True)
+        self.index_path = os.path.join(directory, name + ".sqlite3")
+        self.matrix_path = os.path.join(directory, name + ".f32")
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.memmap] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Writes from other processes go through SQLite transactions, so rows are only visible once their vector is
+        self._conn = sqlite3.connect(self.index_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS vectors (
+                key TEXT PRIMARY KEY,
+                slot INTEGER NOT NULL UNIQUE,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS vectors_last_used ON vectors (last_used)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+        self.dim: Optional[int] = int(row[0]) if row else None
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _rows(self, needed: int = 0) -> np.memmap:
+        # Caller holds the lock; (re)maps the matrix file, growing it to hold at least needed rows
+        path_rows = os.path.getsize(self.matrix_path) // (4 * self.dim) if os.path.exists(self.matrix_path) else 0
+        if needed > path_rows:
+            rows = min(self.max_entries, max(needed, path_rows + EMBEDDING_CACHE_GROWTH))
+            with open(self.matrix_path, "ab") as matrix_file:
+                matrix_file.truncate(rows * 4 * self.dim)
+            path_rows = rows
+        if self._matrix is None or len(self._matrix) != path_rows:
+            self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(path_rows, self.dim))
+        return self._matrix
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Returns the cached vector of each text, or None where there is none.
+        """
+        keys = [self.key(text) for text in texts]
+        with self._lock:
+            found: Dict[str, int] = {}
+            if self.dim is not None:
+                for start in range(0, len(keys), 500):
+                    batch = keys[start:start + 500]
+                    found.update(self._conn.execute(
+                        f"SELECT key, slot FROM vectors WHERE key IN ({','.join('?' * len(batch))})", batch
+                    ).fetchall())
+            results: List[Optional[np.ndarray]] = []
+            if found:
+                matrix = self._rows()
+                if max(found.values()) >= len(matrix):
+                    # Another process grew the file since it was mapped
+                    self._matrix = None
+                    matrix = self._rows()
+                with self._conn:
+                    self._conn.execute("BEGIN")
+                    self._conn.executemany(
+                        "UPDATE vectors SET last_used = ? WHERE key = ?", [(time.time(), key) for key in found]
+                    )
+            for key in keys:
+                slot = found.get(key)
+                results.append(np.array(matrix[slot]) if slot is not None else None)
+            hits = sum(result is not None for result in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """
+        Stores one vector per text, overwriting the least recently used rows when the cache is full.
+        """
+        if not texts:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self.dim is None:
+                    row = self._conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+                    self.dim = int(row[0]) if row else len(vectors[0])
+                    self._conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('dim', ?)", (str(self.dim),))
+                now = time.time()
+                pending = {}
+                for text, vector in zip(texts, vectors):
+                    if len(vector) == self.dim:
+                        pending[self.key(text)] = vector
+                existing = dict(self._conn.execute(
+                    f"SELECT key, slot FROM vectors WHERE key IN ({','.join('?' * len(pending))})", list(pending)
+                ).fetchall()) if pending else {}
+                next_slot = self._conn.execute("SELECT COALESCE(MAX(slot) + 1, 0) FROM vectors").fetchone()[0]
+                assignments = []
+                for key, vector in pending.items():
+                    slot = existing.get(key)
+                    if slot is None and next_slot < self.max_entries:
+                        slot, next_slot = next_slot, next_slot + 1
+                    elif slot is None:
+                        evicted_key, slot = self._conn.execute(
+                            "SELECT key, slot FROM vectors ORDER BY last_used LIMIT 1"
+                        ).fetchone()
+                        self._conn.execute("DELETE FROM vectors WHERE key = ?", (evicted_key,))
+                        self.evictions += 1
+                    # Inserted at once so a later eviction in this batch cannot pick the same row
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO vectors (key, slot, last_used) VALUES (?, ?, ?)", (key, slot, now)
+                    )
+                    assignments.append((slot, vector))
+                if assignments:
+                    matrix = self._rows(max(slot for slot, _ in assignments) + 1)
+                    for slot, vector in assignments:
+                        matrix[slot] = np.asarray(vector, dtype=np.float32)
+                    matrix.flush()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "namespace": self.namespace,
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "dim": self.dim,
+                "matrix_bytes": os.path.getsize(self.matrix_path) if os.path.exists(self.matrix_path) else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+def embedding_namespace(embedding_function: Any) -> str:
+    """
+    Identifies the model behind an embedding function, so vectors of different models never mix.
+    """
+    try:
+        name = embedding_function.name()
+        config = embedding_function.get_config()
+    except Exception:
+        name, config = NotImplemented, NotImplemented
+    if name is NotImplemented or config is NotImplemented:
+        return type(embedding_function).__qualname__
+    return f"{name}:{json.dumps(config, sort_keys=True, default=str)}"
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(namespace: str) -> EmbeddingCache:
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = EmbeddingCache(EMBEDDING_CACHE_DIR, namespace)
+            _caches[namespace] = cache
+        return cache
+
+
+def embedding_cache_stats() -> List[Dict[str, Any]]:
+    with _caches_lock:
+        caches = list(_caches.values())
+    return [cache.stats() for cache in caches]
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Embeds through the cache, calling the wrapped function only for texts it has not seen.
+
+    The wrapped function may be given as a zero-argument factory; it is then
+    created on first use, as crew memory does with its default embedder.
+    ChromaDB sees the wrapped function's name and configuration, so
+    collections created before the cache existed keep working.
+    """
+
+    def __init__(self, embedding_function: Optional[EmbeddingFunction] = None,
+                 factory: Optional[Callable[[], EmbeddingFunction]] = None, cache: Optional[EmbeddingCache] = None):
+        if (embedding_function is None) == (factory is None):
+            raise ValueError("Pass either an embedding function or a factory for one")
+        self._wrapped = embedding_function
+        self._factory = factory
+        self._cache = cache
+        self._init_lock = threading.Lock()
+
+    @property
+    def wrapped(self) -> Any:
+        if self._wrapped is None:
+            with self._init_lock:
+                if self._wrapped is None:
+                    self._wrapped = self._factory()
+        return self._wrapped
+
+    @property
+    def cache(self) -> EmbeddingCache:
+        if self._cache is None:
+            self._cache = get_embedding_cache(embedding_namespace(self.wrapped))
+        return self._cache
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        vectors = self.cache.get_many(texts)
+        missing = [index for index, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # Identical texts within one call are embedded once
+            unique = list(dict.fromkeys(texts[index] for index in missing))
+            embedded = dict(zip(unique, (np.asarray(vector, dtype=np.float32) for vector in self.wrapped(unique))))
+            self.cache.put_many(list(embedded), list(embedded.values()))
+            for index in missing:
+                vectors[index] = embedded[texts[index]]
+        return vectors
+
+    def name(self) -> str:  # type: ignore[override]
+        return self.wrapped.name()
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.wrapped.get_config()
+
+    def default_space(self):
+        return self.wrapped.default_space()
+
+    def supported_spaces(self):
+        return self.wrapped.supported_spaces()
+
+    def is_legacy(self) -> bool:
+        return self.wrapped.is_legacy()
+
+
+def cached_openai_embedder(model_name: str) -> CachedEmbeddingFunction:
+    """
+    Returns the OpenAI embedding function crewai uses by default, behind the cache.
+    """
+    def factory():
+        from crewai.rag.embeddings.factory import build_embedder
+        return build_embedder({"provider": "openai", "config": {"model_name": model_name}})
+    return CachedEmbeddingFunction(factory=factory)
@@ -0,0 +1,458 @@
+"""
+Lifecycle of the text-generation model behind app.py.
+
+Loading GPT-2 takes seconds (longer on a cold download), so the model is not
+built at import time. GeneratorLoader loads it on first use or in a background
+thread started at process start-up (GENERATOR_PRELOAD=background), runs a
+one-token warm-up generation so the first real request does not pay for lazy
+kernel initialisation, and records how long both steps took. The web app
+reports liveness independently of the model and readiness from the loader.
+
+GENERATOR_BACKEND picks how the model runs on CPU: "torch" (stock fp32),
+"int8" (dynamic int8 quantization of every linear layer) or "onnx" (an
+exported ONNX Runtime graph, needs optimum[onnxruntime]). Compare a backend
+with the fp32 baseline before switching:
+
+    python generation.py parity --backend int8
+"""
+import argparse
+import copy
+import functools
+import importlib.util
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+GENERATOR_MODEL = os.getenv("GENERATOR_MODEL", "gpt2")
+# "background" starts loading at process start, "eager" blocks start-up until loaded, "lazy" waits for the first request
+GENERATOR_PRELOAD = os.getenv("GENERATOR_PRELOAD", "background")
+# How long a request waits for a model that is still loading before it is turned away
+GENERATOR_LOAD_TIMEOUT = float(os.getenv("GENERATOR_LOAD_TIMEOUT", "30"))
+
+GENERATOR_BACKENDS = ["torch", "int8", "onnx"]
+GENERATOR_BACKEND = os.getenv("GENERATOR_BACKEND", "torch")
+# Upper bound on generated tokens per request; the prompt does not count against it
+GENERATOR_MAX_NEW_TOKENS = int(os.getenv("GENERATOR_MAX_NEW_TOKENS", "256"))
+# Threads used inside one operator (matmul) and across independent operators; 0 keeps the runtime default
+GENERATOR_INTRA_OP_THREADS = int(os.getenv("GENERATOR_INTRA_OP_THREADS", "0"))
+GENERATOR_INTER_OP_THREADS = int(os.getenv("GENERATOR_INTER_OP_THREADS", "0"))
+
+
+class GeneratorNotReady(Exception):
+    """
+    Raised when the model is not loaded within the wait, or failed to load.
+    """
+
+
+def configure_threads(intra_op: int = GENERATOR_INTRA_OP_THREADS, inter_op: int = GENERATOR_INTER_OP_THREADS) -> None:
+    """
+    Applies the torch thread settings; values of 0 leave the defaults in place.
+    """
+    import torch
+    if intra_op > 0:
+        torch.set_num_threads(intra_op)
+    if inter_op > 0:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError:
+            # Only allowed before the first parallel operation of the process
+            logger.warning("Inter-op threads already initialised; keeping %d", torch.get_num_interop_threads())
+
+
+def quantize_int8(model):
+    """
+    Quantizes the linear layers of a causal LM to int8 with dynamic activation scaling.
+
+    GPT-2 implements its projections as transformers Conv1D modules (transposed
+    linear layers) that quantize_dynamic does not recognise, so they are first
+    replaced by equivalent nn.Linear layers.
+    """
+    import torch
+    from transformers.pytorch_utils import Conv1D
+
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if isinstance(child, Conv1D):
+                linear = torch.nn.Linear(child.nx, child.nf)
+                linear.weight.data = child.weight.data.t().contiguous()
+                linear.bias.data = child.bias.data
+                setattr(parent, name, linear)
+    return torch.ao.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _onnx_model(model: str, intra_op: int, inter_op: int):
+    if importlib.util.find_spec("optimum") is None or importlib.util.find_spec("onnxruntime") is None:
+        raise RuntimeError("The onnx backend needs optimum and onnxruntime: pip install 'optimum[onnxruntime]'")
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForCausalLM
+
+    session_options = onnxruntime.SessionOptions()
+    if intra_op > 0:
+        session_options.intra_op_num_threads = intra_op
+    if inter_op > 0:
+        session_options.inter_op_num_threads = inter_op
+    session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    # Exports the checkpoint with past key/values so decoding reuses the cache like the torch model
+    return ORTModelForCausalLM.from_pretrained(model, export=True, use_cache=True, session_options=session_options)
+
+
+def default_factory(model: str, backend: str = GENERATOR_BACKEND) -> Callable:
+    """
+    Builds the text-generation pipeline for the given inference backend.
+    """
+    if backend not in GENERATOR_BACKENDS:
+        raise ValueError(f"Unknown generator backend: {backend}")
+    # Imported here so importing this module does not pull in torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
+    configure_threads()
+    tokenizer = AutoTokenizer.from_pretrained(model)
+    if backend == "onnx":
+        causal_lm = _onnx_model(model, GENERATOR_INTRA_OP_THREADS, GENERATOR_INTER_OP_THREADS)
+    else:
+        causal_lm = AutoModelForCausalLM.from_pretrained(model).eval()
+        if backend == "int8":
+            causal_lm = quantize_int8(causal_lm)
+    generator = pipeline('text-generation', model=causal_lm, tokenizer=tokenizer)
+    # GPT-2 has no padding token; batched prompts are padded on the left so generation continues right after them
+    if generator.tokenizer.pad_token is None:
+        generator.tokenizer.pad_token = generator.tokenizer.eos_token
+    generator.tokenizer.padding_side = 'left'
+    generator.model.generation_config.pad_token_id = generator.tokenizer.pad_token_id
+    return generator
+
+
+_prefix_states: "weakref.WeakKeyDictionary[Any, Dict[str, tuple]]" = weakref.WeakKeyDictionary()
+_prefix_lock = threading.Lock()
+
+
+def _prefix_state(model, tokenizer, prefix: str) -> tuple:
+    # The token ids of a prompt prefix and, for torch models, its attention key/value cache
+    import torch
+    with _prefix_lock:
+        state = _prefix_states.setdefault(model, {}).get(prefix)
+    if state is None:
+        prefix_ids = tokenizer(prefix, return_tensors='pt')['input_ids']
+        past_key_values = None
+        if isinstance(model, torch.nn.Module):
+            with torch.inference_mode():
+                past_key_values = model(prefix_ids, use_cache=True).past_key_values
+        state = (prefix_ids, past_key_values)
+        with _prefix_lock:
+            _prefix_states[model][prefix] = state
+    return state
+
+
+class CompletionStoppingCriteria:
+    """
+    Stops each sequence of a batch once its generated text is judged complete.
+
+    Only the tokens after the prompt are decoded, and a finished sequence is not
+    decoded again, so the check costs one short decode per running sequence and step.
+    """
+
+    def __init__(self, tokenizer, prompt_length: int, is_complete: Callable[[str], bool]):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.is_complete = is_complete
+        self._done = None
+
+    def __call__(self, input_ids, scores, **kwargs):
+        import torch
+        if self._done is None:
+            self._done = torch.zeros(input_ids.shape[0], dtype=torch.bool, device=input_ids.device)
+        for row in range(input_ids.shape[0]):
+            if not self._done[row]:
+                text = self.tokenizer.decode(input_ids[row, self.prompt_length:], skip_special_tokens=True)
+                self._done[row] = self.is_complete(text)
+        return self._done.clone()
+
+
+def generate_batch(generator: Callable, prompts: List[str], prefix: Optional[str] = None,
+                   return_full_text: bool = True, is_complete: Optional[Callable[[str], bool]] = None,
+                   **generate_kwargs) -> List[str]:
+    """
+    Runs several prompts through the pipeline's model as one padded batch.
+
+    The model is called directly because the text-generation pipeline drops
+    results when given a batch_size above one.
+
+    With a prefix, every prompt is the variable suffix of prefix + prompt. The
+    prefix is run through the model once per process and its key/value cache is
+    reused, so each call only prefills the suffixes. Padding goes between the
+    prefix and the suffixes so that the shared cache lines up for the whole batch.
+
+    Args:
+        generator: A text-generation pipeline from the loader
+        prompts: The prompts (or prompt suffixes) to complete
+        prefix: Static text every prompt starts with
+        return_full_text: Whether to return the prompt with the generated text or only the continuation
+        is_complete: Called with the text generated so far; generation of a prompt stops once it returns True
+        **generate_kwargs: Arguments forwarded to model.generate
+
+    Returns:
+        The generated text (after the full prompt, if requested) for each prompt, in order
+    """
+    import torch
+    tokenizer, model = generator.tokenizer, generator.model
+    past_key_values = None
+    if prefix is None:
+        inputs = tokenizer(prompts, return_tensors='pt', padding=True)
+        input_ids, attention_mask = inputs['input_ids'], inputs['attention_mask']
+    else:
+        prefix_ids, prefix_cache = _prefix_state(model, tokenizer, prefix)
+        suffixes = tokenizer(prompts, return_tensors='pt', padding=True, add_special_tokens=False)
+        batch = len(prompts)
+        input_ids = torch.cat([prefix_ids.expand(batch, -1), suffixes['input_ids']], dim=1)
+        attention_mask = torch.cat([torch.ones_like(prefix_ids).expand(batch, -1), suffixes['attention_mask']], dim=1)
+        if prefix_cache is not None:
+            # generate extends the cache in place, so every call works on its own copy
+            past_key_values = copy.deepcopy(prefix_cache)
+            if batch > 1:
+                past_key_values.batch_repeat_interleave(batch)
+
+    inputs = {'input_ids': input_ids, 'attention_mask': attention_mask}
+    if isinstance(model, torch.nn.Module):
+        # Positions skip the padding, so padded prompts are encoded exactly like unpadded ones
+        inputs['position_ids'] = (attention_mask.cumsum(-1) - 1).clamp(min=0)
+    if past_key_values is not None:
+        inputs['past_key_values'] = past_key_values
+    if is_complete is not None:
+        from transformers import StoppingCriteriaList
+        generate_kwargs['stopping_criteria'] = StoppingCriteriaList(
+            [CompletionStoppingCriteria(tokenizer, input_ids.shape[1], is_complete)]
+        )
+    with torch.inference_mode():
+        outputs = model.generate(**inputs, **generate_kwargs)
+    if not return_full_text:
+        outputs = outputs[:, input_ids.shape[1]:]
+    return tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+
+class GeneratorLoader:
+    """
+    Loads the text-generation pipeline once per process and tracks its state.
+
+    States move from "idle" to "loading" to "ready", or to "failed" if loading
+    raised; a failed load is retried by the next start() or get().
+    """
+
+    def __init__(self, model: str = GENERATOR_MODEL, factory: Optional[Callable[[str], Callable]] = None,
+                 backend: str = GENERATOR_BACKEND):
+        self.model = model
+        self.backend = backend
+        self.factory = factory or functools.partial(default_factory, backend=backend)
+        self.state = "idle"
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self._generator = None
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+
+    def start(self) -> None:
+        """
+        Starts loading in a daemon thread unless the model is already loading or loaded.
+        """
+        with self._lock:
+            if self.state in ("loading", "ready"):
+                return
+            self.state = "loading"
+            self._loaded.clear()
+        threading.Thread(target=self._load, name="generator-loader", daemon=True).start()
+
+    def load(self, warm_up: bool = True) -> Callable:
+        """
+        Loads the model in the calling thread (waiting for a load already in progress).
+
+        Args:
+            warm_up: Whether to run the warm-up generation; a pre-fork master loads
+                without it so that no inference thread pools exist before forking
+
+        Returns:
+            The text-generation pipeline
+
+        Raises:
+            GeneratorNotReady: If loading failed
+        """
+        with self._lock:
+            owner = self.state not in ("loading", "ready")
+            if owner:
+                self.state = "loading"
+                self._loaded.clear()
+        if owner:
+            self._load(warm_up)
+        self._loaded.wait()
+        return self._result()
+
+    def _load(self, warm_up: bool = True) -> None:
+        started = time.perf_counter()
+        try:
+            generator = self.factory(self.model)
+            loaded = time.perf_counter()
+            if warm_up:
+                self._warm_up(generator)
+        except Exception as e:
+            logger.exception("Loading text-generation model %s failed", self.model)
+            with self._lock:
+                self.state = "failed"
+                self.error = str(e)
+            self._loaded.set()
+            return
+
+        with self._lock:
+            self._generator = generator
+            self.load_seconds = loaded - started
+            self.state = "ready"
+            self.error = None
+        logger.info("Loaded %s in %.2fs", self.model, self.load_seconds)
+        self._loaded.set()
+
+    def _warm_up(self, generator: Callable) -> None:
+        # A tiny generation initialises the kernels and caches the first request would otherwise pay for
+        started = time.perf_counter()
+        generator("Hello", max_new_tokens=1, num_return_sequences=1)
+        self.warmup_seconds = time.perf_counter() - started
+        logger.info("Warm-up of %s took %.2fs", self.model, self.warmup_seconds)
+
+    def warm_up(self) -> None:
+        """
+        Runs the warm-up generation on an already loaded model (e.g. in a freshly forked worker).
+        """
+        self._warm_up(self._result())
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def get(self, timeout: Optional[float] = GENERATOR_LOAD_TIMEOUT) -> Callable:
+        """
+        Returns the pipeline, starting a load if none has happened and waiting up to timeout seconds.
+
+        Raises:
+            GeneratorNotReady: If the model is still loading after the wait or failed to load
+        """
+        if self.state != "ready":
+            self.start()
+            self._loaded.wait(timeout)
+        return self._result()
+
+    def _result(self) -> Callable:
+        with self._lock:
+            if self.state == "ready":
+                return self._generator
+            if self.state == "failed":
+                raise GeneratorNotReady(f"Text-generation model failed to load: {self.error}")
+            raise GeneratorNotReady("Text-generation model is still loading")
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "model": self.model,
+                "backend": self.backend,
+                "state": self.state,
+                "load_seconds": self.load_seconds,
+                "warmup_seconds": self.warmup_seconds,
+                "error": self.error,
+            }
+
+
+_loader: Optional[GeneratorLoader] = None
+_loader_lock = threading.Lock()
+
+
+def get_generator_loader() -> GeneratorLoader:
+    """
+    Returns the process-wide generator loader.
+    """
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                _loader = GeneratorLoader()
+    return _loader
+
+
+def preload(mode: str = GENERATOR_PRELOAD) -> GeneratorLoader:
+    """
+    Applies the configured preload mode to the process-wide loader.
+    """
+    loader = get_generator_loader()
+    if mode == "eager":
+        loader.load()
+    elif mode == "background":
+        loader.start()
+    return loader
+
+
+PARITY_PROMPTS = [
+    "Generate a job description for a developer role working on a Python web framework.",
+    "The project primarily uses Go, TypeScript and Rust. Responsibilities include",
+    "Preferred Qualifications: experience with distributed systems,",
+]
+
+
+def parity_check(model: str = GENERATOR_MODEL, backend: str = "int8", prompts: List[str] = PARITY_PROMPTS,
+                 max_new_tokens: int = 32, baseline: Optional[Callable] = None,
+                 candidate: Optional[Callable] = None) -> Dict[str, Any]:
+    """
+    Compares greedy generations of a backend with the fp32 torch baseline.
+
+    Args:
+        model: The checkpoint to compare
+        backend: The backend under test
+        prompts: Prompts to complete with both backends
+        max_new_tokens: Tokens generated per prompt
+        baseline: An already loaded torch pipeline (loaded from model if omitted)
+        candidate: An already loaded pipeline for the backend (loaded from model if omitted)
+
+    Returns:
+        Per-backend timings, the share of prompts with identical output and the mean
+        fraction of leading generated tokens both backends agree on
+    """
+    baseline = baseline or default_factory(model, "torch")
+    candidate = candidate or default_factory(model, backend)
+    generate_kwargs = {"max_new_tokens": max_new_tokens, "do_sample": False}
+
+    timings = {}
+    outputs = {}
+    for name, generator in (("torch", baseline), (backend, candidate)):
+        started = time.perf_counter()
+        outputs[name] = generate_batch(generator, prompts, **generate_kwargs)
+        timings[name] = time.perf_counter() - started
+
+    tokenizer = baseline.tokenizer
+    agreement = []
+    for prompt, expected, actual in zip(prompts, outputs["torch"], outputs[backend]):
+        offset = len(tokenizer(prompt)["input_ids"])
+        expected_ids = tokenizer(expected)["input_ids"][offset:]
+        actual_ids = tokenizer(actual)["input_ids"][offset:]
+        common = 0
+        for left, right in zip(expected_ids, actual_ids):
+            if left != right:
+                break
+            common += 1
+        agreement.append(common / max(len(expected_ids), 1))
+
+    return {
+        "backend": backend,
+        "seconds": timings,
+        "exact_match": sum(e == a for e, a in zip(outputs["torch"], outputs[backend])) / len(prompts),
+        "prefix_agreement": sum(agreement) / len(agreement),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check a generator backend against the fp32 baseline")
+    parser.add_argument("command", choices=["parity"])
+    parser.add_argument("--model", default=GENERATOR_MODEL)
+    parser.add_argument("--backend", choices=GENERATOR_BACKENDS, default="int8")
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    args = parser.parse_args()
+
+    print(json.dumps(parity_check(args.model, args.backend, max_new_tokens=args.max_new_tokens), indent=2))
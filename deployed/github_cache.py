@@ -0,0 +1,234 @@
+"""
+Persistent conditional-request cache for GitHub API responses.
+
+Responses carrying an ETag or Last-Modified header are stored in a SQLite file.
+The next request for the same URL is sent with If-None-Match / If-Modified-Since;
+GitHub answers 304 Not Modified without a body and without charging the request
+against the rate limit, and the stored body is served instead. Entries are kept
+per credential, so a body fetched with one token (which may be private to it) is
+never served to a request made with another.
+
+Inspect or purge the cache from the command line:
+
+    python github_cache.py stats
+    python github_cache.py list
+    python github_cache.py purge [url-prefix]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+GITHUB_CACHE_DIR = os.getenv("GITHUB_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "hiring_hacker"))
+GITHUB_CACHE_PATH = os.path.join(GITHUB_CACHE_DIR, "github_responses.sqlite3")
+GITHUB_CACHE_MAX_BYTES = int(os.getenv("GITHUB_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+class CachedResponse:
+    """
+    A stored GitHub response: validators plus the body needed to rebuild it.
+    """
+
+    def __init__(self, key: str, url: str, etag: Optional[str], last_modified: Optional[str],
+                 headers: Dict[str, str], body: bytes, encoding: Optional[str]):
+        self.key = key
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.headers = headers
+        self.body = body
+        self.encoding = encoding
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, not_modified: requests.Response) -> requests.Response:
+        """
+        Rebuilds a 200 response from the stored body and the headers of the 304 that validated it.
+        """
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response._content = self.body
+        response.encoding = self.encoding
+        response.url = self.url
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        response.headers = CaseInsensitiveDict(self.headers)
+        # Fresh rate-limit and validator headers come from the 304
+        response.headers.update(not_modified.headers)
+        response.from_cache = True
+        return response
+
+
+class ResponseCache:
+    """
+    A size-bounded, least-recently-used store of GitHub responses backed by SQLite.
+
+    The cache is shared by the worker threads of concurrent analyses, so all
+    access goes through a single connection guarded by a lock.
+    """
+
+    def __init__(self, path: str, max_bytes: int = GITHUB_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    encoding TEXT,
+                    size INTEGER NOT NULL,
+                    stored_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    @staticmethod
+    def key(url: str, accept: Optional[str] = None, token: Optional[str] = None) -> str:
+        # The same URL returns different representations for different media types and different
+        # data for different credentials; only a digest of the token is stored
+        credential = hashlib.sha256(token.encode("utf-8")).hexdigest()[:16] if token else "anonymous"
+        return f"{credential} {accept or ''} {url}"
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, etag, last_modified, headers, body, encoding FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        url, etag, last_modified, headers, body, encoding = row
+        return CachedResponse(key, url, etag, last_modified, json.loads(headers), bytes(body), encoding)
+
+    def store(self, key: str, response: requests.Response) -> None:
+        """
+        Stores a 200 response if it carries a validator the next request can send back.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        body = response.content
+        if len(body) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO responses
+                   (key, url, etag, last_modified, headers, body, encoding, size, stored_at, last_used, hits)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)""",
+                (key, response.url, etag, last_modified, json.dumps(dict(response.headers)), body,
+                 response.encoding, len(body), now, now),
+            )
+            self._evict()
+
+    def touch(self, key: str) -> None:
+        # Record a 304 revalidation: the entry becomes the most recently used
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key)
+            )
+
+    def _evict(self) -> None:
+        # Caller holds the lock; drop least recently used entries until under the size cap
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        Lists the cached entries, most recently used first (bodies omitted).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, etag, last_modified, size, stored_at, last_used, hits "
+                "FROM responses ORDER BY last_used DESC"
+            ).fetchall()
+        return [
+            {"url": url, "etag": etag, "last_modified": last_modified, "size": size,
+             "stored_at": stored_at, "last_used": last_used, "hits": hits}
+            for url, etag, last_modified, size, stored_at, last_used, hits in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total, hits = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM responses"
+            ).fetchone()
+        return {"path": self.path, "entries": count, "bytes": total, "max_bytes": self.max_bytes,
+                "revalidated_hits": hits}
+
+    def purge(self, url_prefix: Optional[str] = None) -> int:
+        """
+        Removes every entry, or only those whose URL starts with url_prefix.
+
+        Returns:
+            The number of entries removed
+        """
+        with self._lock, self._conn:
+            if url_prefix is None:
+                cursor = self._conn.execute("DELETE FROM responses")
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM responses WHERE substr(url, 1, ?) = ?", (len(url_prefix), url_prefix)
+                )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def default_cache() -> Optional[ResponseCache]:
+    """
+    Opens the cache configured by the environment, or returns None when GITHUB_CACHE=0.
+    """
+    if os.getenv("GITHUB_CACHE", "1") == "0":
+        return None
+    return ResponseCache(GITHUB_CACHE_PATH, GITHUB_CACHE_MAX_BYTES)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or purge the GitHub response cache")
+    parser.add_argument("command", choices=["stats", "list", "purge"])
+    parser.add_argument("prefix", nargs="?", help="Only purge URLs starting with this prefix")
+    args = parser.parse_args()
+
+    cache = ResponseCache(GITHUB_CACHE_PATH, GITHUB_CACHE_MAX_BYTES)
+    if args.command == "stats":
+        print(json.dumps(cache.stats(), indent=2))
+    elif args.command == "list":
+        for entry in cache.entries():
+            print(f"{entry['size']:>10}  {entry['hits']:>5} hits  {entry['url']}")
+    else:
+        print(f"Removed {cache.purge(args.prefix)} entries")
@@ -0,0 +1,199 @@
+"""
+Shared GitHub API client.
+
+Both the Streamlit analyzer (msf_blue_agents.py) and the Flask app (app.py) fetch
+GitHub data through the client returned by get_client(), so authentication,
+timeouts and connection pooling are configured in one place.
+"""
+import os
+import threading
+from typing import Optional
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from github_cache import ResponseCache, default_cache
+from github_ratelimit import RateLimitScheduler, tokens_from_env
+
+# Load environment variables
+load_dotenv()
+
+GITHUB_API_URL = "https://api.github.com"
+
+# Connection pool settings. pool_connections is the number of hosts kept alive
+# (api.github.com, codeload.github.com, ...), pool_maxsize the number of
+# keep-alive connections per host and should be at least the fetch concurrency.
+GITHUB_POOL_CONNECTIONS = int(os.getenv("GITHUB_POOL_CONNECTIONS", "4"))
+GITHUB_POOL_MAXSIZE = int(os.getenv("GITHUB_POOL_MAXSIZE", "16"))
+GITHUB_TIMEOUT = float(os.getenv("GITHUB_TIMEOUT", "15"))
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", "2"))
+
+
+class GitHubClient:
+    """
+    A thin wrapper around a pooled requests.Session for the GitHub REST API.
+
+    The session keeps TCP/TLS connections alive between calls, so consecutive
+    requests to api.github.com reuse an open connection instead of paying a new
+    handshake each time. The session is safe to share between the worker threads
+    of a single analysis. When a ResponseCache is attached, GET requests are
+    revalidated with ETags and unchanged payloads are served from disk; entries
+    are kept per token, so one credential's responses never answer another's.
+
+    Every request is authenticated with a token handed out by the
+    RateLimitScheduler, which rotates across the token pool and delays requests
+    while all tokens are exhausted. Requests rejected for rate limiting are
+    retried on the next available token.
+    """
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        pool_connections: int = GITHUB_POOL_CONNECTIONS,
+        pool_maxsize: int = GITHUB_POOL_MAXSIZE,
+        timeout: float = GITHUB_TIMEOUT,
+        max_retries: int = GITHUB_MAX_RETRIES,
+        base_url: str = GITHUB_API_URL,
+        cache: Optional[ResponseCache] = None,
+        scheduler: Optional[RateLimitScheduler] = None,
+        max_rate_limit_retries: int = 3,
+    ):
+        self.cache = cache
+        self.scheduler = scheduler or RateLimitScheduler([token])
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.timeout = timeout
+        self.base_url = base_url.rstrip("/")
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "hiring-hacker",
+        })
+
+        # Retry transient gateway errors and dropped connections, never 4xx responses
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD", "POST"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @property
+    def authenticated(self) -> bool:
+        return self.scheduler.authenticated
+
+    def url(self, path: str) -> str:
+        # Accept both absolute URLs (as returned in API payloads) and API paths
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request to the GitHub API.
+
+        Args:
+            path: An API path such as "/repos/owner/name" or an absolute URL
+            **kwargs: Extra arguments forwarded to requests.Session.get
+
+        Returns:
+            The requests.Response (a rebuilt 200 response when the cache revalidated it)
+        """
+        url = self.url(path)
+        kwargs.setdefault("timeout", self.timeout)
+        resource = "search" if "/search/" in url else "core"
+        # Streamed downloads and parameterised queries bypass the cache
+        if self.cache is None or kwargs.get("stream") or kwargs.get("params"):
+            return self._send("GET", url, resource, **kwargs)
+
+        accept = (kwargs.get("headers") or {}).get("Accept", self.session.headers.get("Accept"))
+        return self._send("GET", url, resource, cache_accept=accept, **kwargs)
+
+    def graphql(self, query: str, variables: Optional[dict] = None, **kwargs) -> requests.Response:
+        """
+        Sends a query to the GitHub GraphQL API (requires a token).
+
+        Args:
+            query: The GraphQL query document
+            variables: Values for the query variables
+            **kwargs: Extra arguments forwarded to requests.Session.post
+
+        Returns:
+            The requests.Response; GraphQL errors are reported in its "errors" payload
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self._send("POST", f"{self.base_url}/graphql", "graphql",
+                          json={"query": query, "variables": variables or {}}, **kwargs)
+
+    def _send(self, method: str, url: str, resource: str, cache_accept: Optional[str] = None,
+              **kwargs) -> requests.Response:
+        # Authenticate with a scheduled token and retry on another one when rate limited.
+        # With cache_accept the response is revalidated against the entry cached for that token.
+        headers = dict(kwargs.pop("headers", None) or {})
+        attempt = 0
+        while True:
+            token = self.scheduler.acquire(resource)
+            request_headers = dict(headers)
+            if token:
+                request_headers["Authorization"] = f"token {token}"
+            key = cached = None
+            if cache_accept is not None:
+                key = self.cache.key(url, cache_accept, token)
+                cached = self.cache.lookup(key)
+                if cached is not None:
+                    request_headers.update(cached.conditional_headers())
+            try:
+                response = self.session.request(method, url, headers=request_headers, **kwargs)
+            except BaseException:
+                self.scheduler.release(token, resource)
+                raise
+            limited = self.scheduler.update(token, response, resource)
+            if limited and attempt < self.max_rate_limit_retries:
+                attempt += 1
+                response.close()
+                continue
+            if key is not None:
+                if response.status_code == 304 and cached is not None:
+                    self.cache.touch(key)
+                    return cached.to_response(response)
+                if response.status_code == 200:
+                    self.cache.store(key, response)
+            return response
+
+    def close(self) -> None:
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_client: Optional[GitHubClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> GitHubClient:
+    """
+    Returns the process-wide GitHub client, creating it from the environment on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GitHubClient(cache=default_cache(), scheduler=RateLimitScheduler(tokens_from_env()))
+    return _client
+
+
+def set_client(client: Optional[GitHubClient]) -> None:
+    """
+    Replaces the process-wide GitHub client (None recreates it from the environment on next use).
+    """
+    global _client
+    with _client_lock:
+        if _client is not None and _client is not client:
+            _client.close()
+        _client = client
@@ -0,0 +1,225 @@
+"""
+Rate-limit-aware scheduling of GitHub requests across a pool of tokens.
+
+Every credential keeps a token bucket per rate-limit resource ("core", "graphql",
+"search", ...). GitHub resets its limits in fixed hourly windows, so a bucket is
+refilled to its limit at the reset time the API reports. Every request reserves
+one token up front so concurrent threads cannot overshoot the remaining budget;
+its response settles the reservation and resynchronises the budget from
+X-RateLimit-Remaining / Reset, so requests GitHub does not charge (such as 304
+revalidations) cost nothing. A 403/429 with Retry-After blocks the credential
+for the requested time.
+
+Requests pick the credential with the most budget left; when every credential
+is exhausted they wait for the earliest reset instead of failing. Interactive
+callers bound that wait with RateLimitScheduler.wait_at_most() so a request
+thread fails fast with RateLimitExceeded instead of blocking for minutes.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import requests
+
+GITHUB_RATE_LIMIT_MAX_WAIT = float(os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT", "900"))
+# Longest wait for a credential while a client waits on the response (web requests)
+GITHUB_RATE_LIMIT_INTERACTIVE_MAX_WAIT = float(os.getenv("GITHUB_RATE_LIMIT_INTERACTIVE_MAX_WAIT", "5"))
+
+# Hourly limits GitHub applies before the first response tells us otherwise
+AUTHENTICATED_LIMIT = 5000
+ANONYMOUS_LIMIT = 60
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when no credential will have budget left within the maximum wait.
+    """
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"GitHub rate limit exhausted for all tokens; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class _TokenBucket:
+    def __init__(self, limit: int):
+        self.limit = limit
+        # Budget left as of the last response; requests still in flight are reserved on top of it
+        self.remaining = limit
+        self.in_flight = 0
+        self.reset_at: Optional[float] = None
+        self.blocked_until = 0.0
+
+    @property
+    def available(self) -> int:
+        return self.remaining - self.in_flight
+
+    def refill(self, now: float) -> None:
+        if self.reset_at is not None and now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = None
+
+    def available_at(self, now: float) -> float:
+        # Earliest time this bucket can serve a request
+        self.refill(now)
+        if self.available <= 0 and self.reset_at is None:
+            # Exhausted without a known reset: probe again in a minute
+            self.reset_at = now + 60
+        ready = self.blocked_until
+        if self.available <= 0:
+            ready = max(ready, self.reset_at)
+        return max(ready, now)
+
+
+def tokens_from_env() -> List[Optional[str]]:
+    """
+    Reads the token pool from GITHUB_TOKENS (comma-separated), falling back to GITHUB_TOKEN.
+    An empty pool means anonymous access.
+    """
+    tokens = [token.strip() for token in os.getenv("GITHUB_TOKENS", "").split(",") if token.strip()]
+    if not tokens and os.getenv("GITHUB_TOKEN"):
+        tokens = [os.getenv("GITHUB_TOKEN")]
+    return tokens or [None]
+
+
+class RateLimitScheduler:
+    """
+    Hands out credentials for GitHub requests while staying inside every token's rate limit.
+    """
+
+    def __init__(self, tokens: List[Optional[str]], max_wait: float = GITHUB_RATE_LIMIT_MAX_WAIT):
+        self.tokens = list(tokens) or [None]
+        self.max_wait = max_wait
+        self._buckets: Dict[tuple, _TokenBucket] = {}
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        self.waits = 0
+        self.rate_limited = 0
+
+    @property
+    def authenticated(self) -> bool:
+        return any(self.tokens)
+
+    def _bucket(self, token: Optional[str], resource: str) -> _TokenBucket:
+        key = (token, resource)
+        if key not in self._buckets:
+            self._buckets[key] = _TokenBucket(AUTHENTICATED_LIMIT if token else ANONYMOUS_LIMIT)
+        return self._buckets[key]
+
+    @contextmanager
+    def wait_at_most(self, max_wait: float):
+        """
+        Bounds how long acquire() waits for a credential in the calling thread while the block runs.
+        """
+        previous = getattr(self._local, "max_wait", None)
+        self._local.max_wait = max_wait if previous is None else min(previous, max_wait)
+        try:
+            yield
+        finally:
+            self._local.max_wait = previous
+
+    def acquire(self, resource: str = "core") -> Optional[str]:
+        """
+        Reserves one request on the credential with the most budget left, waiting if all are exhausted.
+
+        Args:
+            resource: The rate-limit resource the request is charged to
+
+        Returns:
+            The token to authenticate with (None for anonymous access)
+
+        Raises:
+            RateLimitExceeded: If no credential frees up within max_wait seconds (or the wait_at_most() bound)
+        """
+        max_wait = getattr(self._local, "max_wait", None)
+        give_up_at = time.time() + (self.max_wait if max_wait is None else min(self.max_wait, max_wait))
+        with self._condition:
+            while True:
+                now = time.time()
+                ready = [token for token in self.tokens if self._bucket(token, resource).available_at(now) <= now]
+                if ready:
+                    token = max(ready, key=lambda t: self._bucket(t, resource).available)
+                    self._bucket(token, resource).in_flight += 1
+                    return token
+
+                next_ready = min(self._bucket(token, resource).available_at(now) for token in self.tokens)
+                if next_ready > give_up_at:
+                    raise RateLimitExceeded(next_ready - now)
+                self.waits += 1
+                self._condition.wait(timeout=next_ready - now)
+
+    def update(self, token: Optional[str], response: requests.Response, resource: str = "core") -> bool:
+        """
+        Settles the request's reservation and synchronises the bucket with the rate-limit headers of its response.
+
+        Without headers the request is charged locally, unless it was a 304, which GitHub does not charge.
+
+        Returns:
+            True if the response was rejected for rate limiting and the request should be retried
+        """
+        headers = response.headers
+        now = time.time()
+        with self._condition:
+            reserved = self._bucket(token, resource)
+            reserved.in_flight = max(0, reserved.in_flight - 1)
+            # GitHub may charge the request to another resource than the one it was reserved on
+            # (X-RateLimit-Resource); the headers describe that resource's budget
+            bucket = self._bucket(token, headers.get("X-RateLimit-Resource", resource))
+            if headers.get("X-RateLimit-Limit"):
+                bucket.limit = int(headers["X-RateLimit-Limit"])
+            new_window = False
+            if headers.get("X-RateLimit-Reset"):
+                reset_at = float(headers["X-RateLimit-Reset"])
+                new_window = bucket.reset_at is not None and reset_at > bucket.reset_at
+                bucket.reset_at = reset_at
+            if headers.get("X-RateLimit-Remaining"):
+                remaining = int(headers["X-RateLimit-Remaining"])
+                # Within a window the budget only shrinks; a higher value is a response that arrived out of order
+                bucket.remaining = remaining if new_window else min(bucket.remaining, remaining)
+            elif response.status_code != 304:
+                bucket.remaining -= 1
+
+            limited = response.status_code in (403, 429) and (
+                headers.get("Retry-After") is not None or headers.get("X-RateLimit-Remaining") == "0"
+            )
+            if limited:
+                self.rate_limited += 1
+                # Retries reserve on the original resource again, so it is held back as well
+                for limited_bucket in {id(reserved): reserved, id(bucket): bucket}.values():
+                    if headers.get("Retry-After"):
+                        limited_bucket.blocked_until = now + float(headers["Retry-After"])
+                    else:
+                        limited_bucket.remaining = 0
+                        limited_bucket.reset_at = bucket.reset_at
+            self._condition.notify_all()
+        return limited
+
+    def release(self, token: Optional[str], resource: str = "core") -> None:
+        """
+        Settles the reservation of a request that failed without a response, charging it in case it reached GitHub.
+        """
+        with self._condition:
+            bucket = self._bucket(token, resource)
+            bucket.in_flight = max(0, bucket.in_flight - 1)
+            bucket.remaining -= 1
+            self._condition.notify_all()
+
+    def status(self) -> List[Dict[str, Any]]:
+        """
+        Reports the known budget of every credential and resource (tokens are masked).
+        """
+        now = time.time()
+        with self._condition:
+            return [
+                {
+                    "token": f"...{token[-4:]}" if token else "anonymous",
+                    "resource": resource,
+                    "limit": bucket.limit,
+                    "remaining": bucket.remaining,
+                    "in_flight": bucket.in_flight,
+                    "reset_in": max(0.0, bucket.reset_at - now) if bucket.reset_at else None,
+                    "blocked_for": max(0.0, bucket.blocked_until - now),
+                }
+                for (token, resource), bucket in self._buckets.items()
+            ]
@@ -0,0 +1,44 @@
+"""
+Core library behind the Streamlit app (msf_blue_agents.py), the Flask app (app.py) and batch_analyze.py.
+
+    analyzer         fetches a repository and renders the analysis report
+    formatter        renders analysis results as Markdown
+    crew             builds and runs the agent crews that work from the report
+    repository       the Flask app's lightweight repository lookup
+    job_description  the Flask app's job description prompt and completion checks
+
+Importing the package or any of its modules has no side effects and loads
+neither crewai nor Streamlit; the crew module imports crewai when it first
+builds an LLM, agent or crew. The names below are exported lazily, so
+"from hiring_hacker import analyze_github_repo" only loads the analyzer.
+`python -m hiring_hacker` reports what each module costs to import.
+
+The package is not installed on its own: it imports the service modules next
+to it (github_client, github_ratelimit, result_cache, and for the crew
+search_index and crew_memory) as top-level modules, so the deployed/ directory
+must be on sys.path, as it is when the apps, the batch CLI or the tests are
+run from there or with PYTHONPATH=deployed.
+"""
+import importlib
+
+_EXPORTS = {
+    "RepoAnalysisError": "analyzer",
+    "analyze_github_repo": "analyzer",
+    "cached_analyze_github_repo": "analyzer",
+    "fetch_repo_data": "analyzer",
+    "parse_repo_url": "analyzer",
+    "format_repo_analysis": "formatter",
+    "STAGES": "crew",
+    "build_crew": "crew",
+    "run_pipeline": "crew",
+    "analyze_repository": "repository",
+    "extract_repo_info": "repository",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
@@ -0,0 +1,82 @@
+"""
+Reports what importing each module costs.
+
+Every module is imported in a fresh interpreter, so the numbers are cold import
+times and do not depend on what was imported before. Heavy dependencies that
+the import pulled in are listed next to the time.
+
+    python -m hiring_hacker
+    python -m hiring_hacker hiring_hacker.crew batch_analyze --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+MODULES = [
+    "hiring_hacker",
+    "hiring_hacker.formatter",
+    "hiring_hacker.analyzer",
+    "hiring_hacker.repository",
+    "hiring_hacker.job_description",
+    "hiring_hacker.crew",
+    "batch_analyze",
+]
+# The directory holding the package and the modules it imports (github_client, result_cache, ...)
+DEPLOYED_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["crewai", "crewai_tools", "streamlit", "chromadb", "lancedb", "github", "transformers", "torch", "flask"]
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+__import__(sys.argv[1])
+seconds = time.perf_counter() - started
+print(json.dumps({"seconds": seconds, "heavy": [name for name in sys.argv[2:] if name in sys.modules]}))
+"""
+
+
+def measure(module: str, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Imports a module in repeat fresh interpreters.
+
+    Returns:
+        The median import time in seconds and the heavy modules the import loaded
+    """
+    runs = []
+    for _ in range(max(1, repeat)):
+        completed = subprocess.run([sys.executable, "-c", _PROBE, module, *HEAVY_MODULES],
+                                   capture_output=True, text=True, check=True, cwd=DEPLOYED_DIR)
+        # Entry points may print while importing; the probe's line is the last one
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return {"module": module, "seconds": statistics.median(run["seconds"] for run in runs), "heavy": runs[-1]["heavy"]}
+
+
+def report(modules: List[str], repeat: int = 3) -> List[Dict[str, Any]]:
+    results = []
+    for module in modules:
+        try:
+            results.append(measure(module, repeat))
+        except subprocess.CalledProcessError as e:
+            results.append({"module": module, "error": e.stderr.strip().splitlines()[-1] if e.stderr else str(e)})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the cold import time of modules")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=3, help="Imports per module; the median is reported")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    results = report(args.modules, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            if "error" in result:
+                print(f"{result['module']:<32} failed: {result['error']}")
+            else:
+                print(f"{result['module']:<32} {result['seconds'] * 1000:8.0f} ms  {', '.join(result['heavy']) or '-'}")
@@ -0,0 +1,741 @@
+"""
+Repository analysis: fetches a GitHub repository's data and renders the report the agents work from.
+
+Only the GitHub client, its rate limiter and the result cache are imported, so
+batch workers and tests can use the analyzer without loading crewai or Streamlit.
+"""
+import base64
+import os
+import posixpath
+import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, Optional
+
+from github_client import get_client
+from github_ratelimit import RateLimitExceeded
+from hiring_hacker.formatter import PARTIAL_REPORT_NOTE, format_repo_analysis
+from result_cache import get_analysis_cache
+
+# Concurrency settings for the GitHub fetches in analyze_github_repo.
+# A concurrency of 1 keeps the original one-request-after-another behaviour.
+GITHUB_FETCH_CONCURRENCY = int(os.getenv("GITHUB_FETCH_CONCURRENCY", "8"))
+GITHUB_FETCH_DEADLINE = float(os.getenv("GITHUB_FETCH_DEADLINE", "60"))
+
+CODE_FILE_EXTENSIONS = (".py", ".js", ".java", ".cpp", ".go", ".ts", ".rb")
+PACKAGE_FILES = ["package.json", "requirements.txt", "Gemfile", "pom.xml", "build.gradle"]
+MAX_CODE_SAMPLES = 3
+
+# Which fetch backend analyze_github_repo uses by default: "rest", "graphql" or "tarball"
+GITHUB_FETCH_BACKEND = os.getenv("GITHUB_FETCH_BACKEND", "rest")
+
+RATE_LIMIT_MESSAGE = "API rate limit exceeded. Please try again later or provide a GitHub token."
+
+class RepoAnalysisError(Exception):
+    """
+    Raised by the fetch backends with a message meant to be shown to the user as is.
+    """
+
+def _request(client, target, deadline: Optional[float] = None):
+    # A target is either a URL to GET or a callable issuing its own request (taking a timeout keyword)
+    if deadline is None:
+        return target() if callable(target) else client.get(target)
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("The analysis deadline passed before the request started")
+    # Neither the wait for a token nor the request may outlive the deadline, so a request
+    # _fetch_all stopped waiting for ends soon after it instead of holding a reservation
+    timeout = min(client.timeout, remaining)
+    with client.scheduler.wait_at_most(remaining):
+        return target(timeout=timeout) if callable(target) else client.get(target, timeout=timeout)
+
+def _fetch_all(urls: Dict[str, Any], max_workers: int, deadline: Optional[float]) -> Dict[str, Any]:
+    """
+    Fetches a batch of GitHub API URLs, either one after another or through a thread pool.
+    
+    Args:
+        urls: Mapping of result key to the URL to GET, or to a callable issuing the request
+        max_workers: Maximum number of requests in flight; 1 fetches sequentially
+        deadline: time.monotonic() value after which outstanding requests are abandoned; no request
+            (nor its wait for a rate-limit token) is allowed to run much past it
+        
+    Returns:
+        A mapping of result key to response, or None when the request failed or missed the deadline
+    """
+    client = get_client()
+    responses = {}
+    if max_workers <= 1 or len(urls) <= 1:
+        for key, url in urls.items():
+            if deadline is not None and time.monotonic() >= deadline:
+                responses[key] = None
+                continue
+            try:
+                responses[key] = _request(client, url, deadline)
+            except RateLimitExceeded:
+                raise RepoAnalysisError(RATE_LIMIT_MESSAGE)
+            except Exception:
+                responses[key] = None
+        return responses
+    
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(urls)))
+    try:
+        futures = {key: executor.submit(_request, client, url, deadline) for key, url in urls.items()}
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        wait(futures.values(), timeout=timeout)
+    finally:
+        # Requests not started are cancelled; those still running end by their own timeout shortly after the deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    for key, future in futures.items():
+        if future.done() and not future.cancelled() and future.exception() is None:
+            responses[key] = future.result()
+        elif future.done() and not future.cancelled() and isinstance(future.exception(), RateLimitExceeded):
+            # Every token stayed exhausted for longer than the scheduler is willing to wait
+            raise RepoAnalysisError(RATE_LIMIT_MESSAGE)
+        else:
+            responses[key] = None
+    return responses
+
+def _json_or_default(response, default):
+    # Only successful responses carry usable payloads
+    if response is None or response.status_code != 200:
+        return default
+    return response.json()
+
+def _decode_file_content(response) -> Optional[str]:
+    # Decode the base64 payload of a /contents response; None if there is nothing to decode
+    payload = _json_or_default(response, {})
+    if not isinstance(payload, dict) or "content" not in payload:
+        return None
+    return base64.b64decode(payload["content"]).decode("utf-8")
+
+def _repo_error(response, owner: str, repo_name: str) -> Optional[str]:
+    # Translate a failed repository metadata request into the user-facing error message
+    if response is None:
+        return "Error analyzing repository: GitHub did not respond before the analysis deadline"
+    if response.status_code == 404:
+        return f"Repository not found: {owner}/{repo_name}"
+    if response.status_code == 403:
+        return RATE_LIMIT_MESSAGE
+    if response.status_code != 200:
+        return f"Error accessing repository: {response.status_code} - {response.text}"
+    return None
+
+def _compile_repo_data(responses: Dict[str, Any], sample_responses: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Builds the analysis result dictionary from the fetched GitHub API responses.
+    
+    Args:
+        responses: Responses keyed by endpoint ("repo", "languages", "readme", "contributors",
+            "contents" and "package:<file name>")
+        sample_responses: Responses for the sampled code files, keyed by file name
+        
+    Returns:
+        The analysis result dictionary consumed by format_repo_analysis
+    """
+    repo_data = responses["repo"].json()
+    
+    # Get basic repository information
+    repo_info = {
+        "name": repo_data.get("name", "Unknown"),
+        "description": repo_data.get("description", "No description"),
+        "stars": repo_data.get("stargazers_count", 0),
+        "forks": repo_data.get("forks_count", 0),
+        "watchers": repo_data.get("watchers_count", 0),
+        "open_issues": repo_data.get("open_issues_count", 0),
+        "created_at": repo_data.get("created_at", "Unknown"),
+        "updated_at": repo_data.get("updated_at", "Unknown"),
+        "license": (repo_data.get("license") or {}).get("name", "No license information")
+    }
+    
+    # Calculate language percentages
+    languages = _json_or_default(responses.get("languages"), {})
+    total_bytes = sum(languages.values()) if languages else 1  # Avoid division by zero
+    language_percentages = {lang: f"{(bytes_count/total_bytes)*100:.1f}%" 
+                           for lang, bytes_count in languages.items()}
+    
+    # Get README content
+    readme_content = "README not found"
+    try:
+        decoded_readme = _decode_file_content(responses.get("readme"))
+        if decoded_readme is not None:
+            readme_content = decoded_readme
+    except Exception as e:
+        readme_content = f"Error decoding README: {str(e)}"
+    
+    # Get contributors
+    contributors = _json_or_default(responses.get("contributors"), [])
+    contributor_count = len(contributors) if isinstance(contributors, list) else 0
+    
+    # Get top contributors
+    top_contributors = []
+    if isinstance(contributors, list) and contributors:
+        for contributor in contributors[:5]:  # Get top 5 contributors
+            top_contributors.append({
+                "login": contributor.get("login", "Unknown"),
+                "contributions": contributor.get("contributions", 0)
+            })
+    
+    # Analyze directory structure
+    contents = _json_or_default(responses.get("contents"), [])
+    directories = []
+    files_by_type = {}
+    
+    if isinstance(contents, list):
+        for item in contents:
+            if item.get("type") == "dir":
+                directories.append(item.get("name"))
+            elif item.get("type") == "file":
+                file_ext = os.path.splitext(item.get("name", ""))[1].lower()
+                if file_ext:
+                    files_by_type[file_ext] = files_by_type.get(file_ext, 0) + 1
+    
+    # Sampled code files, in the order they appear in the listing
+    code_samples = []
+    for filename, file_response in sample_responses.items():
+        try:
+            decoded_content = _decode_file_content(file_response)
+        except Exception as e:
+            code_samples.append({
+                "filename": filename,
+                "content": f"Error decoding content: {str(e)}"
+            })
+            continue
+        if decoded_content is not None:
+            code_samples.append({
+                "filename": filename,
+                "content": decoded_content[:1000] + "..." if len(decoded_content) > 1000 else decoded_content
+            })
+    
+    # Get dependencies from package files
+    dependencies = {}
+    for package_file in PACKAGE_FILES:
+        try:
+            decoded_content = _decode_file_content(responses.get(f"package:{package_file}"))
+        except Exception:
+            continue
+        if decoded_content is not None:
+            dependencies[package_file] = decoded_content
+    
+    # Compile the results; requests that failed or missed the deadline leave the result partial
+    return {
+        "partial": any(response is None for response in [*responses.values(), *sample_responses.values()]),
+        "name": repo_info["name"],
+        "description": repo_info["description"],
+        "stars": repo_info["stars"],
+        "forks": repo_info["forks"],
+        "watchers": repo_info["watchers"],
+        "open_issues": repo_info["open_issues"],
+        "languages": language_percentages,
+        "contributors": contributor_count,
+        "top_contributors": top_contributors,
+        "directories": directories,
+        "files_by_type": files_by_type,
+        "dependencies": dependencies,
+        "readme": readme_content,
+        "code_samples": code_samples,
+        "created_at": repo_info["created_at"],
+        "updated_at": repo_info["updated_at"],
+        "license": repo_info["license"]
+    }
+
+def _fetch_rest(owner: str, repo_name: str, max_workers: int, deadline_at: Optional[float]) -> Dict[str, Any]:
+    """
+    Collects the analysis result through the GitHub REST API.
+    
+    Args:
+        owner: Repository owner
+        repo_name: Repository name
+        max_workers: Maximum number of concurrent requests; 1 fetches sequentially
+        deadline_at: time.monotonic() value after which outstanding requests are abandoned
+        
+    Returns:
+        The analysis result dictionary
+    """
+    api_url = f"https://api.github.com/repos/{owner}/{repo_name}"
+    
+    primary = {"repo": api_url}
+    secondary = {
+        "languages": f"{api_url}/languages",
+        "readme": f"{api_url}/readme",
+        "contributors": f"{api_url}/contributors",
+        "contents": f"{api_url}/contents",
+    }
+    for package_file in PACKAGE_FILES:
+        secondary[f"package:{package_file}"] = f"{api_url}/contents/{package_file}"
+    
+    if max_workers > 1:
+        # Fire everything at once; the extra requests are wasted only when the repo does not exist
+        responses = _fetch_all({**primary, **secondary}, max_workers, deadline_at)
+        error = _repo_error(responses["repo"], owner, repo_name)
+        if error:
+            raise RepoAnalysisError(error)
+    else:
+        responses = _fetch_all(primary, max_workers, deadline_at)
+        error = _repo_error(responses["repo"], owner, repo_name)
+        if error:
+            raise RepoAnalysisError(error)
+        responses.update(_fetch_all(secondary, max_workers, deadline_at))
+    
+    # Sample some code files for analysis (needs the contents listing first)
+    contents = _json_or_default(responses.get("contents"), [])
+    sample_urls = {}
+    if isinstance(contents, list):
+        for item in contents:
+            if item.get("type") == "file" and item.get("name", "").endswith(CODE_FILE_EXTENSIONS):
+                sample_urls[item.get("name", "Unknown")] = item.get("url", "")
+                if len(sample_urls) >= MAX_CODE_SAMPLES:
+                    break
+    sample_responses = _fetch_all(sample_urls, max_workers, deadline_at)
+    
+    return _compile_repo_data(responses, sample_responses)
+
+# Repository snapshot for the GraphQL backend. Manifest blobs are requested under
+# aliases (manifest0, manifest1, ...) in the order of PACKAGE_FILES.
+GRAPHQL_SNAPSHOT_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    name
+    description
+    stargazerCount
+    forkCount
+    issues(states: OPEN) { totalCount }
+    pullRequests(states: OPEN) { totalCount }
+    createdAt
+    updatedAt
+    licenseInfo { name }
+    languages(first: 100, orderBy: {field: SIZE, direction: DESC}) { edges { size node { name } } }
+    root: object(expression: "HEAD:") { ... on Tree { entries { name type mode } } }
+%s
+  }
+}
+""" % "\n".join(
+    f'    manifest{index}: object(expression: "HEAD:{package_file}") {{ ... on Blob {{ text }} }}'
+    for index, package_file in enumerate(PACKAGE_FILES)
+)
+
+GIT_SYMLINK_MODE = 0o120000
+
+def _graphql_blobs_query(count: int) -> str:
+    # Second round trip: README and code sample blobs, addressed by "HEAD:<path>" variables
+    params = "".join(f", $path{index}: String!" for index in range(count))
+    blobs = "\n".join(
+        f"    blob{index}: object(expression: $path{index}) {{ ... on Blob {{ text }} }}" for index in range(count)
+    )
+    return f"query($owner: String!, $name: String!{params}) {{\n  repository(owner: $owner, name: $name) {{\n{blobs}\n  }}\n}}"
+
+def _graphql_data(response, owner: str, repo_name: str) -> Dict[str, Any]:
+    # Unwrap a GraphQL response into its repository object, mapping errors to the REST messages
+    error = _repo_error(response, owner, repo_name)
+    if error:
+        raise RepoAnalysisError(error)
+    payload = response.json()
+    errors = payload.get("errors") or []
+    if any(e.get("type") == "NOT_FOUND" for e in errors):
+        raise RepoAnalysisError(f"Repository not found: {owner}/{repo_name}")
+    if any(e.get("type") == "RATE_LIMITED" for e in errors):
+        raise RepoAnalysisError(RATE_LIMIT_MESSAGE)
+    repository = (payload.get("data") or {}).get("repository")
+    if repository is None:
+        messages = "; ".join(e.get("message", "") for e in errors)
+        raise RepoAnalysisError(f"Error accessing repository: {messages or 'empty GraphQL response'}")
+    return repository
+
+def _blob_text(blob) -> Optional[str]:
+    # Missing paths and binary blobs come back as null or without text
+    return blob.get("text") if isinstance(blob, dict) else None
+
+def _fetch_graphql(owner: str, repo_name: str, max_workers: int, deadline_at: Optional[float]) -> Dict[str, Any]:
+    """
+    Collects the same analysis result as _fetch_rest with two GitHub GraphQL queries.
+    
+    The first query returns metadata, languages, license, the root tree and the dependency
+    manifests; the second fetches the README and code sample blobs it identified. GraphQL has
+    no contributors connection, so that single REST call runs alongside the first query.
+    
+    Args:
+        owner: Repository owner
+        repo_name: Repository name
+        max_workers: Maximum number of concurrent requests; 1 fetches sequentially
+        deadline_at: time.monotonic() value after which outstanding requests are abandoned
+        
+    Returns:
+        The analysis result dictionary
+    """
+    if not get_client().authenticated:
+        raise RepoAnalysisError("The GraphQL backend requires a GitHub token (GITHUB_TOKEN or GITHUB_TOKENS).")
+    
+    client = get_client()
+    variables = {"owner": owner, "name": repo_name}
+    responses = _fetch_all({
+        "snapshot": lambda **kwargs: client.graphql(GRAPHQL_SNAPSHOT_QUERY, variables, **kwargs),
+        "contributors": f"https://api.github.com/repos/{owner}/{repo_name}/contributors",
+    }, max_workers, deadline_at)
+    repository = _graphql_data(responses["snapshot"], owner, repo_name)
+    
+    # Root tree, mapped onto the type names of the REST contents listing
+    directories = []
+    files_by_type = {}
+    file_names = []
+    entries = (repository.get("root") or {}).get("entries") or []
+    for entry in entries:
+        if entry.get("type") == "tree":
+            directories.append(entry.get("name"))
+        elif entry.get("type") in ("blob", "commit") and entry.get("mode") != GIT_SYMLINK_MODE:
+            file_names.append(entry.get("name", ""))
+            file_ext = os.path.splitext(entry.get("name", ""))[1].lower()
+            if file_ext:
+                files_by_type[file_ext] = files_by_type.get(file_ext, 0) + 1
+    
+    readme_names = [name for name in file_names if name.lower().startswith("readme")]
+    sample_names = [name for name in file_names if name.endswith(CODE_FILE_EXTENSIONS)][:MAX_CODE_SAMPLES]
+    blob_paths = readme_names[:1] + sample_names
+    blobs = {}
+    partial = responses["contributors"] is None
+    if blob_paths:
+        blob_variables = dict(variables)
+        for index, path in enumerate(blob_paths):
+            blob_variables[f"path{index}"] = f"HEAD:{path}"
+        blob_response = _fetch_all({
+            "blobs": lambda **kwargs: client.graphql(_graphql_blobs_query(len(blob_paths)), blob_variables, **kwargs),
+        }, max_workers, deadline_at)["blobs"]
+        try:
+            blob_data = _graphql_data(blob_response, owner, repo_name)
+            blobs = {path: _blob_text(blob_data.get(f"blob{index}")) for index, path in enumerate(blob_paths)}
+        except RepoAnalysisError:
+            blobs = {}
+            partial = True
+    
+    readme_content = "README not found"
+    if readme_names and blobs.get(readme_names[0]) is not None:
+        readme_content = blobs[readme_names[0]]
+    
+    code_samples = []
+    for filename in sample_names:
+        content = blobs.get(filename)
+        if content is not None:
+            code_samples.append({
+                "filename": filename,
+                "content": content[:1000] + "..." if len(content) > 1000 else content
+            })
+    
+    dependencies = {}
+    for index, package_file in enumerate(PACKAGE_FILES):
+        content = _blob_text(repository.get(f"manifest{index}"))
+        if content is not None:
+            dependencies[package_file] = content
+    
+    # Calculate language percentages
+    languages = {edge["node"]["name"]: edge["size"] for edge in (repository.get("languages") or {}).get("edges", [])}
+    total_bytes = sum(languages.values()) if languages else 1  # Avoid division by zero
+    language_percentages = {lang: f"{(bytes_count/total_bytes)*100:.1f}%" 
+                           for lang, bytes_count in languages.items()}
+    
+    contributors = _json_or_default(responses.get("contributors"), [])
+    contributor_count = len(contributors) if isinstance(contributors, list) else 0
+    top_contributors = []
+    if isinstance(contributors, list) and contributors:
+        for contributor in contributors[:5]:  # Get top 5 contributors
+            top_contributors.append({
+                "login": contributor.get("login", "Unknown"),
+                "contributions": contributor.get("contributions", 0)
+            })
+    
+    # The REST API reports stargazers as watchers_count and counts open pull requests as open issues
+    return {
+        "partial": partial,
+        "name": repository.get("name", "Unknown"),
+        "description": repository.get("description", "No description"),
+        "stars": repository.get("stargazerCount", 0),
+        "forks": repository.get("forkCount", 0),
+        "watchers": repository.get("stargazerCount", 0),
+        "open_issues": repository["issues"]["totalCount"] + repository["pullRequests"]["totalCount"],
+        "languages": language_percentages,
+        "contributors": contributor_count,
+        "top_contributors": top_contributors,
+        "directories": directories,
+        "files_by_type": files_by_type,
+        "dependencies": dependencies,
+        "readme": readme_content,
+        "code_samples": code_samples,
+        "created_at": repository.get("createdAt", "Unknown"),
+        "updated_at": repository.get("updatedAt", "Unknown"),
+        "license": (repository.get("licenseInfo") or {}).get("name", "No license information")
+    }
+
+# Budgets for the tarball backend: compressed bytes downloaded and files examined
+GITHUB_TARBALL_MAX_BYTES = int(os.getenv("GITHUB_TARBALL_MAX_BYTES", str(100 * 1024 * 1024)))
+GITHUB_TARBALL_MAX_FILES = int(os.getenv("GITHUB_TARBALL_MAX_FILES", "20000"))
+MAX_TARBALL_DIRECTORIES = 100
+MAX_TARBALL_MANIFESTS = 20
+MAX_MANIFEST_BYTES = 64 * 1024
+MAX_SAMPLE_BYTES = 4096
+
+class _TarballBudgetExceeded(Exception):
+    pass
+
+class _BudgetedStream:
+    """
+    A read-only file object over the raw HTTP stream that stops after max_bytes.
+    """
+    def __init__(self, raw, max_bytes: int):
+        self.raw = raw
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+    
+    def read(self, size=-1):
+        if self.bytes_read >= self.max_bytes:
+            raise _TarballBudgetExceeded()
+        if size is None or size < 0:
+            size = self.max_bytes - self.bytes_read
+        chunk = self.raw.read(min(size, self.max_bytes - self.bytes_read))
+        self.bytes_read += len(chunk)
+        return chunk
+
+def _walk_tarball(owner: str, repo_name: str, deadline_at: Optional[float],
+                  max_bytes: int = GITHUB_TARBALL_MAX_BYTES, max_files: int = GITHUB_TARBALL_MAX_FILES) -> Optional[Dict[str, Any]]:
+    """
+    Streams the repository tarball once and summarizes the whole tree without writing it to disk.
+    
+    Only the members needed for the report (README, dependency manifests, the first code samples)
+    are read, each capped to a few kilobytes, so memory use does not grow with the repository.
+    
+    Args:
+        owner: Repository owner
+        repo_name: Repository name
+        deadline_at: time.monotonic() value after which the walk stops
+        max_bytes: Maximum number of compressed bytes to download
+        max_files: Maximum number of files to examine
+        
+    Returns:
+        The tree summary, or None when the tarball could not be downloaded
+    """
+    response = get_client().get(f"https://api.github.com/repos/{owner}/{repo_name}/tarball", stream=True)
+    if response.status_code != 200:
+        response.close()
+        return None
+    
+    summary = {
+        "directories": [],
+        "files_by_type": {},
+        "dependencies": {},
+        "readme": None,
+        "code_samples": [],
+        "truncated": False,
+        # Cut short by the deadline or a failed stream rather than by the budgets
+        "partial": False,
+    }
+    files_seen = 0
+    response.raw.decode_content = True
+    stream = _BudgetedStream(response.raw, max_bytes)
+    try:
+        with tarfile.open(fileobj=stream, mode="r|*") as archive:
+            for member in archive:
+                if deadline_at is not None and time.monotonic() >= deadline_at:
+                    summary["truncated"] = summary["partial"] = True
+                    break
+                if files_seen >= max_files:
+                    summary["truncated"] = True
+                    break
+                # Members are prefixed with "<owner>-<repo>-<sha>/"
+                path = member.name.split("/", 1)[1] if "/" in member.name else ""
+                if not path:
+                    continue
+                if member.isdir():
+                    if len(summary["directories"]) < MAX_TARBALL_DIRECTORIES:
+                        summary["directories"].append(path.rstrip("/"))
+                    continue
+                if not member.isfile():
+                    continue
+                
+                files_seen += 1
+                filename = posixpath.basename(path)
+                file_ext = os.path.splitext(filename)[1].lower()
+                if file_ext:
+                    summary["files_by_type"][file_ext] = summary["files_by_type"].get(file_ext, 0) + 1
+                
+                if filename in PACKAGE_FILES and len(summary["dependencies"]) < MAX_TARBALL_MANIFESTS:
+                    summary["dependencies"][path] = archive.extractfile(member).read(MAX_MANIFEST_BYTES).decode("utf-8", errors="replace")
+                elif "/" not in path and filename.lower().startswith("readme") and summary["readme"] is None:
+                    summary["readme"] = archive.extractfile(member).read(MAX_MANIFEST_BYTES).decode("utf-8", errors="replace")
+                elif filename.endswith(CODE_FILE_EXTENSIONS) and len(summary["code_samples"]) < MAX_CODE_SAMPLES:
+                    content = archive.extractfile(member).read(MAX_SAMPLE_BYTES).decode("utf-8", errors="replace")
+                    summary["code_samples"].append({
+                        "filename": path,
+                        "content": content[:1000] + "..." if len(content) > 1000 else content
+                    })
+    except _TarballBudgetExceeded:
+        summary["truncated"] = True
+    except Exception:
+        # A cut-off or failed stream still leaves everything read so far usable
+        summary["truncated"] = summary["partial"] = True
+    finally:
+        response.close()
+    return summary
+
+def _fetch_tarball(owner: str, repo_name: str, max_workers: int, deadline_at: Optional[float]) -> Dict[str, Any]:
+    """
+    Collects the analysis result from the repository metadata and one streamed tarball.
+    
+    Unlike the REST and GraphQL backends, which only see the root listing, files by type,
+    directories, manifests and code samples cover the whole tree (within the tarball budgets).
+    The walk is not abandoned at the deadline like the other requests: it stops there by itself
+    and what it has read so far is reported as truncated. Without a tarball the report has the
+    metadata and the REST README only, and is marked truncated too.
+    
+    Args:
+        owner: Repository owner
+        repo_name: Repository name
+        max_workers: Maximum number of concurrent requests; 1 fetches sequentially
+        deadline_at: time.monotonic() value after which outstanding requests are abandoned
+        
+    Returns:
+        The analysis result dictionary
+    """
+    api_url = f"https://api.github.com/repos/{owner}/{repo_name}"
+    walk = None
+    if max_workers > 1:
+        executor = ThreadPoolExecutor(max_workers=1)
+        walk = executor.submit(_walk_tarball, owner, repo_name, deadline_at)
+        executor.shutdown(wait=False)
+    responses = _fetch_all({
+        "repo": api_url,
+        "languages": f"{api_url}/languages",
+        "contributors": f"{api_url}/contributors",
+    }, max_workers, deadline_at)
+    error = _repo_error(responses["repo"], owner, repo_name)
+    if error:
+        raise RepoAnalysisError(error)
+    
+    try:
+        tree = walk.result() if walk is not None else _walk_tarball(owner, repo_name, deadline_at)
+    except RateLimitExceeded:
+        raise RepoAnalysisError(RATE_LIMIT_MESSAGE)
+    except Exception:
+        tree = None
+    if tree is None or (tree["truncated"] and tree["readme"] is None):
+        # One small request; made even past the deadline, which may be what cut the walk short
+        responses.update(_fetch_all({"readme": f"{api_url}/readme"}, max_workers, None))
+    
+    # Reuse the REST compilation for metadata, languages, contributors and the README fallback
+    result = _compile_repo_data(responses, {})
+    if tree is None:
+        result["truncated"] = result["partial"] = True
+        return result
+    
+    result.update({
+        "directories": tree["directories"],
+        "files_by_type": tree["files_by_type"],
+        "dependencies": tree["dependencies"],
+        "code_samples": tree["code_samples"],
+        "truncated": tree["truncated"],
+        "partial": result["partial"] or tree["partial"],
+    })
+    if tree["readme"] is not None:
+        result["readme"] = tree["readme"]
+    return result
+
+FETCH_BACKENDS = {
+    "rest": _fetch_rest,
+    "graphql": _fetch_graphql,
+    "tarball": _fetch_tarball,
+}
+
+def fetch_repo_data(owner: str, repo_name: str, max_workers: Optional[int] = None,
+                    deadline: Optional[float] = None, backend: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Collects the analysis result dictionary for a repository with the selected fetch backend.
+    
+    Args:
+        owner: Repository owner
+        repo_name: Repository name
+        max_workers: Maximum number of concurrent GitHub requests (defaults to GITHUB_FETCH_CONCURRENCY)
+        deadline: Seconds allowed for the whole analysis (defaults to GITHUB_FETCH_DEADLINE; 0 disables it)
+        backend: "rest", "graphql" or "tarball" (defaults to GITHUB_FETCH_BACKEND)
+        
+    Returns:
+        The analysis result dictionary consumed by format_repo_analysis; its "partial" flag is set
+        when requests failed or the deadline cut the fetch short, so another run may see more
+        
+    Raises:
+        RepoAnalysisError: With a user-facing message when the repository cannot be analyzed
+    """
+    backend = backend or GITHUB_FETCH_BACKEND
+    if backend not in FETCH_BACKENDS:
+        raise RepoAnalysisError(f"Unknown analysis backend: {backend}")
+    
+    max_workers = GITHUB_FETCH_CONCURRENCY if max_workers is None else max_workers
+    deadline = GITHUB_FETCH_DEADLINE if deadline is None else deadline
+    deadline_at = time.monotonic() + deadline if deadline > 0 else None
+    
+    return FETCH_BACKENDS[backend](owner, repo_name, max_workers, deadline_at)
+
+def parse_repo_url(repo_url: str) -> Optional[tuple]:
+    """
+    Extracts (owner, repo name) from a GitHub repository URL, or returns None if it is not one.
+    """
+    parts = repo_url.strip("/").split("/")
+    if "github.com" not in repo_url or len(parts) < 5:
+        return None
+    return parts[-2], parts[-1]
+
+# Define a function to analyze GitHub repositories
+def analyze_github_repo(repo_url: str, max_workers: Optional[int] = None, deadline: Optional[float] = None,
+                        backend: Optional[str] = None) -> str:
+    """
+    Analyzes a GitHub repository to extract detailed information including languages, stars, contributors, and content.
+    
+    The independent API endpoints are fetched concurrently unless max_workers is 1. Endpoints that
+    have not answered when the deadline expires are reported as missing instead of failing the analysis.
+    
+    Args:
+        repo_url: The GitHub repository URL to analyze
+        max_workers: Maximum number of concurrent GitHub requests (defaults to GITHUB_FETCH_CONCURRENCY)
+        deadline: Seconds allowed for the whole analysis (defaults to GITHUB_FETCH_DEADLINE; 0 disables it)
+        backend: "rest", "graphql" or "tarball" (defaults to GITHUB_FETCH_BACKEND); rest and
+            graphql produce the same report, tarball inspects the whole tree
+        
+    Returns:
+        A string containing the analysis results
+    """
+    # Extract owner and repo name from URL
+    parsed = parse_repo_url(repo_url)
+    if parsed is None:
+        return "Invalid GitHub repository URL"
+    
+    owner, repo_name = parsed
+    
+    try:
+        result = fetch_repo_data(owner, repo_name, max_workers=max_workers, deadline=deadline, backend=backend)
+        
+        # Format the result as a readable string
+        return format_repo_analysis(result)
+    
+    except RepoAnalysisError as e:
+        return str(e)
+    except Exception as e:
+        return f"Error analyzing repository: {str(e)}"
+
+def cached_analyze_github_repo(repo_url: str, backend: Optional[str] = None) -> str:
+    """
+    Returns the analyze_github_repo report, reusing a stored one while the default branch head is unchanged.
+    
+    Args:
+        repo_url: The GitHub repository URL to analyze
+        backend: "rest", "graphql" or "tarball" (defaults to GITHUB_FETCH_BACKEND)
+        
+    Returns:
+        A string containing the analysis results
+    """
+    parsed = parse_repo_url(repo_url)
+    if parsed is None:
+        return "Invalid GitHub repository URL"
+    
+    owner, repo_name = parsed
+    backend = backend or GITHUB_FETCH_BACKEND
+    return get_analysis_cache().get_or_compute(
+        owner, repo_name, f"report:{backend}",
+        lambda: analyze_github_repo(repo_url, backend=backend),
+        # Only complete reports are stored; errors and partial reports are retried on the next call
+        is_valid=lambda report: report.startswith("# Repository Analysis") and PARTIAL_REPORT_NOTE not in report
+    )
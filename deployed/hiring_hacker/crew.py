@@ -0,0 +1,373 @@
+"""
+The crew pipeline: agents, tasks and crews that turn an analysis report into an
+analysis, a job description and interview questions.
+
+crewai and crewai_tools take seconds to import, so they (and the search index
+and crew memory modules built on them) are imported only when an LLM, agent or
+crew is actually created. The stage definitions, cache keys and run_pipeline's
+orchestration are available without them.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from hiring_hacker.analyzer import parse_repo_url
+from result_cache import content_hash, get_task_cache
+
+if TYPE_CHECKING:
+    from crewai import LLM, Agent
+
+# Define a custom tool class
+class CustomTool:
+    def __init__(self, name: str, description: str, func: Callable):
+        self.name = name
+        self.description = description
+        self.func = func
+
+# Stages of the crew pipeline, in execution order
+STAGES = ["analysis", "job_description", "interview_questions"]
+
+# LLM configuration shared by every agent; also part of the task output cache key
+LLM_SETTINGS = {
+    "model": "gpt-4o",  # Using a more capable model
+    "temperature": 0.3,
+    "max_tokens": 4096,
+    "frequency_penalty": 0.1,
+    "presence_penalty": 0.1,
+}
+
+TASK_DESCRIPTIONS = {
+    "analysis": (
+        "Analyze the GitHub repository at {repo_url} in detail. Extract and summarize the following information:\n"
+        "1. Repository overview (stars, forks, contributors)\n"
+        "2. Programming languages used and their proportions\n"
+        "3. Key libraries and frameworks identified in the code\n"
+        "4. Code organization and architecture patterns\n"
+        "5. Main functionality and purpose based on README and code samples\n"
+        "Focus on extracting factual information that will be useful for creating job descriptions and interview questions.\n"
+        "Do not make up any information not found in the repository."
+    ),
+    "job_description": (
+        "Based on the repository analysis, create a detailed job description that includes:\n"
+        "1. Job title appropriate for the project\n"
+        "2. Required technical skills and experience levels\n"
+        "3. Preferred qualifications\n"
+        "4. Key responsibilities\n"
+        "5. Project context and team information (if available)\n"
+        "The job description should accurately reflect the technical stack and complexity of the project.\n"
+        "Use the repository analysis to create an accurate and compelling job description."
+    ),
+    "interview_questions": (
+        "Create a set of technical interview questions based on the repository analysis. Include:\n"
+        "1. 5-7 technical knowledge questions specific to the main languages and frameworks used\n"
+        "2. 2-3 system design questions relevant to the project's architecture\n"
+        "3. 2-3 problem-solving questions that test skills needed for this codebase\n"
+        "4. 1-2 questions about relevant best practices\n"
+        "For each question, provide a brief explanation of what you're assessing and what a good answer might include.\n"
+        "Use the repository analysis to create relevant and insightful interview questions."
+    ),
+}
+
+TASK_EXPECTED_OUTPUTS = {
+    "analysis": "A comprehensive analysis of the repository with technical details and insights.",
+    "job_description": "A professional job description tailored to the repository's technical requirements.",
+    "interview_questions": "A set of tailored technical interview questions with assessment criteria.",
+}
+
+def task_description(stage: str, repo_url: str) -> str:
+    return TASK_DESCRIPTIONS[stage].format(repo_url=repo_url)
+
+# Pipeline profiles: "full" runs the agent crews (planning, memory, search tools),
+# "fast" produces all three stages from the analyzer report in a single structured LLM call
+PIPELINE_PROFILES = ["full", "fast"]
+PIPELINE_PROFILE = os.getenv("PIPELINE_PROFILE", "full")
+
+FAST_ANALYSIS_DESCRIPTION = (
+    "Summarize the repository data into a detailed analysis covering:\n"
+    "1. Repository overview (stars, forks, contributors)\n"
+    "2. Programming languages used and their proportions\n"
+    "3. Key libraries and frameworks identified in the code\n"
+    "4. Code organization and architecture patterns\n"
+    "5. Main functionality and purpose based on README and code samples\n"
+    "Do not make up any information not found in the repository data."
+)
+
+FAST_SYSTEM_PROMPT = (
+    "You are a senior software engineer specialized in repository analysis, working with an experienced "
+    "technical recruiter and a senior technical interviewer. You turn repository data into an accurate "
+    "analysis, a job description and technical interview questions. Write every field in Markdown."
+)
+
+class FastPipelineOutput(BaseModel):
+    analysis: str = Field(description=TASK_EXPECTED_OUTPUTS["analysis"])
+    job_description: str = Field(description=TASK_EXPECTED_OUTPUTS["job_description"])
+    interview_questions: str = Field(description=TASK_EXPECTED_OUTPUTS["interview_questions"])
+
+def fast_pipeline_messages(repo_url: str, analysis_report: str) -> List[Dict[str, str]]:
+    instructions = {
+        "analysis": FAST_ANALYSIS_DESCRIPTION,
+        "job_description": TASK_DESCRIPTIONS["job_description"],
+        "interview_questions": TASK_DESCRIPTIONS["interview_questions"],
+    }
+    prompt = f"Repository: {repo_url}\n\nRepository data:\n{analysis_report}\n\nFill in every field:\n"
+    for stage in STAGES:
+        prompt += f"\n{stage}:\n{instructions[stage]}\n"
+    return [
+        {"role": "system", "content": FAST_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
+def make_llm() -> "LLM":
+    """
+    Creates the LLM every agent (and the fast profile) uses, configured by LLM_SETTINGS.
+    """
+    from crewai import LLM
+    return LLM(**LLM_SETTINGS)
+
+def _run_fast_stages(repo_url: str, analysis_report: str) -> Dict[str, str]:
+    # One structured call instead of a crew; no planning, memory or tool round trips
+    llm = make_llm()
+    result = llm.call(fast_pipeline_messages(repo_url, analysis_report), response_model=FastPipelineOutput)
+    if isinstance(result, str):
+        # Providers without structured output support return the JSON as text
+        result = FastPipelineOutput.model_validate_json(result)
+    return {stage: getattr(result, stage) for stage in STAGES if getattr(result, stage)}
+
+def build_agents(repo_url: str, analysis_report: str, llm: "LLM", stages: List[str]) -> Dict[str, "Agent"]:
+    """
+    Creates the agents for the given pipeline stages.
+    
+    Args:
+        repo_url: The GitHub repository URL being analyzed
+        analysis_report: The analyze_github_repo report the analysis tool hands to the agent
+        llm: The LLM shared by the agents
+        stages: The stages that will run; agents (and their tools) are only built for those
+        
+    Returns:
+        A mapping of stage name to agent
+    """
+    from crewai import Agent
+    from crewai_tools import GithubSearchTool, SerperDevTool
+    from search_index import github_search_tool
+    
+    github_token = os.getenv("GITHUB_TOKEN")
+    serper_api_key = os.getenv("SERPER_API_KEY")
+    agents = {}
+    serper_tool = None
+    if serper_api_key:
+        serper_tool = SerperDevTool(api_key=serper_api_key)
+    
+    if "analysis" in stages:
+        # Initialize tools; the repository's embedded index persists and is only refreshed after new commits
+        parsed = parse_repo_url(repo_url)
+        if parsed:
+            github_search = github_search_tool(*parsed, gh_token=github_token, content_types=['repo', 'code'])
+        else:
+            github_search = GithubSearchTool(
+                github_repo=repo_url,
+                gh_token=github_token, 
+                content_types=['repo', 'code']
+            )
+        
+        # Create a custom tool from our function
+        github_analysis = CustomTool(
+            name="GitHub Repository Analysis",
+            description="Analyzes a GitHub repository to extract detailed information including languages, stars, contributors, and content",
+            func=lambda query=None: analysis_report  # Always the report for the repo_url from the input field
+        )
+        
+        agents["analysis"] = Agent(
+            role="Repo Analysis Expert",
+            goal="Extract comprehensive details from a GitHub repository, including stars, languages, contributors, code structure, and README content.",
+            backstory=(
+                "You are a senior software engineer specialized in repository analysis. "
+                "You have extensive experience in analyzing codebases to understand their structure, "
+                "technologies, and patterns. Your insights help teams understand projects at a deep level."
+            ),
+            tools=[github_search, github_analysis],
+            llm=llm,
+            verbose=True
+        )
+    
+    if "job_description" in stages:
+        agents["job_description"] = Agent(
+            role="Technical Recruiter",
+            goal="Create a detailed job description based on the repository analysis that accurately reflects the technical requirements and skills needed.",
+            backstory=(
+                "You are an experienced technical recruiter with a background in software engineering. "
+                "You understand both the technical and human aspects of software development roles. "
+                "You excel at translating technical requirements into clear job descriptions that "
+                "attract the right candidates."
+            ),
+            tools=[serper_tool] if serper_tool else [],
+            llm=llm,
+            verbose=True
+        )
+    
+    if "interview_questions" in stages:
+        agents["interview_questions"] = Agent(
+            role="Technical Interviewer",
+            goal="Generate relevant technical interview questions based on the repository's technologies and code patterns.",
+            backstory=(
+                "You are a senior technical interviewer with years of experience hiring for technical roles. "
+                "You know how to craft questions that assess both technical knowledge and problem-solving abilities. "
+                "Your questions reveal whether candidates truly understand the technologies they claim to know."
+            ),
+            tools=[serper_tool] if serper_tool else [],
+            llm=llm,
+            verbose=True
+        )
+    
+    return agents
+
+def build_crew(repo_url: str, analysis_report: str, stages: List[str], upstream_outputs: Dict[str, str],
+               planning: bool = True) -> tuple:
+    """
+    Creates the crew for the given pipeline stages.
+    
+    When the analysis stage is not part of this crew, its output (from the cache or an earlier
+    crew) is appended to the downstream task descriptions in place of the task context.
+    
+    Args:
+        repo_url: The GitHub repository URL being analyzed
+        analysis_report: The analyze_github_repo report
+        stages: The stages to run, in pipeline order
+        upstream_outputs: Outputs of stages that ran before this crew or came from the cache
+        planning: Whether the crew plans its tasks before running them
+        
+    Returns:
+        A (crew, tasks) tuple where tasks maps stage name to Task
+    """
+    from crewai import Crew, Task
+    from crew_memory import get_crew_memory_store
+    
+    # Configure LLM
+    llm = make_llm()
+    agents = build_agents(repo_url, analysis_report, llm, stages)
+    
+    # Define the Tasks
+    tasks = {}
+    for stage in stages:
+        description = task_description(stage, repo_url)
+        if stage != "analysis" and "analysis" not in stages and upstream_outputs.get("analysis"):
+            description += "\n\nRepository analysis:\n" + upstream_outputs["analysis"]
+        tasks[stage] = Task(
+            description=description,
+            expected_output=TASK_EXPECTED_OUTPUTS[stage],
+            agent=agents[stage]
+        )
+    
+    # Instantiate Crew
+    crew = Crew(
+        agents=list(agents.values()),
+        tasks=list(tasks.values()),
+        verbose=True,
+        memory=get_crew_memory_store().memory(repo_url, llm),  # Shares context between agents; one partition per repository
+        planning=planning  # Enables planning to manage tasks in sequence
+    )
+    return crew, tasks
+
+def _begin_crew_run(repo_url: str) -> None:
+    # Memory maintenance is counted per pipeline run, however many crews the run kicks off
+    from crew_memory import get_crew_memory_store
+    get_crew_memory_store().begin_run(repo_url)
+
+def _kickoff_stages(repo_url: str, analysis_report: str, stages: List[str], upstream_outputs: Dict[str, str],
+                    planning: bool) -> Dict[str, str]:
+    # Run one crew and collect the raw output of each of its tasks
+    crew, tasks = build_crew(repo_url, analysis_report, stages, upstream_outputs, planning=planning)
+    crew.kickoff()
+    
+    # Access the task outputs directly from the task objects
+    outputs = {}
+    for stage, task in tasks.items():
+        output = task.output.raw if hasattr(task, 'output') and hasattr(task.output, 'raw') else ""
+        if output:
+            outputs[stage] = output
+    return outputs
+
+def run_pipeline(repo_url: str, analysis_report: str, regenerate: List[str] = (),
+                 profile: Optional[str] = None) -> Dict[str, str]:
+    """
+    Produces the analysis, job description and interview questions, reusing cached stage outputs.
+    
+    Each stage is keyed by the hash of the analysis report, its task description and the LLM
+    settings, so unchanged repositories skip the crew entirely. The downstream stages are also
+    keyed by the analysis output, so regenerating the analysis regenerates them too. The job description and the
+    interview questions only depend on the analysis, so once it is available they run as two
+    single-task crews side by side. The fast profile skips the crews and fills every missing
+    stage from one structured LLM call.
+    
+    Args:
+        repo_url: The GitHub repository URL being analyzed
+        analysis_report: The analyze_github_repo report
+        regenerate: Stages whose cached output should be discarded first
+        profile: "full" or "fast" (defaults to PIPELINE_PROFILE)
+        
+    Returns:
+        A mapping of stage name to output text (missing if the stage produced nothing)
+    """
+    profile = profile or PIPELINE_PROFILE
+    if profile not in PIPELINE_PROFILES:
+        raise ValueError(f"Unknown pipeline profile: {profile}")
+    
+    cache = get_task_cache()
+    analysis_hash = content_hash(analysis_report)
+    # Fast outputs come from a different prompt, so they are cached apart from the crew outputs
+    settings = LLM_SETTINGS if profile == "full" else dict(LLM_SETTINGS, profile=profile)
+    
+    def stage_key(stage: str) -> str:
+        stage_settings = settings
+        if stage != "analysis":
+            # Downstream stages are written from the analysis output, so a regenerated analysis misses them
+            stage_settings = dict(settings, analysis_output=content_hash(outputs.get("analysis", "")))
+        return cache.key(stage, analysis_hash, task_description(stage, repo_url), TASK_EXPECTED_OUTPUTS[stage],
+                         stage_settings)
+    
+    for stage in regenerate:
+        cache.invalidate(stage, analysis_hash)
+    
+    outputs = {}
+    cached = cache.get(stage_key("analysis"))
+    if cached is not None:
+        outputs["analysis"] = cached
+    
+    fresh = {}
+    analysis_missing = "analysis" not in outputs
+    if analysis_missing:
+        if profile == "fast":
+            fresh = _run_fast_stages(repo_url, analysis_report)
+        else:
+            _begin_crew_run(repo_url)
+            fresh = _kickoff_stages(repo_url, analysis_report, ["analysis"], outputs, planning=True)
+        outputs.update(fresh)
+    
+    for stage in STAGES:
+        if stage not in outputs:
+            cached = cache.get(stage_key(stage))
+            if cached is not None:
+                outputs[stage] = cached
+    
+    downstream = [stage for stage in STAGES if stage not in outputs]
+    if profile == "fast" and downstream and not analysis_missing:
+        fast = _run_fast_stages(repo_url, analysis_report)
+        fresh.update({stage: fast[stage] for stage in downstream if stage in fast})
+        outputs.update(fresh)
+    elif profile == "full" and downstream:
+        if not analysis_missing:
+            _begin_crew_run(repo_url)
+        with ThreadPoolExecutor(max_workers=len(downstream)) as executor:
+            futures = [
+                executor.submit(_kickoff_stages, repo_url, analysis_report, [stage], dict(outputs), False)
+                for stage in downstream
+            ]
+            for future in futures:
+                fresh.update(future.result())
+        outputs.update(fresh)
+    
+    for stage, output in fresh.items():
+        cache.set(stage_key(stage), output)
+    
+    return outputs
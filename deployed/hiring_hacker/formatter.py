@@ -0,0 +1,70 @@
+"""
+Markdown rendering of repository analysis results.
+"""
+from typing import Any, Dict
+
+# Marks reports built from incomplete data (failed requests, a missed deadline); they are not cached
+PARTIAL_REPORT_NOTE = "- **Note**: some repository data could not be fetched; sections may be incomplete\n"
+
+def format_repo_analysis(result: Dict[str, Any]) -> str:
+    """
+    Formats an analysis result dictionary as the Markdown report handed to the agents.
+    
+    Args:
+        result: The dictionary produced by the repository analysis
+        
+    Returns:
+        A readable Markdown string
+    """
+    formatted_result = "# Repository Analysis: " + result["name"] + "\n\n"
+    
+    formatted_result += "## Overview\n"
+    formatted_result += f"- **Description**: {result['description']}\n"
+    formatted_result += f"- **Stars**: {result['stars']}\n"
+    formatted_result += f"- **Forks**: {result['forks']}\n"
+    formatted_result += f"- **Watchers**: {result['watchers']}\n"
+    formatted_result += f"- **Open Issues**: {result['open_issues']}\n"
+    formatted_result += f"- **Created**: {result['created_at']}\n"
+    formatted_result += f"- **Last Updated**: {result['updated_at']}\n"
+    formatted_result += f"- **License**: {result['license']}\n"
+    if result.get("partial"):
+        formatted_result += PARTIAL_REPORT_NOTE
+    formatted_result += "\n"
+    
+    formatted_result += "## Programming Languages\n"
+    for lang, percentage in result["languages"].items():
+        formatted_result += f"- **{lang}**: {percentage}\n"
+    formatted_result += "\n"
+    
+    formatted_result += "## Contributors\n"
+    formatted_result += f"- **Total Contributors**: {result['contributors']}\n"
+    formatted_result += "- **Top Contributors**:\n"
+    for contributor in result["top_contributors"]:
+        formatted_result += f"  - {contributor['login']}: {contributor['contributions']} contributions\n"
+    formatted_result += "\n"
+    
+    formatted_result += "## Repository Structure\n"
+    formatted_result += "- **Directories**:\n"
+    for directory in result["directories"]:
+        formatted_result += f"  - {directory}\n"
+    formatted_result += "- **Files by Type**:\n"
+    for file_type, count in result["files_by_type"].items():
+        formatted_result += f"  - {file_type}: {count} files\n"
+    if result.get("truncated"):
+        formatted_result += "- **Note**: the repository exceeded the analysis budget; structure covers the files read so far\n"
+    formatted_result += "\n"
+    
+    formatted_result += "## Dependencies\n"
+    for package_file, content in result["dependencies"].items():
+        formatted_result += f"### {package_file}:\n```\n{content[:500]}{'...' if len(content) > 500 else ''}\n```\n"
+    formatted_result += "\n"
+    
+    readme_content = result["readme"]
+    formatted_result += "## README\n```\n"
+    formatted_result += f"{readme_content[:1000]}{'...' if len(readme_content) > 1000 else ''}\n```\n\n"
+    
+    formatted_result += "## Code Samples\n"
+    for sample in result["code_samples"]:
+        formatted_result += f"### {sample['filename']}:\n```\n{sample['content'][:500]}{'...' if len(sample['content']) > 500 else ''}\n```\n"
+    
+    return formatted_result
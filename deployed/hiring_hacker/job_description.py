@@ -0,0 +1,52 @@
+"""
+Prompt text and completion checks for the job descriptions the Flask app generates.
+"""
+import re
+
+# The static instructions come first so their attention state is computed once and
+# reused; only the project details that follow are run through the model per request.
+JOB_DESCRIPTION_PROMPT_PREFIX = """
+Generate a job description for a developer role working on a GitHub project.
+
+Make the job description attractive and easy to read, highlighting the project's importance and appeal to potential developers.
+- Responsibilities: List the primary responsibilities of a developer working on this project (e.g., coding, bug fixing, collaborating with the team, etc.).
+- Preferred Qualifications: List the qualifications that would make someone a strong candidate for this position (e.g., experience, communication skills, etc.).
+"""
+
+# The job description is complete once both of these sections have been written
+JOB_DESCRIPTION_SECTIONS = ('responsibilities', 'qualifications')
+# Text the model produces when it starts over with a new prompt instead of finishing the job description
+JOB_DESCRIPTION_END_MARKERS = ('generate a job description', 'the project is called')
+
+def job_description_complete(text):
+    lower = text.lower()
+    if any(marker in lower for marker in JOB_DESCRIPTION_END_MARKERS):
+        return True
+    positions = [lower.rfind(section) for section in JOB_DESCRIPTION_SECTIONS]
+    if min(positions) < 0:
+        return False
+    # The last section ends at the first blank line after some of its content
+    last_section = text[max(positions):].partition('\n')[2]
+    return re.search(r'\S[^\n]*\n[ \t]*\n', last_section) is not None
+
+def trim_job_description(text):
+    # Drop anything from the point where the model started a new prompt
+    lower = text.lower()
+    cut = min([lower.find(marker) for marker in JOB_DESCRIPTION_END_MARKERS if marker in lower] + [len(text)])
+    return text[:cut].strip()
+
+def job_description_prompt(repo_data):
+    # Get a short description from the model if no description exists
+    description = repo_data['description'] if repo_data['description'] else "An innovative software project"
+
+    # Sort languages by usage
+    languages = sorted(repo_data['languages'].items(), key=lambda x: x[1], reverse=True)
+    main_languages = [lang[0] for lang in languages[:3]]
+
+    # Prepare the project-specific part of the prompt; it follows JOB_DESCRIPTION_PROMPT_PREFIX
+    return f"""
+The project is called {repo_data['name']}. Here is some key information about the project:
+- Project Description: {description} (if available, otherwise provide a brief and appealing overview)
+- GitHub Statistics: The project has {repo_data['stars']} stars, {repo_data['forks']} forks, and {repo_data['open_issues']} open issues.
+- Technical Skills: The project primarily uses {', '.join(main_languages)} (you can mention any related technologies if applicable).
+"""
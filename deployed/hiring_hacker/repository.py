@@ -0,0 +1,54 @@
+"""
+The lightweight repository lookup behind the Flask app: a handful of REST calls per repository.
+"""
+import re
+
+from github_client import get_client
+
+def extract_repo_info(url):
+    # Extract owner and repo name from GitHub URL
+    pattern = r'github\.com/([^/]+)/([^/]+)'
+    match = re.search(pattern, url)
+    if not match:
+        return None, None
+    return match.group(1), match.group(2)
+
+def analyze_repository(owner, repo):
+    github = get_client()
+
+    # Get repository information
+    repo_url = f'https://api.github.com/repos/{owner}/{repo}'
+    repo_response = github.get(repo_url)
+    if repo_response.status_code != 200:
+        return None
+
+    # Get repository contents
+    contents_url = f'https://api.github.com/repos/{owner}/{repo}/contents'
+    contents_response = github.get(contents_url)
+    if contents_response.status_code != 200:
+        return None
+
+    # Get languages used
+    languages_url = f'https://api.github.com/repos/{owner}/{repo}/languages'
+    languages_response = github.get(languages_url)
+    languages = languages_response.json() if languages_response.status_code == 200 else {}
+
+    # Analyze README if it exists
+    readme_url = f'https://api.github.com/repos/{owner}/{repo}/readme'
+    readme_response = github.get(readme_url)
+    readme_content = ""
+    if readme_response.status_code == 200:
+        import base64
+        readme_content = base64.b64decode(readme_response.json()['content']).decode('utf-8')
+
+    repo_data = repo_response.json()
+    
+    return {
+        'name': repo_data['name'],
+        'description': repo_data['description'],
+        'languages': languages,
+        'readme': readme_content,
+        'stars': repo_data['stargazers_count'],
+        'forks': repo_data['forks_count'],
+        'open_issues': repo_data['open_issues_count']
+    }
@@ -0,0 +1,144 @@
+"""
+Background job queue for long-running analyses.
+
+Submitting a job returns its ID at once; a bounded pool of worker threads runs
+the jobs in submission order and keeps each result for JOB_RESULT_TTL seconds
+after it finishes, so clients poll for it instead of holding a request open
+for the whole GitHub fetch and model generation.
+"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(min(4, os.cpu_count() or 1))))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "100"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))
+
+
+class JobQueueFull(Exception):
+    """
+    Raised when a job is submitted while max_pending jobs are already waiting.
+    """
+
+
+class Job:
+    def __init__(self, job_id: str, payload: Any):
+        self.id = job_id
+        self.payload = payload
+        self.state = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "state": self.state,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    Runs submitted payloads through a function on a bounded worker pool and stores the outcomes.
+
+    The pool is created on first submission and again after a fork, so a queue
+    created at import time works in forked server workers.
+    """
+
+    def __init__(self, run: Callable[[Any], Any], max_workers: int = JOB_WORKERS,
+                 max_pending: int = JOB_MAX_PENDING, ttl: float = JOB_RESULT_TTL):
+        self.run = run
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self.submitted = 0
+        self.rejected = 0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Caller holds the lock
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job-worker")
+            self._pid = os.getpid()
+        return self._executor
+
+    def _expire(self, now: float) -> None:
+        # Caller holds the lock
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and now - job.finished_at > self.ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(job.state == "queued" for job in self._jobs.values())
+
+    def submit(self, payload: Any) -> Job:
+        """
+        Queues a payload for the workers.
+
+        Returns:
+            The new job (state "queued")
+
+        Raises:
+            JobQueueFull: If max_pending jobs are already waiting for a worker
+        """
+        with self._lock:
+            self._expire(time.time())
+            if sum(job.state == "queued" for job in self._jobs.values()) >= self.max_pending:
+                self.rejected += 1
+                raise JobQueueFull(f"{self.max_pending} jobs are already waiting")
+            job = Job(uuid.uuid4().hex, payload)
+            self._jobs[job.id] = job
+            self.submitted += 1
+            self._pool().submit(self._execute, job)
+        return job
+
+    def _execute(self, job: Job) -> None:
+        with self._lock:
+            job.state = "running"
+            job.started_at = time.time()
+        try:
+            result = self.run(job.payload)
+        except Exception as e:
+            with self._lock:
+                job.state = "failed"
+                job.error = str(e)
+                job.finished_at = time.time()
+            return
+        with self._lock:
+            job.result = result
+            job.state = "done"
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Returns the job, or None if it is unknown or its result has expired.
+        """
+        with self._lock:
+            self._expire(time.time())
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            states: Dict[str, int] = {}
+            for job in self._jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+            return {"workers": self.max_workers, "max_pending": self.max_pending, "jobs": states,
+                    "submitted": self.submitted, "rejected": self.rejected}
@@ -0,0 +1,311 @@
+"""
+Memoization of repository analyses and crew task outputs.
+
+TieredCache keeps JSON-serialisable results in an in-memory LRU in front of a
+SQLite disk tier, both bounded by entry count / size and a TTL. AnalysisCache
+keys analyses by (owner, repo, default-branch head SHA): a single lightweight
+probe for the head commit decides whether a stored analysis is still valid,
+so re-analysing an unchanged repository costs one API call (usually a 304
+through the ETag cache) instead of the full fetch. TaskOutputCache stores the
+LLM output of each crew stage keyed by the analysis it was generated from.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from github_client import get_client
+from singleflight import SingleFlight
+
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "hiring_hacker"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", str(24 * 3600)))
+RESULT_CACHE_MEMORY_ENTRIES = int(os.getenv("RESULT_CACHE_MEMORY_ENTRIES", "256"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+TASK_CACHE_TTL = float(os.getenv("TASK_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+class TieredCache:
+    """
+    An in-memory LRU tier in front of a size-bounded SQLite tier, with a shared TTL.
+    """
+
+    def __init__(self, path: Optional[str], ttl: float = RESULT_CACHE_TTL,
+                 memory_entries: int = RESULT_CACHE_MEMORY_ENTRIES, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+        self._conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    """CREATE TABLE IF NOT EXISTS results (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_used REAL NOT NULL
+                    )"""
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl > 0 and now - created_at > self.ttl
+
+    def _remember(self, key: str, value: Any, created_at: float) -> None:
+        # Caller holds the lock
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Returns the cached value, or None if it is missing or expired.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.hits["memory"] += 1
+                    return value
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute("SELECT value, created_at FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value, created_at = json.loads(row[0]), row[1]
+                    with self._conn:
+                        if self._expired(created_at, now):
+                            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                        else:
+                            self._conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+                            self._remember(key, value, created_at)
+                            self.hits["disk"] += 1
+                            return value
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._conn is None:
+                return
+            serialized = json.dumps(value)
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value, size, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (key, serialized, len(serialized), now, now),
+                )
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        # Caller holds the lock; drop expired entries, then least recently used ones over the size cap
+        if self.ttl > 0:
+            self._conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM results ORDER BY last_used").fetchall():
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def purge(self, prefix: str = "") -> int:
+        """
+        Removes every entry whose key starts with prefix from both tiers.
+
+        Returns:
+            The number of disk entries removed (memory-only entries when there is no disk tier)
+        """
+        with self._lock:
+            removed = [key for key in self._memory if key.startswith(prefix)]
+            for key in removed:
+                del self._memory[key]
+            if self._conn is None:
+                return len(removed)
+            with self._conn:
+                cursor = self._conn.execute(
+                    "DELETE FROM results WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+                )
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {"memory_entries": len(self._memory), "hits": dict(self.hits), "misses": self.misses}
+            if self._conn is not None:
+                count, total = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+                ).fetchone()
+                stats.update({"path": self.path, "disk_entries": count, "disk_bytes": total})
+            return stats
+
+
+def head_sha(owner: str, repo: str) -> Optional[str]:
+    """
+    Returns the SHA of the default branch head, or None if it cannot be determined.
+
+    The sha media type makes GitHub answer with the bare 40-character SHA, so the
+    probe is as small as a GitHub API call gets.
+    """
+    response = get_client().get(
+        f"/repos/{owner}/{repo}/commits/HEAD", headers={"Accept": "application/vnd.github.sha"}
+    )
+    if response.status_code != 200:
+        return None
+    sha = response.text.strip()
+    return sha or None
+
+
+class AnalysisCache:
+    """
+    Memoizes repository analyses by (owner, repo, default-branch head SHA).
+    """
+
+    def __init__(self, cache: TieredCache):
+        self.cache = cache
+        self._flights = SingleFlight()
+
+    @staticmethod
+    def key(variant: str, owner: str, repo: str, sha: str) -> str:
+        return f"{variant}:{owner.lower()}/{repo.lower()}@{sha}"
+
+    def get_or_compute(self, owner: str, repo: str, variant: str, compute: Callable[[], Any],
+                       is_valid: Callable[[Any], bool] = lambda value: value is not None) -> Any:
+        """
+        Returns the stored analysis for the repository's current head, computing it on a miss.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            variant: Distinguishes analyses of the same commit made differently (entry point, backend)
+            compute: Produces the analysis on a miss
+            is_valid: Decides whether a computed result may be stored (errors are not)
+
+        Returns:
+            The cached or freshly computed analysis
+        """
+        # Concurrent callers for the same repository share one head probe and one analysis
+        return self._flights.do(
+            (variant, owner.lower(), repo.lower()),
+            lambda: self._get_or_compute(owner, repo, variant, compute, is_valid)
+        )
+
+    def _get_or_compute(self, owner: str, repo: str, variant: str, compute: Callable[[], Any],
+                        is_valid: Callable[[Any], bool]) -> Any:
+        try:
+            sha = head_sha(owner, repo)
+        except Exception:
+            sha = None
+        if sha is None:
+            # Without a head SHA there is no way to tell whether a stored analysis is current
+            return compute()
+
+        key = self.key(variant, owner, repo, sha)
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+
+        value = compute()
+        if is_valid(value):
+            self.cache.set(key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.cache.stats(), coalescing=self._flights.stats())
+
+
+_analysis_cache: Optional[AnalysisCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """
+    Returns the process-wide analysis cache; ANALYSIS_CACHE_DISK=0 keeps it in memory only.
+    """
+    global _analysis_cache
+    if _analysis_cache is None:
+        with _cache_lock:
+            if _analysis_cache is None:
+                path = None
+                if os.getenv("ANALYSIS_CACHE_DISK", "1") != "0":
+                    path = os.path.join(RESULT_CACHE_DIR, "analyses.sqlite3")
+                _analysis_cache = AnalysisCache(TieredCache(path))
+    return _analysis_cache
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TaskOutputCache:
+    """
+    Stores crew task outputs keyed by stage, analysis content, task definition and LLM settings.
+
+    Keys start with "task:<stage>:<analysis hash>:" so a stage can be invalidated
+    for one repository analysis or across all of them.
+    """
+
+    def __init__(self, cache: TieredCache):
+        self.cache = cache
+
+    @staticmethod
+    def key(stage: str, analysis_hash: str, description: str, expected_output: str, llm_settings: Dict[str, Any]) -> str:
+        definition = json.dumps([description, expected_output, llm_settings], sort_keys=True)
+        return f"task:{stage}:{analysis_hash}:{content_hash(definition)}"
+
+    def get(self, key: str) -> Optional[str]:
+        return self.cache.get(key)
+
+    def set(self, key: str, output: str) -> None:
+        self.cache.set(key, output)
+
+    def invalidate(self, stage: Optional[str] = None, analysis_hash: Optional[str] = None) -> int:
+        """
+        Discards cached outputs of one stage (for one analysis, or all) or of every stage.
+
+        Returns:
+            The number of entries removed
+        """
+        if stage is None:
+            return self.cache.purge("task:")
+        return self.cache.purge(f"task:{stage}:{analysis_hash or ''}")
+
+
+_task_cache: Optional[TaskOutputCache] = None
+
+
+def get_task_cache() -> TaskOutputCache:
+    """
+    Returns the process-wide task output cache; TASK_CACHE_DISK=0 keeps it in memory only.
+    """
+    global _task_cache
+    if _task_cache is None:
+        with _cache_lock:
+            if _task_cache is None:
+                path = None
+                if os.getenv("TASK_CACHE_DISK", "1") != "0":
+                    path = os.path.join(RESULT_CACHE_DIR, "task_outputs.sqlite3")
+                _task_cache = TaskOutputCache(TieredCache(path, ttl=TASK_CACHE_TTL))
+    return _task_cache
@@ -0,0 +1,215 @@
+"""
+Persistent vector indexes for GithubSearchTool, reused across runs and processes.
+
+The stock tool loads and embeds a repository's content every time it is
+created. Here each repository gets its own collection in a persistent ChromaDB
+store next to a SQLite manifest that records which commit it was indexed at
+and which chunks it holds. Creating the tool for a repository whose default
+branch head has not moved costs one SHA probe and no embeddings; after new
+commits only the chunks whose text changed are embedded, and chunks that no
+longer exist are deleted.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from crewai_tools import GithubSearchTool
+
+from embedding_cache import cached_openai_embedder
+from result_cache import RESULT_CACHE_DIR, content_hash, head_sha
+
+SEARCH_INDEX_DIR = os.getenv("SEARCH_INDEX_DIR", os.path.join(RESULT_CACHE_DIR, "search_index"))
+
+
+def collection_name(owner: str, repo: str) -> str:
+    # Always a valid ChromaDB name, whatever characters the repository name has
+    return "github_" + content_hash(f"{owner}/{repo}".lower())[:32]
+
+
+def chunk_id(collection: str, chunk: str) -> str:
+    """
+    Identifies a chunk by its text, so an unchanged chunk keeps its ID (and embedding) across commits.
+    """
+    digest = hashlib.sha256(f"{collection}:{chunk}".encode("utf-8")).hexdigest()
+    return str(uuid.UUID(digest[:32]))
+
+
+class IndexManifest:
+    """
+    Records, per collection, the commit and content types it was indexed for and the IDs of its chunks.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS indexes (
+                    collection TEXT PRIMARY KEY,
+                    repo TEXT NOT NULL,
+                    commit_sha TEXT,
+                    content_types TEXT NOT NULL,
+                    chunk_ids TEXT NOT NULL,
+                    indexed_at REAL NOT NULL
+                )"""
+            )
+
+    def get(self, collection: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT repo, commit_sha, content_types, chunk_ids, indexed_at FROM indexes WHERE collection = ?",
+                (collection,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"repo": row[0], "commit_sha": row[1], "content_types": json.loads(row[2]),
+                "chunk_ids": set(json.loads(row[3])), "indexed_at": row[4]}
+
+    def set(self, collection: str, repo: str, commit_sha: Optional[str], content_types: List[str],
+            chunk_ids: List[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO indexes (collection, repo, commit_sha, content_types, chunk_ids, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (collection, repo, commit_sha, json.dumps(sorted(content_types)), json.dumps(sorted(chunk_ids)),
+                 time.time())
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM indexes").fetchone()[0]
+        return {"path": self.path, "repositories": count}
+
+
+_manifest: Optional[IndexManifest] = None
+_manifest_lock = threading.Lock()
+_stats = {"commit_hits": 0, "refreshes": 0, "chunks_embedded": 0, "chunks_reused": 0, "chunks_deleted": 0}
+
+
+def get_index_manifest() -> IndexManifest:
+    global _manifest
+    if _manifest is None:
+        with _manifest_lock:
+            if _manifest is None:
+                _manifest = IndexManifest(os.path.join(SEARCH_INDEX_DIR, "manifest.sqlite3"))
+    return _manifest
+
+
+def load_repo_chunks(repo: str, content_types: List[str], gh_token: Optional[str]) -> List[str]:
+    """
+    Loads the repository content GithubSearchTool indexes and splits it the way the tool does.
+    """
+    from crewai_tools.rag.data_types import DataType
+    from crewai_tools.rag.source_content import SourceContent
+
+    result = DataType.GITHUB.get_loader().load(
+        SourceContent(f"https://github.com/{repo}"),
+        metadata={"content_types": content_types, "gh_token": gh_token}
+    )
+    return DataType.GITHUB.get_chunker().chunk(result.content)
+
+
+def sync_index(client, collection: str, repo: str, content_types: List[str], gh_token: Optional[str],
+               manifest: Optional[IndexManifest] = None) -> Dict[str, int]:
+    """
+    Brings a repository's collection up to date with its default branch head.
+
+    Args:
+        client: The crewai RAG client (ChromaDBClient) holding the collection
+        collection: The repository's collection name
+        repo: "owner/repo"
+        content_types: GithubSearchTool content types to index
+        gh_token: GitHub token for loading the content
+        manifest: Where indexed commits are recorded (defaults to the shared manifest)
+
+    Returns:
+        Counts of embedded, reused and deleted chunks (all 0 when the indexed commit is current)
+    """
+    manifest = manifest or get_index_manifest()
+    owner, name = repo.split("/")[:2]
+    try:
+        sha = head_sha(owner, name)
+    except Exception:
+        sha = None
+
+    entry = manifest.get(collection)
+    if (sha is not None and entry is not None and entry["commit_sha"] == sha
+            and entry["content_types"] == sorted(content_types)):
+        with _manifest_lock:
+            _stats["commit_hits"] += 1
+        return {"embedded": 0, "reused": len(entry["chunk_ids"]), "deleted": 0}
+
+    chunks = {chunk_id(collection, chunk): (index, chunk)
+              for index, chunk in enumerate(load_repo_chunks(repo, content_types, gh_token))}
+    indexed = entry["chunk_ids"] if entry is not None else set()
+    new_ids = [doc_id for doc_id in chunks if doc_id not in indexed]
+    stale_ids = sorted(indexed - chunks.keys())
+
+    if new_ids:
+        client.add_documents(collection_name=collection, documents=[
+            {"doc_id": doc_id, "content": chunks[doc_id][1],
+             "metadata": {"source": f"https://github.com/{repo}", "repo": repo, "commit_sha": sha or "",
+                          "data_type": "github", "chunk_index": chunks[doc_id][0]}}
+            for doc_id in new_ids
+        ])
+    if stale_ids:
+        client.client.get_collection(collection).delete(ids=stale_ids)
+    # Without a SHA the index is still usable, but the next run has to check the content again
+    manifest.set(collection, repo, sha, content_types, list(chunks))
+
+    counts = {"embedded": len(new_ids), "reused": len(chunks) - len(new_ids), "deleted": len(stale_ids)}
+    with _manifest_lock:
+        _stats["refreshes"] += 1
+        _stats["chunks_embedded"] += counts["embedded"]
+        _stats["chunks_reused"] += counts["reused"]
+        _stats["chunks_deleted"] += counts["deleted"]
+    return counts
+
+
+def index_stats() -> Dict[str, Any]:
+    with _manifest_lock:
+        stats = dict(_stats)
+    stats.update(get_index_manifest().stats())
+    return stats
+
+
+class PersistentGithubSearchTool(GithubSearchTool):
+    """
+    GithubSearchTool whose repository content goes through sync_index instead of being embedded on every add.
+    """
+
+    def add(self, repo: str, content_types: Optional[List[str]] = None) -> None:  # type: ignore[override]
+        sync_index(self.adapter._client, self.collection_name, repo, content_types or self.content_types,
+                   self.gh_token)
+
+
+def github_search_tool(owner: str, repo: str, gh_token: Optional[str],
+                       content_types: Optional[List[str]] = None) -> GithubSearchTool:
+    """
+    Returns a GithubSearchTool for the repository backed by its persistent collection.
+    """
+    from chromadb.config import Settings
+
+    settings = Settings(persist_directory=SEARCH_INDEX_DIR, is_persistent=True, allow_reset=True,
+                        anonymized_telemetry=False)
+    return PersistentGithubSearchTool(
+        github_repo=f"{owner}/{repo}",
+        gh_token=gh_token,
+        content_types=content_types or ["repo", "code"],
+        collection_name=collection_name(owner, repo),
+        config={"vectordb": {"provider": "chromadb", "config": {
+            "settings": settings,
+            # The model ChromaDBConfig defaults to, behind the embedding cache
+            "embedding_function": cached_openai_embedder("text-embedding-3-small"),
+        }}}
+    )
@@ -0,0 +1,154 @@
+"""
+Pre-fork production server for app.py.
+
+The master process loads the model weights once, freezes the garbage collector
+so that collections do not write to (and un-share) the pages holding them, binds
+the listening socket and forks the workers. Each worker inherits the weights
+copy-on-write, limits torch to its share of the cores, runs the warm-up
+generation in its own process and serves requests on the shared socket with a
+threaded WSGI server. The master never runs inference: thread pools started
+before a fork do not survive into the children. Workers that exit are
+replaced until the master is told to stop.
+
+    python serve.py --workers 4 --port 8000
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", str(os.cpu_count() or 1)))
+# Intra-op torch threads per worker; 0 divides the available cores evenly between the workers
+SERVER_TORCH_THREADS = int(os.getenv("SERVER_TORCH_THREADS", "0"))
+SERVER_PIN_CPUS = os.getenv("SERVER_PIN_CPUS", "0") == "1"
+
+
+def available_cpus() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def torch_threads_per_worker(workers: int, cpus: int) -> int:
+    return max(1, cpus // max(1, workers))
+
+
+def worker_cpus(index: int, workers: int, cpus: List[int]) -> List[int]:
+    """
+    Returns the cores worker index is pinned to: an even, non-overlapping share where possible.
+    """
+    if workers >= len(cpus):
+        return [cpus[index % len(cpus)]]
+    share = len(cpus) // workers
+    return cpus[index * share:(index + 1) * share]
+
+
+def run_worker(sock: socket.socket, index: int, workers: int, torch_threads: int, pin: bool) -> None:
+    import app as app_module
+    from generation import configure_threads
+    from werkzeug.serving import make_server
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    if pin and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, worker_cpus(index, workers, available_cpus()))
+    configure_threads(torch_threads, 1)
+    app_module.generator_loader.warm_up()
+
+    host, port = sock.getsockname()[:2]
+    server = make_server(host, port, app_module.app, threaded=True, fd=sock.fileno())
+    logger.info("Worker %d (pid %d) serving with %d torch threads", index, os.getpid(), torch_threads)
+    server.serve_forever()
+
+
+def serve(host: str = SERVER_HOST, port: int = SERVER_PORT, workers: int = SERVER_WORKERS,
+          torch_threads: int = SERVER_TORCH_THREADS, pin: bool = SERVER_PIN_CPUS) -> None:
+    """
+    Loads the model, forks the workers and supervises them until SIGINT/SIGTERM.
+    """
+    # Nothing may start loading in a background thread of the master before the fork
+    os.environ["GENERATOR_PRELOAD"] = "lazy"
+    import app as app_module
+
+    started = time.perf_counter()
+    app_module.generator_loader.load(warm_up=False)
+    logger.info("Master loaded the model in %.2fs", time.perf_counter() - started)
+    torch_threads = torch_threads or torch_threads_per_worker(workers, len(available_cpus()))
+
+    sock = socket.create_server((host, port), backlog=2048)
+    sock.set_inheritable(True)
+
+    # Objects that exist now are shared with every worker; keep the collector off their pages
+    gc.collect()
+    gc.freeze()
+
+    children = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                run_worker(sock, index, workers, torch_threads, pin)
+                status = 0
+            except SystemExit as e:
+                status = e.code or 0
+            except Exception:
+                logger.exception("Worker %d crashed", index)
+            finally:
+                os._exit(status)
+        children[pid] = index
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for index in range(workers):
+        spawn(index)
+    logger.info("Serving on %s:%d with %d workers", host, port, workers)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is not None and not stopping:
+            logger.warning("Worker %d (pid %d) exited with status %d; restarting", index, pid, status)
+            time.sleep(1)
+            spawn(index)
+    sock.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run app.py with pre-forked workers sharing the model weights")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS)
+    parser.add_argument("--torch-threads", type=int, default=SERVER_TORCH_THREADS,
+                        help="Intra-op threads per worker (0 divides the cores between the workers)")
+    parser.add_argument("--pin-cpus", action="store_true", default=SERVER_PIN_CPUS,
+                        help="Pin each worker to its own share of the cores")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(process)d %(levelname)s %(message)s")
+    serve(args.host, args.port, args.workers, args.torch_threads, args.pin_cpus)
@@ -0,0 +1,70 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from admission import AdmissionController, Overloaded
+
+
+def test_requests_beyond_the_queue_are_rejected_at_once():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, deadline=5)
+    release = threading.Event()
+    
+    def hold():
+        with controller.admit():
+            release.wait(5)
+    
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        holders = [executor.submit(hold) for _ in range(2)]
+        deadline = time.time() + 5
+        while controller.stats()['queued'] < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        
+        started = time.monotonic()
+        with pytest.raises(Overloaded) as rejected:
+            with controller.admit():
+                pass
+        assert time.monotonic() - started < 0.5
+        release.set()
+        for holder in holders:
+            holder.result()
+    
+    assert rejected.value.status == 429
+    assert rejected.value.retry_after >= 1
+    stats = controller.stats()
+    assert (stats['admitted'], stats['rejected'], stats['active'], stats['queued']) == (2, 1, 0, 0)
+
+
+def test_waiting_requests_time_out_at_their_deadline():
+    controller = AdmissionController(max_concurrent=1, max_queue=4)
+    with controller.admit():
+        with pytest.raises(Overloaded) as timed_out:
+            with controller.admit(deadline=0.05):
+                pass
+    
+    assert timed_out.value.status == 503
+    assert controller.stats()['timed_out'] == 1
+    assert controller.stats()['queued'] == 0
+
+
+def test_slots_are_handed_over_in_arrival_order():
+    controller = AdmissionController(max_concurrent=1, max_queue=8, deadline=5)
+    order = []
+    
+    def request(index):
+        with controller.admit():
+            order.append(index)
+    
+    with controller.admit():
+        threads = []
+        for index in range(5):
+            thread = threading.Thread(target=request, args=(index,))
+            thread.start()
+            threads.append(thread)
+            while controller.stats()['queued'] < index + 1:
+                time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+    
+    assert order == [0, 1, 2, 3, 4]
@@ -0,0 +1,247 @@
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+os.environ.setdefault('GENERATOR_PRELOAD', 'lazy')
+
+import app
+from admission import AdmissionController
+from generation import GeneratorLoader
+from github_ratelimit import RateLimitScheduler
+from jobs import JobQueue
+
+
+REPO_DATA = {
+    'name': 'flask', 'description': 'A micro framework', 'languages': {'Python': 100}, 'readme': '# Flask',
+    'stars': 10, 'forks': 2, 'open_issues': 1,
+}
+
+
+def test_readiness_is_separate_from_liveness(fake_factory):
+    client = app.app.test_client()
+    release = threading.Event()
+    loading = GeneratorLoader('tiny', factory=fake_factory(release))
+    loading.start()
+    with patch.object(app, 'generator_loader', loading):
+        assert client.get('/healthz').status_code == 200
+        assert client.get('/readyz').status_code == 503
+    release.set()
+    
+    loaded = GeneratorLoader('tiny', factory=fake_factory())
+    loaded.load()
+    with patch.object(app, 'generator_loader', loaded):
+        response = client.get('/readyz')
+    assert response.status_code == 200
+    assert response.json['state'] == 'ready'
+
+
+def test_analyze_fails_fast_while_the_model_loads(fake_factory):
+    cache = MagicMock()
+    cache.get_or_compute.return_value = REPO_DATA
+    release = threading.Event()
+    loading = GeneratorLoader('tiny', factory=fake_factory(release))
+    loading.start()
+    batcher = MagicMock()
+    client = app.app.test_client()
+    try:
+        with patch.object(app, 'get_analysis_cache', return_value=cache), \
+             patch.object(app, 'generator_loader', loading), \
+             patch.object(app, 'generation_batcher', batcher):
+            started = time.monotonic()
+            response = client.post('/analyze', json={'github_url': 'https://github.com/owner/repo'})
+            elapsed = time.monotonic() - started
+    finally:
+        release.set()
+    
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '10'
+    assert elapsed < 1
+    batcher.submit.assert_not_called()
+
+
+def test_job_description_completes_after_the_last_section():
+    assert not app.job_description_complete('We are hiring.\n\nResponsibilities:\n- Write code\n')
+    assert not app.job_description_complete('Responsibilities:\n- Write code\n\nPreferred Qualifications:\n- Python')
+    assert app.job_description_complete(
+        'Responsibilities:\n- Write code\n\nPreferred Qualifications:\n- Python\n- Git\n\n'
+    )
+    assert app.job_description_complete('We are hiring.\nGenerate a job description for')
+
+
+def test_trim_job_description_drops_a_restarted_prompt():
+    text = ' Join us to build Flask.\n\nThe project is called flask. Here is'
+    assert app.trim_job_description(text) == 'Join us to build Flask.'
+
+
+def _fake_generate_batch(chunks):
+    # Stands in for generate_batch, feeding the streamer the way model.generate would
+    def generate_batch(generator, prompts, streamer=None, **kwargs):
+        for chunk in chunks:
+            streamer.on_finalized_text(chunk)
+        streamer.end()
+    return generate_batch
+
+
+def test_stream_job_description_cuts_a_restarted_prompt():
+    chunks = ['\n Join ', 'us to build ', 'Flask.\n\n', 'The project ', 'is called flask']
+    loader = MagicMock()
+    with patch.object(app, 'generator_loader', loader), \
+         patch.object(app, 'generate_batch', side_effect=_fake_generate_batch(chunks)):
+        pieces = list(app.stream_job_description(REPO_DATA))
+    
+    assert ''.join(pieces) == 'Join us to build Flask.'
+
+
+def _endless_generate_batch(stopped):
+    # Generates until is_complete says to stop, like model.generate with its stopping criteria
+    def generate_batch(generator, prompts, streamer=None, is_complete=None, **kwargs):
+        for _ in range(500):
+            if is_complete(''):
+                stopped.set()
+                break
+            streamer.on_finalized_text('Join us to build it. ' * 2)
+            time.sleep(0.01)
+        streamer.end()
+    return generate_batch
+
+
+def test_stream_job_description_stops_generating_when_closed():
+    stopped = threading.Event()
+    with patch.object(app, 'generator_loader', MagicMock()), \
+         patch.object(app, 'generate_batch', side_effect=_endless_generate_batch(stopped)):
+        pieces = app.stream_job_description(REPO_DATA)
+        assert next(pieces).startswith('Join us')
+        pieces.close()
+        assert stopped.wait(2)
+
+
+def test_stream_job_description_stops_at_the_deadline():
+    stopped = threading.Event()
+    with patch.object(app, 'generator_loader', MagicMock()), \
+         patch.object(app, 'generate_batch', side_effect=_endless_generate_batch(stopped)):
+        pieces = []
+        with pytest.raises(TimeoutError):
+            for piece in app.stream_job_description(REPO_DATA, deadline=time.monotonic() + 0.1):
+                pieces.append(piece)
+    
+    assert stopped.is_set()
+    assert pieces
+
+
+def test_analyze_stream_sends_repo_facts_before_tokens():
+    cache = MagicMock()
+    cache.get_or_compute.return_value = REPO_DATA
+    client = app.app.test_client()
+    with patch.object(app, 'get_analysis_cache', return_value=cache), \
+         patch.object(app, 'stream_job_description', side_effect=lambda *args, **kwargs: (text for text in ['Join us', ' today.'])):
+        response = client.get('/analyze/stream?github_url=https://github.com/owner/repo')
+        body = response.get_data(as_text=True)
+    
+    assert response.mimetype == 'text/event-stream'
+    events = [block.split('\n')[0] for block in body.strip().split('\n\n')]
+    assert events == ['event: status', 'event: repo', 'event: token', 'event: token', 'event: done']
+    assert 'readme' not in body.split('\n\n')[1]
+    
+    invalid = client.get('/analyze/stream?github_url=not-a-url').get_data(as_text=True)
+    assert invalid.startswith('event: error')
+
+
+def test_analyze_stream_reports_unexpected_failures_as_error_events():
+    def failing_stream(*args, **kwargs):
+        yield 'Join us'
+        raise RuntimeError('CUDA out of memory')
+    
+    client = app.app.test_client()
+    failing_cache = MagicMock()
+    failing_cache.get_or_compute.side_effect = ConnectionError('GitHub unreachable')
+    with patch.object(app, 'get_analysis_cache', return_value=failing_cache):
+        analysis_failed = client.get('/analyze/stream?github_url=https://github.com/owner/repo').get_data(as_text=True)
+    
+    cache = MagicMock()
+    cache.get_or_compute.return_value = REPO_DATA
+    with patch.object(app, 'get_analysis_cache', return_value=cache), \
+         patch.object(app, 'stream_job_description', side_effect=failing_stream):
+        generation_failed = client.get('/analyze/stream?github_url=https://github.com/owner/repo').get_data(as_text=True)
+    
+    analysis_events = analysis_failed.strip().split('\n\n')
+    assert [block.split('\n')[0] for block in analysis_events] == ['event: status', 'event: error']
+    assert 'GitHub unreachable' in analysis_events[-1]
+    generation_events = generation_failed.strip().split('\n\n')
+    assert [block.split('\n')[0] for block in generation_events] == [
+        'event: status', 'event: repo', 'event: token', 'event: error'
+    ]
+    assert 'CUDA out of memory' in generation_events[-1]
+
+
+def test_analyze_answers_503_when_github_tokens_are_exhausted():
+    scheduler = RateLimitScheduler(['a'])
+    scheduler.update('a', MagicMock(status_code=403, headers={'Retry-After': '60'}))
+    cache = MagicMock()
+    cache.get_or_compute.side_effect = lambda *args, **kwargs: scheduler.acquire()
+    client = app.app.test_client()
+    with patch.object(app, 'get_client', return_value=MagicMock(scheduler=scheduler)), \
+         patch.object(app, 'get_analysis_cache', return_value=cache):
+        started = time.monotonic()
+        response = client.post('/analyze', json={'github_url': 'https://github.com/owner/repo'})
+    
+    assert time.monotonic() - started < 1
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '60'
+
+
+def test_jobs_endpoints_return_an_id_then_the_result():
+    client = app.app.test_client()
+    with patch.object(app, 'analysis_jobs', JobQueue(lambda payload: {'job_description': f"{payload['repo']} role"})):
+        response = client.post('/jobs', json={'github_url': 'https://github.com/owner/repo'})
+        assert response.status_code == 202
+        job_id = response.json['job_id']
+        assert response.headers['Location'] == f'/jobs/{job_id}'
+        
+        deadline = time.time() + 5
+        while client.get(f'/jobs/{job_id}').json['state'] != 'done' and time.time() < deadline:
+            time.sleep(0.01)
+        result = client.get(f'/jobs/{job_id}/result')
+    
+    assert result.status_code == 200
+    assert result.json == {'job_description': 'repo role'}
+    assert client.get('/jobs/unknown').status_code == 404
+
+
+def test_jobs_generate_under_admission_control():
+    cache = MagicMock()
+    cache.get_or_compute.return_value = REPO_DATA
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+    with patch.object(app, 'get_analysis_cache', return_value=cache), \
+         patch.object(app, 'generation_admission', controller), \
+         patch.object(app, 'generate_job_description', return_value='Join us') as generate:
+        with controller.admit():
+            with pytest.raises(app.Overloaded):
+                app.run_analysis_job({'owner': 'owner', 'repo': 'repo'})
+        result = app.run_analysis_job({'owner': 'owner', 'repo': 'repo'})
+    
+    assert result == {'job_description': 'Join us'}
+    assert 0 < generate.call_args.kwargs['timeout'] <= app.JOB_GENERATION_DEADLINE
+    assert controller.stats()['admitted'] == 2
+
+
+def test_analyze_sheds_load_when_generation_is_saturated():
+    cache = MagicMock()
+    cache.get_or_compute.return_value = REPO_DATA
+    cache.stats.return_value = {}
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+    client = app.app.test_client()
+    with patch.object(app, 'get_analysis_cache', return_value=cache), \
+         patch.object(app, 'generation_admission', controller), \
+         patch.object(app, 'generate_job_description', return_value='Join us'):
+        with controller.admit():
+            busy = client.post('/analyze', json={'github_url': 'https://github.com/owner/repo'})
+        served = client.post('/analyze', json={'github_url': 'https://github.com/owner/repo'})
+        stats = client.get('/stats').json
+    
+    assert busy.status_code == 429
+    assert int(busy.headers['Retry-After']) >= 1
+    assert served.json == {'job_description': 'Join us'}
+    assert stats['admission']['rejected'] == 1
@@ -0,0 +1,65 @@
+import io
+import json
+import threading
+
+from batch_analyze import load_completed, repo_key, run_batch
+
+
+def _write_requests(path, urls):
+    path.write_text(''.join(json.dumps({'repo_url': url}) + '\n' for url in urls))
+
+
+def _results(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_repo_key_normalises_urls():
+    assert repo_key('https://github.com/Owner/Repo.git') == 'owner/repo'
+    assert repo_key('github.com/owner/repo/tree/main') == 'owner/repo'
+
+
+def test_results_stream_out_with_bounded_concurrency(tmp_path):
+    requests_path, results_path = tmp_path / 'repos.jsonl', tmp_path / 'results.jsonl'
+    _write_requests(requests_path, [f'https://github.com/owner/repo{i}' for i in range(10)])
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def analyze(url):
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+        try:
+            if url.endswith('repo3'):
+                raise ValueError('Repository not found')
+            return {'name': url.rsplit('/', 1)[1]}
+        finally:
+            with lock:
+                running[0] -= 1
+
+    summary = run_batch(str(requests_path), str(results_path), analyze, concurrency=3, progress_stream=io.StringIO())
+
+    records = _results(results_path)
+    assert sorted(record['key'] for record in records) == [f'owner/repo{i}' for i in range(10)]
+    assert [record['error'] for record in records if record['status'] == 'error'] == ['Repository not found']
+    assert running[1] <= 3
+    assert summary['processed'] == 10 and summary['failed'] == 1
+
+
+def test_rerun_resumes_after_completed_repositories(tmp_path):
+    requests_path, results_path = tmp_path / 'repos.jsonl', tmp_path / 'results.jsonl'
+    _write_requests(requests_path, ['https://github.com/owner/a', 'https://github.com/owner/c', 'https://github.com/owner/b'])
+    results_path.write_text(
+        json.dumps({'key': 'owner/a', 'status': 'ok'}) + '\n'
+        + json.dumps({'key': 'owner/b', 'status': 'error', 'error': 'rate limited'}) + '\n'
+        + '{"key": "owner/c", "sta'  # cut off by a crash
+    )
+    analyzed = []
+
+    # owner/c is the first repository written after the cut-off line
+    run_batch(str(requests_path), str(results_path), lambda url: analyzed.append(url) or 'report', concurrency=1,
+              retry_failed=True, progress_stream=io.StringIO())
+
+    assert analyzed == ['https://github.com/owner/c', 'https://github.com/owner/b']
+    records = _results(results_path)
+    assert [record['key'] for record in records] == ['owner/a', 'owner/b', 'owner/c', 'owner/b']
+    assert load_completed(str(results_path), retry_failed=True) == {'owner/a', 'owner/b', 'owner/c'}
@@ -0,0 +1,70 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from batching import MicroBatcher
+
+
+def test_concurrent_items_are_batched_and_routed_back():
+    batches = []
+    
+    def process(items):
+        batches.append(list(items))
+        return [item.upper() for item in items]
+    
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait=0.2)
+    items = [f'prompt {i}' for i in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(batcher.submit, items))
+    
+    assert results == [item.upper() for item in items]
+    assert all(len(batch) <= 4 for batch in batches)
+    assert len(batches) < len(items)
+    assert batcher.stats()['items'] == 8
+
+
+def test_batch_errors_reach_every_caller():
+    release = threading.Event()
+    
+    def process(items):
+        release.wait(5)
+        raise RuntimeError('model failed')
+    
+    batcher = MicroBatcher(process, max_batch_size=2, max_wait=0.2)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(batcher.submit, prompt) for prompt in ('a', 'b')]
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match='model failed'):
+                future.result()
+
+
+def test_mismatched_result_count_is_an_error():
+    batcher = MicroBatcher(lambda items: [], max_wait=0)
+    with pytest.raises(ValueError, match='produced 0 results'):
+        batcher.submit('prompt')
+
+
+def test_timed_out_items_are_not_processed():
+    started, release = threading.Event(), threading.Event()
+    processed = []
+    
+    def process(items):
+        processed.extend(items)
+        started.set()
+        release.wait(5)
+        return items
+    
+    batcher = MicroBatcher(process, max_batch_size=1, max_wait=0)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        first = executor.submit(batcher.submit, 'a')
+        started.wait(5)
+        with pytest.raises(TimeoutError):
+            batcher.submit('b', timeout=0.05)
+        release.set()
+        assert first.result() == 'a'
+    
+    assert batcher.submit('c') == 'c'
+    assert processed == ['a', 'c']
+    assert batcher.stats()['cancelled'] == 1
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from crewai.memory.types import MemoryRecord
+
+from crew_memory import CrewMemoryStore, partition_name
+
+def _save(storage, content, age, vector):
+    storage.save([MemoryRecord(content=content, scope='/', embedding=vector,
+                               created_at=datetime.utcnow() - age)])
+
+def test_repositories_get_separate_partitions(tmp_path):
+    store = CrewMemoryStore(str(tmp_path), maintain_every=0)
+    assert partition_name('https://github.com/Owner/Repo/') == partition_name('https://github.com/owner/repo')
+    
+    _save(store.storage(partition_name('https://github.com/owner/a')), 'uses flask', timedelta(0), [1.0, 0.0])
+    _save(store.storage(partition_name('https://github.com/owner/b')), 'uses django', timedelta(0), [1.0, 0.0])
+    
+    memory = store.memory('https://github.com/owner/a')
+    results = memory._storage.search([1.0, 0.0], limit=10)
+    assert [record.content for record, _ in results] == ['uses flask']
+    assert store.stats()['partitions'] == 2
+    assert store.stats()['queries'] == 1
+
+def test_maintenance_applies_ttl_and_record_cap(tmp_path):
+    store = CrewMemoryStore(str(tmp_path), ttl=3600, max_records=2, maintain_every=2)
+    storage = store.storage(partition_name('https://github.com/owner/repo'))
+    for i in range(4):
+        _save(storage, f'recent {i}', timedelta(minutes=i), [float(i), 1.0])
+    _save(storage, 'stale', timedelta(days=2), [9.0, 1.0])
+    
+    store.begin_run('https://github.com/owner/repo')
+    store.memory('https://github.com/owner/repo')
+    store.memory('https://github.com/owner/repo')
+    assert storage.count() == 5
+    store.begin_run('https://github.com/Owner/Repo')
+    
+    assert [record.content for record in storage.list_records()] == ['recent 0', 'recent 1']
+    assert store.stats()['expired'] == 1 and store.stats()['trimmed'] == 2
+
+def test_oldest_partitions_are_dropped_over_the_size_cap(tmp_path):
+    store = CrewMemoryStore(str(tmp_path), maintain_every=0)
+    old = store.storage(partition_name('https://github.com/owner/old'))
+    _save(old, 'old memory', timedelta(0), [1.0, 0.0])
+    new_partition = partition_name('https://github.com/owner/new')
+    _save(store.storage(new_partition), 'new memory', timedelta(0), [1.0, 0.0])
+    store.max_bytes = store.partition_usage()[new_partition][0]
+    
+    assert store.maintain(new_partition)['evicted'] == 1
+    assert list(store.partition_usage()) == [new_partition]
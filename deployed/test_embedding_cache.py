@@ -0,0 +1,48 @@
+import numpy as np
+
+from embedding_cache import CachedEmbeddingFunction, EmbeddingCache
+
+class _FakeEmbedder:
+    def __init__(self):
+        self.calls = []
+    
+    def __call__(self, input):
+        self.calls.append(list(input))
+        return [np.array([len(text), 1.0, 0.5], dtype=np.float32) for text in input]
+    
+    def name(self):
+        return 'fake'
+    
+    def get_config(self):
+        return {'model_name': 'fake-small'}
+
+def test_only_unseen_texts_reach_the_model(tmp_path):
+    embedder = _FakeEmbedder()
+    cached = CachedEmbeddingFunction(embedder, cache=EmbeddingCache(str(tmp_path), 'fake'))
+    
+    first = cached(['readme', 'task', 'readme'])
+    second = cached(['task', 'analysis'])
+    
+    assert embedder.calls == [['readme', 'task'], ['analysis']]
+    assert np.array_equal(first[0], first[2]) and np.array_equal(first[1], second[0])
+    assert cached.cache.stats()['hits'] == 1
+    assert cached.name() == 'fake'
+
+def test_vectors_survive_a_new_process(tmp_path):
+    EmbeddingCache(str(tmp_path), 'fake').put_many(['readme'], [[1.0, 2.0, 3.0]])
+    
+    cache = EmbeddingCache(str(tmp_path), 'fake')
+    assert cache.get_many(['readme', 'other'])[0].tolist() == [1.0, 2.0, 3.0]
+    assert cache.stats()['misses'] == 1
+    assert EmbeddingCache(str(tmp_path), 'other model').get_many(['readme']) == [None]
+
+def test_least_recently_used_vectors_are_evicted(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 'fake', max_entries=2)
+    cache.put_many(['a'], [[1.0]])
+    cache.put_many(['b'], [[2.0]])
+    cache.get_many(['a'])
+    cache.put_many(['c'], [[3.0]])
+    
+    assert [vector is not None for vector in cache.get_many(['a', 'b', 'c'])] == [True, False, True]
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['matrix_bytes'] == 2 * 4
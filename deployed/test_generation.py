@@ -0,0 +1,116 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from generation import GeneratorLoader, GeneratorNotReady
+
+
+class _CharTokenizer:
+    # Maps each character to a token id so prefixes, suffixes and continuations split cleanly
+    pad_token_id = 0
+    
+    def __call__(self, texts, return_tensors='pt', padding=False, add_special_tokens=True):
+        import torch
+        texts = [texts] if isinstance(texts, str) else texts
+        width = max(len(text) for text in texts)
+        ids = [[0] * (width - len(text)) + [ord(c) % 60 + 1 for c in text] for text in texts]
+        mask = [[0] * (width - len(text)) + [1] * len(text) for text in texts]
+        return {'input_ids': torch.tensor(ids), 'attention_mask': torch.tensor(mask)}
+    
+    def decode(self, ids, skip_special_tokens=True):
+        return ''.join(chr(token + 64) for token in ids.tolist() if token)
+    
+    def batch_decode(self, outputs, skip_special_tokens=True):
+        return [self.decode(row) for row in outputs]
+
+
+def _tiny_generator():
+    import torch
+    from transformers import GPT2Config, GPT2LMHeadModel
+    torch.manual_seed(0)
+    model = GPT2LMHeadModel(GPT2Config(vocab_size=64, n_positions=128, n_embd=32, n_layer=2, n_head=2,
+                                       pad_token_id=0, eos_token_id=63, bos_token_id=63)).eval()
+    return MagicMock(tokenizer=_CharTokenizer(), model=model)
+
+
+def test_loader_loads_once_and_warms_up(fake_factory):
+    factory = MagicMock(side_effect=fake_factory())
+    loader = GeneratorLoader('tiny', factory=factory)
+    
+    generator = loader.get(timeout=5)
+    assert loader.get(timeout=5) is generator
+    
+    factory.assert_called_once_with('tiny')
+    generator.assert_called_once_with('Hello', max_new_tokens=1, num_return_sequences=1)
+    status = loader.status()
+    assert status['state'] == 'ready'
+    assert status['load_seconds'] is not None and status['warmup_seconds'] is not None
+
+
+def test_loader_reports_loading_and_failure(fake_factory):
+    release = threading.Event()
+    loader = GeneratorLoader('tiny', factory=fake_factory(release))
+    with pytest.raises(GeneratorNotReady, match='still loading'):
+        loader.get(timeout=0.01)
+    release.set()
+    loader.load()
+    assert loader.ready
+    
+    failing = GeneratorLoader('missing', factory=MagicMock(side_effect=OSError('no such model')))
+    with pytest.raises(GeneratorNotReady, match='no such model'):
+        failing.load()
+    assert failing.status()['state'] == 'failed'
+
+
+def test_int8_backend_keeps_gpt2_outputs_close():
+    import torch
+    from transformers import GPT2Config, GPT2LMHeadModel
+    from generation import quantize_int8
+    
+    torch.manual_seed(0)
+    model = GPT2LMHeadModel(GPT2Config(vocab_size=64, n_positions=32, n_embd=32, n_layer=2, n_head=2)).eval()
+    input_ids = torch.randint(0, 64, (2, 10))
+    with torch.inference_mode():
+        expected = model(input_ids).logits
+        quantized = quantize_int8(model)
+        actual = quantized(input_ids).logits
+    
+    assert any(type(module).__name__ == 'Linear' and 'quantized' in type(module).__module__
+               for module in quantized.modules())
+    assert torch.allclose(actual, expected, atol=0.05)
+
+
+def test_unknown_backend_is_rejected():
+    from generation import default_factory
+    with pytest.raises(ValueError, match='Unknown generator backend'):
+        default_factory('gpt2', 'tensorrt')
+
+
+def test_prefix_cache_matches_full_prompt_generation():
+    from generation import generate_batch
+    
+    generator = _tiny_generator()
+    prefix = 'Generate a job description. '
+    suffixes = ['Project alpha.', 'Project beta uses Go and Rust.']
+    kwargs = {'max_new_tokens': 8, 'do_sample': False}
+    
+    cached = generate_batch(generator, suffixes, prefix=prefix, **kwargs)
+    full = [generate_batch(generator, [prefix + suffix], **kwargs)[0] for suffix in suffixes]
+    
+    assert cached == full
+
+
+def test_generation_stops_when_complete_and_returns_only_the_continuation():
+    from generation import generate_batch
+    
+    generator = _tiny_generator()
+    prompts = ['Project alpha.', 'Project beta uses Go.']
+    
+    unbounded = generate_batch(generator, prompts, return_full_text=False, max_new_tokens=12, do_sample=False)
+    stopped = generate_batch(generator, prompts, return_full_text=False, max_new_tokens=12, do_sample=False,
+                             is_complete=lambda text: len(text) >= 3)
+    
+    assert [len(text) for text in unbounded] == [12, 12]
+    assert [len(text) for text in stopped] == [3, 3]
+    assert [text[:3] for text in unbounded] == stopped
@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+import requests
+
+from github_cache import ResponseCache
+from github_client import GitHubClient
+from github_ratelimit import RateLimitScheduler
+
+def _response(status_code, body=b'', headers=None, url='https://api.github.com/repos/owner/repo'):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.headers.update(headers or {})
+    response.url = url
+    response.encoding = 'utf-8'
+    return response
+
+def test_not_modified_is_served_from_cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite3'))
+    client = GitHubClient(cache=cache)
+    
+    fresh = _response(200, b'{"name": "test-repo"}', {'ETag': '"abc"'})
+    not_modified = _response(304, headers={'ETag': '"abc"', 'X-RateLimit-Remaining': '4999'})
+    
+    with patch.object(client.session, 'request', side_effect=[fresh, not_modified]) as mock_get:
+        first = client.get('/repos/owner/repo')
+        second = client.get('/repos/owner/repo')
+    
+    assert first.json() == {'name': 'test-repo'}
+    assert second.status_code == 200
+    assert second.json() == {'name': 'test-repo'}
+    assert second.from_cache
+    assert second.headers['X-RateLimit-Remaining'] == '4999'
+    assert mock_get.call_args_list[1].kwargs['headers']['If-None-Match'] == '"abc"'
+    assert cache.stats()['revalidated_hits'] == 1
+
+def test_cached_bodies_are_not_shared_between_tokens(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite3'))
+    scheduler = RateLimitScheduler(['private', 'public'])
+    client = GitHubClient(cache=cache, scheduler=scheduler)
+    
+    private = _response(200, b'{"private": true}', {'ETag': '"abc"'})
+    fresh = _response(200, b'{"private": false}', {'ETag': '"def"'})
+    with patch.object(scheduler, 'acquire', side_effect=['private', 'public']), \
+         patch.object(client.session, 'request', side_effect=[private, fresh]) as mock_get:
+        first = client.get('/repos/owner/repo')
+        second = client.get('/repos/owner/repo')
+    
+    assert first.json() == {'private': True}
+    assert second.json() == {'private': False}
+    assert 'If-None-Match' not in mock_get.call_args_list[1].kwargs['headers']
+    assert cache.stats()['entries'] == 2
+
+def test_responses_without_validators_are_not_stored(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite3'))
+    
+    cache.store('key', _response(200, b'{}'))
+    
+    assert cache.stats()['entries'] == 0
+
+def test_lru_eviction_and_purge(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite3'), max_bytes=25)
+    
+    for name in ('a', 'b', 'c'):
+        url = f'https://api.github.com/repos/owner/{name}'
+        cache.store(cache.key(url), _response(200, b'x' * 10, {'ETag': name}, url=url))
+        if name == 'b':
+            cache.touch(cache.key('https://api.github.com/repos/owner/a'))
+    
+    urls = [entry['url'] for entry in cache.entries()]
+    assert 'https://api.github.com/repos/owner/b' not in urls
+    assert len(urls) == 2
+    
+    assert cache.purge('https://api.github.com/repos/owner/c') == 1
+    assert cache.stats()['entries'] == 1
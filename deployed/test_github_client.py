@@ -0,0 +1,56 @@
+import io
+from unittest.mock import patch
+
+import requests
+
+from github_client import GitHubClient, get_client, set_client
+from github_ratelimit import RateLimitScheduler
+
+def _response(status_code=200, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b'{}'
+    response.raw = io.BytesIO()
+    response.headers.update(headers or {})
+    return response
+
+def test_client_sets_pool_sizes():
+    client = GitHubClient(token='secret', pool_connections=2, pool_maxsize=32)
+    
+    adapter = client.session.get_adapter('https://api.github.com')
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 32
+    assert client.authenticated
+
+def test_client_resolves_paths_and_applies_default_timeout():
+    client = GitHubClient(token='secret', timeout=3)
+    
+    with patch.object(client.session, 'request', side_effect=lambda *a, **kw: _response()) as mock_request:
+        client.get('/repos/owner/repo')
+        client.get('https://api.github.com/repos/owner/repo/languages', timeout=10)
+    
+    first, second = mock_request.call_args_list
+    assert first.args == ('GET', 'https://api.github.com/repos/owner/repo')
+    assert first.kwargs['timeout'] == 3
+    assert first.kwargs['headers']['Authorization'] == 'token secret'
+    assert second.args == ('GET', 'https://api.github.com/repos/owner/repo/languages')
+    assert second.kwargs['timeout'] == 10
+
+def test_rate_limited_request_is_retried_on_another_token():
+    client = GitHubClient(scheduler=RateLimitScheduler(['first', 'second'], max_wait=0))
+    limited = _response(403, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '9999999999'})
+    
+    with patch.object(client.session, 'request', side_effect=[limited, _response()]) as mock_request:
+        response = client.get('/repos/owner/repo')
+    
+    assert response.status_code == 200
+    tokens = [c.kwargs['headers']['Authorization'] for c in mock_request.call_args_list]
+    assert len(set(tokens)) == 2
+
+def test_get_client_is_shared(monkeypatch):
+    monkeypatch.setenv('GITHUB_CACHE', '0')
+    set_client(None)
+    try:
+        assert get_client() is get_client()
+    finally:
+        set_client(None)
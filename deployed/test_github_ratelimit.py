@@ -0,0 +1,89 @@
+import time
+
+import pytest
+import requests
+
+from github_ratelimit import RateLimitExceeded, RateLimitScheduler, tokens_from_env
+
+def _response(status_code=200, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return response
+
+def test_acquire_prefers_token_with_most_budget():
+    scheduler = RateLimitScheduler(['a', 'b'])
+    scheduler.update('a', _response(headers={'X-RateLimit-Remaining': '10', 'X-RateLimit-Reset': str(time.time() + 3600)}))
+    
+    assert scheduler.acquire() == 'b'
+
+def test_exhausted_pool_waits_for_reset_then_gives_up():
+    scheduler = RateLimitScheduler(['a'], max_wait=1)
+    scheduler.update('a', _response(403, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(time.time() + 0.2)}))
+    
+    started = time.monotonic()
+    assert scheduler.acquire() == 'a'
+    assert time.monotonic() - started >= 0.1
+    assert scheduler.waits == 1
+    
+    scheduler.update('a', _response(403, {'Retry-After': '60'}))
+    with pytest.raises(RateLimitExceeded):
+        scheduler.acquire()
+
+def test_wait_at_most_bounds_the_wait_in_the_calling_thread():
+    scheduler = RateLimitScheduler(['a'], max_wait=60)
+    scheduler.update('a', _response(403, {'Retry-After': '0.5'}))
+
+    with scheduler.wait_at_most(0):
+        with pytest.raises(RateLimitExceeded):
+            scheduler.acquire()
+    assert scheduler.acquire() == 'a'
+
+def test_revalidations_do_not_drain_budget():
+    scheduler = RateLimitScheduler(['a'], max_wait=0)
+    reset = str(time.time() + 3600)
+    scheduler.update('a', _response(headers={'X-RateLimit-Remaining': '2', 'X-RateLimit-Reset': reset}))
+
+    for _ in range(10):
+        token = scheduler.acquire()
+        scheduler.update(token, _response(304, {'X-RateLimit-Remaining': '2', 'X-RateLimit-Reset': reset}))
+        scheduler.update(scheduler.acquire(), _response(304))
+
+    assert scheduler.status()[0]['remaining'] == 2
+    assert scheduler.status()[0]['in_flight'] == 0
+
+def test_reservations_are_settled_by_responses():
+    scheduler = RateLimitScheduler(['a'], max_wait=0)
+    reset = str(time.time() + 3600)
+    scheduler.update('a', _response(headers={'X-RateLimit-Remaining': '2', 'X-RateLimit-Reset': reset}))
+
+    first, second = scheduler.acquire(), scheduler.acquire()
+    with pytest.raises(RateLimitExceeded):
+        scheduler.acquire()
+
+    scheduler.update(first, _response(headers={'X-RateLimit-Remaining': '1', 'X-RateLimit-Reset': reset}))
+    scheduler.release(second)
+    assert scheduler.status()[0]['remaining'] == 0
+    with pytest.raises(RateLimitExceeded):
+        scheduler.acquire()
+
+def test_tokens_from_env(monkeypatch):
+    monkeypatch.setenv('GITHUB_TOKENS', 'one, two,')
+    assert tokens_from_env() == ['one', 'two']
+    
+    monkeypatch.delenv('GITHUB_TOKENS')
+    monkeypatch.delenv('GITHUB_TOKEN', raising=False)
+    assert tokens_from_env() == [None]
+
+def test_reservation_is_settled_on_the_reserved_resource():
+    scheduler = RateLimitScheduler(['a'], max_wait=0)
+    reset = str(time.time() + 3600)
+
+    token = scheduler.acquire('search')
+    scheduler.update(token, _response(headers={'X-RateLimit-Resource': 'code_search', 'X-RateLimit-Remaining': '9',
+                                               'X-RateLimit-Reset': reset}), 'search')
+
+    status = {entry['resource']: entry for entry in scheduler.status()}
+    assert status['search']['in_flight'] == 0
+    assert status['code_search']['remaining'] == 9
+    assert status['code_search']['in_flight'] == 0
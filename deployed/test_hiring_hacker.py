@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import hiring_hacker
+from hiring_hacker.__main__ import HEAVY_MODULES, measure
+
+def _loaded_after_import(statement):
+    code = f"import json, sys\n{statement}\nprint(json.dumps(sorted(sys.modules)))"
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    return set(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+@pytest.mark.parametrize("statement", [
+    "import hiring_hacker",
+    "import hiring_hacker.analyzer",
+    "import hiring_hacker.crew",
+    "import hiring_hacker.repository, hiring_hacker.job_description",
+    "from hiring_hacker import analyze_github_repo",
+    "import batch_analyze",
+])
+def test_imports_skip_heavy_dependencies(statement):
+    loaded = _loaded_after_import(statement)
+    for name in ("crewai", "crewai_tools", "streamlit", "chromadb", "flask", "transformers"):
+        assert name not in loaded
+
+def test_lazy_exports():
+    from hiring_hacker.analyzer import analyze_github_repo
+
+    assert hiring_hacker.analyze_github_repo is analyze_github_repo
+    assert "analyze_github_repo" in hiring_hacker.__all__
+    with pytest.raises(AttributeError):
+        hiring_hacker.does_not_exist
+
+def test_measure_reports_heavy_modules():
+    result = measure("json", repeat=1)
+
+    assert result["module"] == "json"
+    assert result["seconds"] >= 0
+    assert not set(result["heavy"]) & set(HEAVY_MODULES)
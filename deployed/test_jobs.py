@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+from jobs import JobQueue, JobQueueFull
+
+
+def _wait_until_finished(queue, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError('job did not finish')
+
+
+def test_jobs_run_in_the_background_and_keep_their_result():
+    queue = JobQueue(lambda payload: payload * 2, max_workers=2)
+    jobs = [queue.submit(n) for n in range(4)]
+    
+    results = [_wait_until_finished(queue, job.id).result for job in jobs]
+    
+    assert results == [0, 2, 4, 6]
+    assert queue.stats()['jobs'] == {'done': 4}
+
+
+def test_failures_are_recorded():
+    def run(payload):
+        raise ValueError('Unable to analyze repository')
+    
+    queue = JobQueue(run, max_workers=1)
+    job = _wait_until_finished(queue, queue.submit('owner/repo').id)
+    
+    assert job.state == 'failed'
+    assert job.error == 'Unable to analyze repository'
+
+
+def test_pending_jobs_are_bounded():
+    release = threading.Event()
+    queue = JobQueue(lambda payload: release.wait(5), max_workers=1, max_pending=1)
+    running = queue.submit('a')
+    deadline = time.time() + 5
+    while queue.get(running.id).state != 'running' and time.time() < deadline:
+        time.sleep(0.01)
+    queue.submit('b')
+    
+    with pytest.raises(JobQueueFull):
+        queue.submit('c')
+    release.set()
+    assert queue.stats()['rejected'] == 1
+
+
+def test_finished_jobs_expire():
+    queue = JobQueue(lambda payload: payload, max_workers=1, ttl=0.05)
+    job = _wait_until_finished(queue, queue.submit('a').id)
+    
+    time.sleep(0.1)
+    
+    assert queue.get(job.id) is None
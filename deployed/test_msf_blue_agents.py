@@ -1,16 +1,25 @@
+import io
+import os
 import sys
+import tarfile
+import threading
+import time
 import pytest
 from unittest.mock import patch, MagicMock
 
 # Add the parent directory to the sys.path to ensure the module can be found
 sys.path.insert(0, '/Users/mmoussaif/projects/dev-demo/sundai-blue-agents/hiring_hacker/deployed')
 
-# Import from crewai_tools for GithubSearchTool
-from crewai_tools import GithubSearchTool
 # Import our analyze function and CustomTool class
-from msf_blue_agents import analyze_github_repo, CustomTool
+from hiring_hacker import analyzer, crew
+from hiring_hacker.analyzer import analyze_github_repo
+from hiring_hacker.crew import CustomTool
+from result_cache import AnalysisCache, TaskOutputCache, TieredCache
 
 def test_github_search_tool():
+    # Imported here so the other tests do not wait for crewai_tools
+    from crewai_tools import GithubSearchTool
+
     with pytest.raises(ValueError):
         GithubSearchTool(gh_token=None, content_types=['repo, code'])
 
@@ -33,16 +42,16 @@ def test_custom_tool():
     assert tool.description == "A test tool"
     assert tool.func("test") == "Result: test"
 
-@patch('msf_blue_agents.requests.get')
+@patch('github_client.GitHubClient.get')
 def test_analyze_github_repo_invalid_url(mock_get):
     # Test with invalid URL
     result = analyze_github_repo('https://invalid-url.com/repo')
     assert "Invalid GitHub repository URL" in result
     
-    # Ensure requests.get was not called
+    # Ensure no GitHub request was made
     mock_get.assert_not_called()
 
-@patch('msf_blue_agents.requests.get')
+@patch('github_client.GitHubClient.get')
 def test_analyze_github_repo_valid_url(mock_get):
     # Mock responses for different API endpoints
     mock_responses = {
@@ -78,7 +87,7 @@ def test_analyze_github_repo_valid_url(mock_get):
         )
     }
     
-    def side_effect(url, headers=None):
+    def side_effect(url, headers=None, **kwargs):
         return mock_responses.get(url, MagicMock(json=lambda: {}))
     
     mock_get.side_effect = side_effect
@@ -93,3 +102,361 @@ def test_analyze_github_repo_valid_url(mock_get):
     assert 'Python' in result  # language
     assert 'Test Readme' in result
     assert '3' in result  # contributors
+
+def _github_responses():
+    # Mocked GitHub API responses with explicit status codes
+    payloads = {
+        'https://api.github.com/repos/owner/repo': {
+            'name': 'test-repo',
+            'description': 'Test repository',
+            'stargazers_count': 100,
+            'forks_count': 50,
+            'watchers_count': 100,  # GitHub mirrors the star count here
+            'open_issues_count': 10,
+            'created_at': '2023-01-01',
+            'updated_at': '2023-02-01',
+            'license': None
+        },
+        'https://api.github.com/repos/owner/repo/languages': {'Python': 10000, 'JavaScript': 5000},
+        'https://api.github.com/repos/owner/repo/readme': {'content': 'VGVzdCBSZWFkbWU='},
+        'https://api.github.com/repos/owner/repo/contributors': [{'login': 'alice', 'contributions': 7}],
+        'https://api.github.com/repos/owner/repo/contents': [
+            {'type': 'dir', 'name': 'src'},
+            {'type': 'file', 'name': 'README.md', 'url': 'https://api.github.com/repos/owner/repo/contents/README.md'},
+            {'type': 'file', 'name': 'test.py', 'url': 'https://api.github.com/repos/owner/repo/contents/test.py'}
+        ],
+        'https://api.github.com/repos/owner/repo/contents/test.py': {'content': 'cHJpbnQoImhlbGxvIHdvcmxkIik='},
+        'https://api.github.com/repos/owner/repo/contents/requirements.txt': {'content': 'cmVxdWVzdHM='}  # "requests"
+    }
+    
+    def side_effect(url, headers=None, **kwargs):
+        if url in payloads:
+            return MagicMock(status_code=200, json=lambda: payloads[url])
+        return MagicMock(status_code=404, json=lambda: {'message': 'Not Found'})
+    
+    return side_effect
+
+@patch('github_client.GitHubClient.get')
+def test_analyze_github_repo_concurrent_matches_sequential(mock_get):
+    mock_get.side_effect = _github_responses()
+    
+    sequential = analyze_github_repo('https://github.com/owner/repo', max_workers=1)
+    concurrent = analyze_github_repo('https://github.com/owner/repo', max_workers=8)
+    
+    assert sequential == concurrent
+    assert 'Test Readme' in concurrent
+    assert 'alice: 7 contributions' in concurrent
+    assert 'No license information' in concurrent
+    assert '### requirements.txt' in concurrent
+    assert 'print("hello world")' in concurrent
+
+@patch('github_client.GitHubClient.get')
+def test_analyze_github_repo_deadline_drops_slow_endpoints(mock_get):
+    responses = _github_responses()
+    
+    def slow_readme(url, headers=None, **kwargs):
+        if url.endswith('/readme'):
+            time.sleep(1)
+        return responses(url, headers)
+    
+    mock_get.side_effect = slow_readme
+    
+    started = time.monotonic()
+    result = analyze_github_repo('https://github.com/owner/repo', max_workers=8, deadline=0.3)
+    
+    assert time.monotonic() - started < 1
+    assert 'test-repo' in result
+    assert 'README not found' in result
+    assert 'could not be fetched' in result
+    # Requests left running at the deadline are bounded by it rather than by the client timeout
+    assert all(0 < c.kwargs['timeout'] <= 0.3 for c in mock_get.call_args_list)
+
+@patch('github_client.GitHubClient.get')
+def test_partial_reports_are_not_cached(mock_get):
+    responses = _github_responses()
+    slow = [True]
+    
+    def side_effect(url, headers=None, **kwargs):
+        if url.endswith('/readme') and slow[0]:
+            time.sleep(1)
+        return responses(url, headers)
+    
+    mock_get.side_effect = side_effect
+    cache = AnalysisCache(TieredCache(None))
+    
+    with patch('hiring_hacker.analyzer.get_analysis_cache', return_value=cache), \
+         patch('hiring_hacker.analyzer.GITHUB_FETCH_DEADLINE', 0.3), \
+         patch('result_cache.head_sha', return_value='abc123'):
+        partial = analyzer.cached_analyze_github_repo('https://github.com/owner/repo')
+        slow[0] = False
+        complete = analyzer.cached_analyze_github_repo('https://github.com/owner/repo')
+        mock_get.reset_mock()
+        cached = analyzer.cached_analyze_github_repo('https://github.com/owner/repo')
+    
+    assert 'README not found' in partial
+    assert 'Test Readme' in complete and 'could not be fetched' not in complete
+    assert cached == complete
+    mock_get.assert_not_called()
+
+def _graphql_responses():
+    # GraphQL answers describing the same repository as _github_responses
+    snapshot = {
+        'name': 'test-repo',
+        'description': 'Test repository',
+        'stargazerCount': 100,
+        'forkCount': 50,
+        'issues': {'totalCount': 6},
+        'pullRequests': {'totalCount': 4},
+        'createdAt': '2023-01-01',
+        'updatedAt': '2023-02-01',
+        'licenseInfo': None,
+        'languages': {'edges': [
+            {'size': 10000, 'node': {'name': 'Python'}},
+            {'size': 5000, 'node': {'name': 'JavaScript'}}
+        ]},
+        'root': {'entries': [
+            {'name': 'src', 'type': 'tree', 'mode': 16384},
+            {'name': 'README.md', 'type': 'blob', 'mode': 33188},
+            {'name': 'test.py', 'type': 'blob', 'mode': 33188}
+        ]},
+        'manifest0': None,
+        'manifest1': {'text': 'requests'},
+        'manifest2': None,
+        'manifest3': None,
+        'manifest4': None
+    }
+    blobs = {'blob0': {'text': 'Test Readme'}, 'blob1': {'text': 'print("hello world")'}}
+    
+    def side_effect(query, variables=None, **kwargs):
+        data = snapshot if 'manifest0' in query else blobs
+        return MagicMock(status_code=200, json=lambda: {'data': {'repository': data}})
+    
+    return side_effect
+
+@patch('github_client.GitHubClient.authenticated', True)
+@patch('github_client.GitHubClient.graphql')
+@patch('github_client.GitHubClient.get')
+def test_analyze_github_repo_graphql_matches_rest(mock_get, mock_graphql):
+    mock_get.side_effect = _github_responses()
+    mock_graphql.side_effect = _graphql_responses()
+    
+    rest = analyze_github_repo('https://github.com/owner/repo', backend='rest')
+    graphql = analyze_github_repo('https://github.com/owner/repo', backend='graphql')
+    
+    assert graphql == rest
+    assert mock_graphql.call_count == 2
+    # Only the contributors endpoint is left on REST
+    assert [c.args[0] for c in mock_get.call_args_list if 'contributors' in c.args[0]]
+
+@patch('github_client.GitHubClient.authenticated', True)
+@patch('github_client.GitHubClient.graphql')
+def test_analyze_github_repo_graphql_not_found(mock_graphql):
+    mock_graphql.return_value = MagicMock(
+        status_code=200,
+        json=lambda: {'data': {'repository': None}, 'errors': [{'type': 'NOT_FOUND', 'message': 'missing'}]}
+    )
+    
+    with patch('github_client.GitHubClient.get', return_value=MagicMock(status_code=404)):
+        result = analyze_github_repo('https://github.com/owner/missing', backend='graphql')
+    
+    assert result == 'Repository not found: owner/missing'
+
+def _tarball(files):
+    # Build a gzipped tarball laid out like GitHub's (everything under one top-level directory)
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        for path, content in files.items():
+            if content is None:
+                info = tarfile.TarInfo(f'owner-repo-abc123/{path}')
+                info.type = tarfile.DIRTYPE
+                archive.addfile(info)
+            else:
+                data = content.encode('utf-8')
+                info = tarfile.TarInfo(f'owner-repo-abc123/{path}')
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+@patch('github_client.GitHubClient.get')
+def test_analyze_github_repo_tarball_walks_whole_tree(mock_get):
+    responses = _github_responses()
+    archive = _tarball({
+        'README.md': 'Tarball Readme',
+        'src': None,
+        'src/app': None,
+        'src/app/main.go': 'package main',
+        'src/app/util.go': 'package main // util',
+        'web/package.json': '{"name": "web"}',
+        'requirements.txt': 'flask',
+    })
+    
+    def side_effect(url, **kwargs):
+        if url.endswith('/tarball'):
+            assert kwargs.get('stream')
+            return MagicMock(status_code=200, raw=io.BytesIO(archive))
+        return responses(url)
+    
+    mock_get.side_effect = side_effect
+    
+    result = analyze_github_repo('https://github.com/owner/repo', backend='tarball')
+    
+    assert 'test-repo' in result
+    assert 'Tarball Readme' in result
+    assert '  - src/app\n' in result
+    assert '  - .go: 2 files\n' in result
+    assert '### web/package.json' in result
+    assert '### src/app/main.go' in result
+    assert 'exceeded the analysis budget' not in result
+
+@patch('github_client.GitHubClient.get')
+def test_tarball_walk_respects_byte_budget(mock_get):
+    archive = _tarball({f'file{index}.txt': 'x' * 2000 for index in range(50)})
+    mock_get.return_value = MagicMock(status_code=200, raw=io.BytesIO(archive))
+    
+    summary = analyzer._walk_tarball('owner', 'repo', None, max_bytes=200)
+    
+    assert summary['truncated']
+    assert summary['files_by_type'].get('.txt', 0) < 50
+
+class _SlowStream:
+    # Hands out the archive a little at a time, like a large download
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+
+    def read(self, size=-1):
+        time.sleep(0.01)
+        return self.data.read(min(size, 1024) if size and size > 0 else 1024)
+
+@patch('github_client.GitHubClient.get')
+def test_tarball_past_deadline_reports_partial_tree(mock_get):
+    responses = _github_responses()
+    files = {'src': None, 'src/main.go': 'package main'}
+    files.update({f'data/file{index}.txt': os.urandom(2000).hex() for index in range(100)})
+    files['README.md'] = 'Tarball Readme'
+    archive = _tarball(files)
+
+    def side_effect(url, **kwargs):
+        if url.endswith('/tarball'):
+            return MagicMock(status_code=200, raw=_SlowStream(archive))
+        return responses(url)
+
+    mock_get.side_effect = side_effect
+
+    result = analyze_github_repo('https://github.com/owner/repo', backend='tarball', deadline=0.5)
+
+    assert '  - src\n' in result
+    assert '### src/main.go' in result
+    assert 'exceeded the analysis budget' in result
+    # The walk stopped before the README, so the REST one is used
+    assert 'Test Readme' in result
+
+@patch('github_client.GitHubClient.get')
+def test_tarball_unavailable_falls_back_to_rest_readme(mock_get):
+    responses = _github_responses()
+    mock_get.side_effect = lambda url, **kwargs: (MagicMock(status_code=404) if url.endswith('/tarball')
+                                                  else responses(url))
+
+    result = analyze_github_repo('https://github.com/owner/repo', backend='tarball')
+
+    assert 'test-repo' in result
+    assert 'Test Readme' in result
+    assert 'exceeded the analysis budget' in result
+
+def _fake_crew(stages, upstream_outputs, runs):
+    # Stand-in for build_crew: records which stages ran and gives each task an output
+    tasks = {stage: MagicMock(output=MagicMock(raw=f'{stage} output {len(runs)}')) for stage in stages}
+    runs.append(list(stages))
+    return MagicMock(), tasks
+
+def test_run_pipeline_reuses_cached_stage_outputs():
+    cache = TaskOutputCache(TieredCache(None))
+    runs = []
+    
+    with patch('hiring_hacker.crew.get_task_cache', return_value=cache), \
+         patch('hiring_hacker.crew._begin_crew_run') as begin_crew_run, \
+         patch('hiring_hacker.crew.build_crew', side_effect=lambda url, report, stages, upstream, planning: _fake_crew(stages, upstream, runs)):
+        first = crew.run_pipeline('https://github.com/owner/repo', '# Repository Analysis: test-repo')
+        second = crew.run_pipeline('https://github.com/owner/repo', '# Repository Analysis: test-repo')
+        regenerated = crew.run_pipeline(
+            'https://github.com/owner/repo', '# Repository Analysis: test-repo', regenerate=['job_description']
+        )
+        changed = crew.run_pipeline('https://github.com/owner/repo', '# Repository Analysis: other')
+    
+    assert first == second
+    assert runs[0] == ['analysis']
+    assert sorted(runs[1:3]) == [['interview_questions'], ['job_description']]
+    assert runs[3] == ['job_description']
+    assert regenerated['analysis'] == first['analysis']
+    assert regenerated['job_description'] != first['job_description']
+    assert len(runs) == 7
+    assert changed['analysis'] == 'analysis output 4'
+    # One memory run per pipeline run that kicked off crews, not one per crew
+    assert begin_crew_run.call_count == 3
+
+
+def test_regenerated_analysis_regenerates_downstream_stages():
+    cache = TaskOutputCache(TieredCache(None))
+    runs = []
+    
+    with patch('hiring_hacker.crew.get_task_cache', return_value=cache), \
+         patch('hiring_hacker.crew.build_crew', side_effect=lambda url, report, stages, upstream, planning: _fake_crew(stages, upstream, runs)):
+        first = crew.run_pipeline('https://github.com/owner/repo', '# Repository Analysis: test-repo')
+        regenerated = crew.run_pipeline(
+            'https://github.com/owner/repo', '# Repository Analysis: test-repo', regenerate=['analysis']
+        )
+        again = crew.run_pipeline('https://github.com/owner/repo', '# Repository Analysis: test-repo')
+    
+    assert runs[3] == ['analysis']
+    assert sorted(runs[4:6]) == [['interview_questions'], ['job_description']]
+    assert len(runs) == 6
+    assert regenerated['analysis'] != first['analysis']
+    assert regenerated['job_description'] != first['job_description']
+    assert regenerated['interview_questions'] != first['interview_questions']
+    assert again == regenerated
+
+
+def test_downstream_stages_run_concurrently():
+    cache = TaskOutputCache(TieredCache(None))
+    barrier = threading.Barrier(2, timeout=5)
+    
+    def kickoff_stages(url, report, stages, upstream, planning):
+        if stages != ['analysis']:
+            # Both downstream crews must be running at the same time to pass the barrier
+            assert upstream['analysis'] == 'the analysis'
+            assert not planning
+            barrier.wait()
+        return {stage: 'the analysis' if stage == 'analysis' else f'{stage} output' for stage in stages}
+    
+    with patch('hiring_hacker.crew.get_task_cache', return_value=cache), \
+         patch('hiring_hacker.crew._kickoff_stages', side_effect=kickoff_stages):
+        outputs = crew.run_pipeline('https://github.com/owner/repo', '# Repository Analysis: test-repo')
+    
+    assert outputs == {
+        'analysis': 'the analysis',
+        'job_description': 'job_description output',
+        'interview_questions': 'interview_questions output',
+    }
+
+
+def test_fast_profile_fills_all_stages_in_one_call():
+    cache = TaskOutputCache(TieredCache(None))
+    llm = MagicMock()
+    llm.call.return_value = crew.FastPipelineOutput(
+        analysis='fast analysis', job_description='fast job', interview_questions='fast questions'
+    )
+    
+    with patch('hiring_hacker.crew.get_task_cache', return_value=cache), \
+         patch('hiring_hacker.crew.make_llm', return_value=llm), \
+         patch('hiring_hacker.crew.build_crew') as mock_build_crew:
+        report = '# Repository Analysis: test-repo'
+        first = crew.run_pipeline('https://github.com/owner/repo', report, profile='fast')
+        second = crew.run_pipeline('https://github.com/owner/repo', report, profile='fast')
+    
+    assert first == second == {
+        'analysis': 'fast analysis',
+        'job_description': 'fast job',
+        'interview_questions': 'fast questions',
+    }
+    assert llm.call.call_count == 1
+    assert llm.call.call_args.kwargs['response_model'] is crew.FastPipelineOutput
+    mock_build_crew.assert_not_called()
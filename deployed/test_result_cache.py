@@ -0,0 +1,65 @@
+import threading
+import time
+from unittest.mock import patch, MagicMock
+
+from result_cache import AnalysisCache, TieredCache
+
+def test_disk_tier_survives_a_new_process(tmp_path):
+    path = str(tmp_path / 'results.sqlite3')
+    TieredCache(path).set('key', {'name': 'test-repo'})
+    
+    cache = TieredCache(path)
+    assert cache.get('key') == {'name': 'test-repo'}
+    assert cache.hits == {'memory': 0, 'disk': 1}
+    assert cache.get('key') == {'name': 'test-repo'}
+    assert cache.hits == {'memory': 1, 'disk': 1}
+
+def test_ttl_and_memory_bound(tmp_path):
+    cache = TieredCache(None, ttl=60, memory_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, key)
+    assert cache.get('a') is None
+    assert cache.get('c') == 'c'
+    
+    with patch('result_cache.time.time', return_value=10 ** 12):
+        assert cache.get('c') is None
+
+def test_analysis_is_reused_until_head_moves():
+    cache = AnalysisCache(TieredCache(None))
+    compute = MagicMock(side_effect=['first', 'second'])
+    
+    with patch('result_cache.head_sha', return_value='sha1'):
+        assert cache.get_or_compute('Owner', 'Repo', 'report', compute) == 'first'
+        assert cache.get_or_compute('owner', 'repo', 'report', compute) == 'first'
+    with patch('result_cache.head_sha', return_value='sha2'):
+        assert cache.get_or_compute('owner', 'repo', 'report', compute) == 'second'
+    assert compute.call_count == 2
+
+def test_invalid_results_and_failed_probes_are_not_stored():
+    cache = AnalysisCache(TieredCache(None))
+    
+    with patch('result_cache.head_sha', return_value='sha1'):
+        assert cache.get_or_compute('owner', 'repo', 'app', lambda: None) is None
+    with patch('result_cache.head_sha', side_effect=RuntimeError('offline')):
+        assert cache.get_or_compute('owner', 'repo', 'app', lambda: {'name': 'x'}) == {'name': 'x'}
+    assert cache.cache.stats()['memory_entries'] == 0
+
+def test_concurrent_callers_share_one_analysis():
+    cache = AnalysisCache(TieredCache(None))
+    release = threading.Event()
+    compute = MagicMock(side_effect=lambda: release.wait(5) and 'report')
+    results = []
+    
+    with patch('result_cache.head_sha', return_value=None):
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('owner', 'repo', 'report', compute)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        while cache.stats()['coalescing']['shared'] < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+    
+    assert results == ['report'] * 4
+    assert compute.call_count == 1
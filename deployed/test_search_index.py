@@ -0,0 +1,36 @@
+from unittest.mock import patch, MagicMock
+
+from search_index import IndexManifest, chunk_id, collection_name, sync_index
+
+def test_unchanged_commit_reuses_the_index(tmp_path):
+    manifest = IndexManifest(str(tmp_path / 'manifest.sqlite3'))
+    client = MagicMock()
+    collection = collection_name('Owner', 'Repo')
+    
+    with patch('search_index.head_sha', return_value='sha1'), \
+            patch('search_index.load_repo_chunks', return_value=['readme', 'structure']) as load:
+        assert sync_index(client, collection, 'Owner/Repo', ['repo', 'code'], None, manifest)['embedded'] == 2
+        assert sync_index(client, collection, 'Owner/Repo', ['code', 'repo'], None, manifest)['embedded'] == 0
+    
+    assert load.call_count == 1
+    assert client.add_documents.call_count == 1
+    assert IndexManifest(manifest.path).get(collection)['commit_sha'] == 'sha1'
+
+def test_new_commit_embeds_only_changed_chunks(tmp_path):
+    manifest = IndexManifest(str(tmp_path / 'manifest.sqlite3'))
+    client = MagicMock()
+    collection = collection_name('owner', 'repo')
+    
+    with patch('search_index.head_sha', return_value='sha1'), \
+            patch('search_index.load_repo_chunks', return_value=['readme', 'old structure']):
+        sync_index(client, collection, 'owner/repo', ['repo'], None, manifest)
+    with patch('search_index.head_sha', return_value='sha2'), \
+            patch('search_index.load_repo_chunks', return_value=['readme', 'new structure']):
+        counts = sync_index(client, collection, 'owner/repo', ['repo'], None, manifest)
+    
+    assert counts == {'embedded': 1, 'reused': 1, 'deleted': 1}
+    documents = client.add_documents.call_args.kwargs['documents']
+    assert [document['content'] for document in documents] == ['new structure']
+    client.client.get_collection.return_value.delete.assert_called_once_with(
+        ids=[chunk_id(collection, 'old structure')]
+    )
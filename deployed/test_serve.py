@@ -0,0 +1,15 @@
+from serve import torch_threads_per_worker, worker_cpus
+
+
+def test_torch_threads_divide_the_cores_between_workers():
+    assert torch_threads_per_worker(4, 16) == 4
+    assert torch_threads_per_worker(3, 8) == 2
+    assert torch_threads_per_worker(8, 4) == 1
+
+
+def test_workers_get_disjoint_cpu_shares():
+    cpus = list(range(8))
+    shares = [worker_cpus(index, 4, cpus) for index in range(4)]
+    
+    assert shares == [[0, 1], [2, 3], [4, 5], [6, 7]]
+    assert [worker_cpus(index, 3, [0, 1]) for index in range(3)] == [[0], [1], [0]]
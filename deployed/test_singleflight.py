@@ -0,0 +1,42 @@
+import threading
+
+import pytest
+
+from singleflight import SingleFlight
+
+def test_failure_reaches_every_waiting_caller():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    errors = []
+    
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError('Repository not found')
+    
+    def call():
+        try:
+            flights.do('owner/repo', fail)
+        except ValueError as e:
+            errors.append(str(e))
+    
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    while flights.stats()['shared'] < 1:
+        pass
+    release.set()
+    leader.join()
+    follower.join()
+    
+    assert errors == ['Repository not found'] * 2
+    assert flights.stats() == {'in_flight': 0, 'executed': 1, 'shared': 1}
+
+def test_later_calls_run_again():
+    flights = SingleFlight()
+    assert flights.do('key', lambda: 1) == 1
+    assert flights.do('key', lambda: 2) == 2
+    with pytest.raises(KeyError):
+        flights.do('key', lambda: {}['missing'])